@@ -0,0 +1,236 @@
+"""
+Asyncio front-end of the encryption schemes.
+
+An 'AsyncCipher' turns the blocking 'encrypt_bytes'/'decrypt_bytes' of a scheme instance into
+coroutines. The work runs in an executor chosen per scheme and operation:
+
+    RSA        threads, OpenSSL releases the GIL during the modular exponentiation
+    NTRU       threads, the batch products are NumPy matrix products that release the GIL,
+               concurrent requests are merged into 'encrypt_many'/'decrypt_many' calls
+    McEliece   encryption in threads (one vector-matrix product), decryption in processes
+               restored from the exported key material, Patterson decoding holds the GIL
+
+At most 'max_in_flight' requests are admitted at once, further callers wait for a free slot:
+
+    async with AsyncCipher.for_scheme(ntru) as cipher:
+        ciphertexts = await asyncio.gather(*(cipher.encrypt(message) for message in messages))
+"""
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from Instrumentation.metrics import REGISTRY
+
+# Scheme instance restored in a worker process by '_initialise_worker'
+_worker_instance = None
+
+
+def _initialise_worker(scheme, parameters, key_material):
+    global _worker_instance
+    _worker_instance = scheme(*parameters, key_material=key_material)
+
+
+def _call_worker(method, argument):
+    return getattr(_worker_instance, method)(argument)
+
+
+class _Dispatcher:
+    """
+    Runs one operation in an executor. With a batch function, requests arriving within
+    'batch_window' seconds of each other are collected into one call of at most 'max_batch' items.
+    """
+
+    def __init__(self, operation, single, many, executor, max_batch, batch_window):
+        self.operation = operation
+        self.single = single
+        self.many = many
+        self.executor = executor
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self._queue = []
+        self._timer = None
+        self._tasks = set()
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        if self.many is None or self.max_batch <= 1:
+            return await loop.run_in_executor(self.executor, self.single, item)
+
+        future = loop.create_future()
+        self._queue.append((item, future))
+        if len(self._queue) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.batch_window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._queue = self._queue, []
+        batch = [(item, future) for item, future in batch if not future.cancelled()]
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        loop = asyncio.get_running_loop()
+        items = [item for item, _ in batch]
+
+        if len(items) == 1:
+            results = await asyncio.gather(loop.run_in_executor(self.executor, self.single, items[0]),
+                                           return_exceptions=True)
+        else:
+            REGISTRY.increment(f'aio.{self.operation}.batches')
+            REGISTRY.increment(f'aio.{self.operation}.batched_requests', len(items))
+            try:
+                results = await loop.run_in_executor(self.executor, self.many, items)
+            except Exception:
+                # One bad item fails the whole batch call, so every item is retried on its own
+                # and only the requests that fail by themselves get the error
+                REGISTRY.increment(f'aio.{self.operation}.batch_fallbacks')
+                results = await asyncio.gather(*(loop.run_in_executor(self.executor, self.single, item)
+                                                 for item in items), return_exceptions=True)
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+class AsyncCipher:
+    """
+    Asynchronous encryption and decryption with a bound on the requests in flight
+    """
+
+    def __init__(self, encrypt, decrypt=None, encrypt_many=None, decrypt_many=None, executor=None,
+                 decrypt_executor=None, max_in_flight=64, max_batch=32, batch_window=0.0005, owned_executors=()):
+        """
+        :param encrypt: blocking function encrypting one byte message
+        :param decrypt: blocking function decrypting one ciphertext, None for encryption-only ciphers
+        :param encrypt_many: blocking function encrypting a list of messages, enables micro-batching
+        :param decrypt_many: blocking function decrypting a list of ciphertexts, enables micro-batching
+        :param executor: executor running the operations, the default executor of the loop if not given
+        :param decrypt_executor: executor running decryption, 'executor' if not given
+        :param max_in_flight: maximum number of admitted requests, further ones wait for a free slot
+        :param max_batch: maximum number of requests merged into one batch call
+        :param batch_window: seconds a request waits for others to join its batch
+        :param owned_executors: executors shut down by 'close'
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be positive")
+
+        self.max_in_flight = max_in_flight
+        self._encrypt = _Dispatcher('encrypt', encrypt, encrypt_many, executor, max_batch, batch_window)
+        self._decrypt = None
+        if decrypt is not None:
+            self._decrypt = _Dispatcher('decrypt', decrypt, decrypt_many, decrypt_executor or executor,
+                                        max_batch, batch_window)
+        self._owned_executors = list(owned_executors)
+        self._slots = None
+        self._in_flight = 0
+
+    @classmethod
+    def for_scheme(cls, instance, max_workers=None, mp_context=None, **kwargs):
+        """
+        Wraps a scheme instance with the executors suited to it
+        :param instance: RSACipher, NTRUEncrypt, NTRUEncryptor or McEliece instance
+        :param max_workers: number of threads or processes of every created pool
+        :param mp_context: multiprocessing context of McEliece decryption workers, 'spawn' by default
+        :param kwargs: further arguments of the constructor, e.g. 'max_in_flight'
+        :return: AsyncCipher owning the created pools
+        """
+        # Imported here so that using one scheme does not import the others
+        from McEliece.mceliece import McEliece
+        from NTRUEncrypt.encryptor import NTRUEncryptor
+        from NTRUEncrypt.ntruencrypt import NTRUEncrypt
+        from RSA.rsa import RSACipher
+
+        threads = ThreadPoolExecutor(max_workers=max_workers)
+
+        if isinstance(instance, RSACipher):
+            decrypt = instance.decrypt if instance.private_key is not None else None
+            return cls(instance.encrypt, decrypt, executor=threads, owned_executors=[threads], **kwargs)
+
+        if isinstance(instance, NTRUEncryptor):
+            return cls(instance.encrypt_bytes, encrypt_many=instance.encrypt_many,
+                       executor=threads, owned_executors=[threads], **kwargs)
+
+        if isinstance(instance, NTRUEncrypt):
+            return cls(instance.encrypt_bytes, instance.decrypt_bytes, instance.encrypt_many, instance.decrypt_many,
+                       executor=threads, owned_executors=[threads], **kwargs)
+
+        if isinstance(instance, McEliece):
+            if instance.decoder is None:
+                return cls(instance.encrypt_bytes, executor=threads, owned_executors=[threads], **kwargs)
+
+            processes = ProcessPoolExecutor(max_workers=max_workers,
+                                            mp_context=mp_context or multiprocessing.get_context('spawn'),
+                                            initializer=_initialise_worker,
+                                            initargs=(McEliece, (instance.n, instance.t, instance.m),
+                                                      instance.export_key_material()))
+            return cls(instance.encrypt_bytes, functools.partial(_call_worker, 'decrypt_bytes'),
+                       executor=threads, decrypt_executor=processes, owned_executors=[threads, processes], **kwargs)
+
+        threads.shutdown()
+        raise ValueError(f"No asynchronous front-end for {type(instance).__name__}")
+
+    @property
+    def in_flight(self):
+        """
+        Number of admitted requests that have not completed yet
+        """
+        return self._in_flight
+
+    async def _submit(self, dispatcher, item):
+        # Created lazily so that the semaphore belongs to the running loop
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+
+        async with self._slots:
+            self._in_flight += 1
+            try:
+                return await dispatcher.submit(item)
+            finally:
+                self._in_flight -= 1
+
+    async def encrypt(self, message):
+        """
+        Encrypts given byte message
+        :param message: bytes to encrypt
+        :return: ciphertext of the wrapped scheme
+        """
+        return await self._submit(self._encrypt, message)
+
+    async def decrypt(self, ciphertext):
+        """
+        Decrypts given ciphertext to the original byte message
+        :param ciphertext: ciphertext of the wrapped scheme
+        :return: original bytes
+        """
+        if self._decrypt is None:
+            raise ValueError("Decryption error: the private key is not available")
+
+        return await self._submit(self._decrypt, ciphertext)
+
+    def close(self):
+        """
+        Shuts down the executors created for the cipher
+        """
+        for executor in self._owned_executors:
+            executor.shutdown()
+        self._owned_executors = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
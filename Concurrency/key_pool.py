@@ -0,0 +1,279 @@
+"""
+Background generation of ephemeral key pairs.
+
+A 'KeyPool' keeps between a low and a high watermark of key pairs ready. Key generation
+runs in a process pool, workers return the exported key material and the pool restores
+instances from it, so a ready key is handed out with a deque pop and a cheap restore:
+
+    pool = KeyPool(McEliece, (1024, 50, 10), low_watermark=2, high_watermark=8)
+    mceliece = await pool.get()      # from a coroutine
+    ntru = ntru_pool.take(timeout=5)  # from a thread
+"""
+import asyncio
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from Instrumentation.metrics import REGISTRY
+
+
+class KeyPoolEmpty(LookupError):
+    """
+    Raised when no key pair is ready and the caller does not wait
+    """
+
+
+def generate_key_material(scheme, parameters):
+    """
+    Generates a key pair in a worker process
+    :param scheme: scheme class with 'export_key_material', e.g. NTRUEncrypt or McEliece
+    :param parameters: positional constructor arguments
+    :return: exported key material
+    """
+    return scheme(*parameters).export_key_material()
+
+
+class KeyPool:
+    """
+    Pool of pre-generated key pairs of one scheme and parameter set
+    """
+
+    def __init__(self, scheme, parameters, low_watermark=2, high_watermark=8, max_workers=None, mp_context=None):
+        """
+        :param scheme: scheme class accepting 'key_material' in its constructor
+        :param parameters: positional constructor arguments, e.g. (821, 3, 2048)
+        :param low_watermark: generation is restarted once fewer keys are ready
+        :param high_watermark: generation stops once this many keys are ready or being generated
+        :param max_workers: number of worker processes, the number of CPUs by default
+        :param mp_context: multiprocessing context of the workers, 'spawn' by default
+        """
+        if not 0 <= low_watermark <= high_watermark or high_watermark < 1:
+            raise ValueError("Watermarks must satisfy 0 <= low_watermark <= high_watermark and high_watermark >= 1")
+
+        self.scheme = scheme
+        self.parameters = tuple(parameters)
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self.last_error = None
+
+        self._ready = deque()
+        self._async_waiters = deque()
+        self._pending = 0
+        self._jobs = set()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._executor = ProcessPoolExecutor(max_workers=max_workers,
+                                             mp_context=mp_context or multiprocessing.get_context('spawn'))
+
+        self._refill(force=True)
+
+    @property
+    def ready(self):
+        """
+        Number of key pairs ready to be handed out
+        """
+        return len(self._ready)
+
+    @property
+    def pending(self):
+        """
+        Number of key pairs being generated
+        """
+        return self._pending
+
+    def _refill(self, force=False):
+        """
+        Submits generation jobs up to the high watermark once the ready keys drop below the low watermark
+        """
+        with self._lock:
+            if self._closed:
+                return
+            if not force and len(self._ready) >= self.low_watermark:
+                return
+
+            # Keys promised to waiting coroutines are already spoken for, cancelled waiters are not counted
+            self._async_waiters = deque(entry for entry in self._async_waiters if not entry[1].done())
+            missing = self.high_watermark + len(self._async_waiters) - len(self._ready) - self._pending
+            self._pending += max(missing, 0)
+
+        for submitted in range(missing):
+            try:
+                future = self._executor.submit(generate_key_material, self.scheme, self.parameters)
+            except RuntimeError:
+                # The pool was closed meanwhile
+                with self._lock:
+                    self._pending -= missing - submitted
+                return
+            with self._lock:
+                self._jobs.add(future)
+            future.add_done_callback(self._on_generated)
+
+    def _cancel_surplus(self):
+        """
+        Cancels queued jobs that are no longer needed to reach the high watermark, e.g. after waiting
+        coroutines were cancelled. Jobs already running in a worker are left to finish.
+        """
+        with self._lock:
+            surplus = len(self._ready) + self._pending - self.high_watermark - len(self._async_waiters)
+            for future in list(self._jobs):
+                if surplus <= 0:
+                    break
+                if future.cancel():
+                    self._jobs.discard(future)
+                    self._pending -= 1
+                    surplus -= 1
+
+    def _on_generated(self, future):
+        """
+        Hands freshly generated key material to the oldest waiting coroutine or stores it
+        """
+        if future.cancelled():
+            return
+
+        error = future.exception()
+        with self._lock:
+            self._jobs.discard(future)
+            self._pending -= 1
+            if error is not None:
+                self.last_error = error
+                REGISTRY.increment('key_pool.errors')
+
+                # Once no job is left, waiting callers get the error instead of waiting forever
+                if not self._pending:
+                    while self._async_waiters:
+                        loop, waiter = self._async_waiters.popleft()
+                        loop.call_soon_threadsafe(self._fail, waiter, error)
+                    self._available.notify_all()
+            else:
+                self.last_error = None
+                REGISTRY.increment('key_pool.generated')
+                while self._async_waiters:
+                    loop, waiter = self._async_waiters.popleft()
+                    if not waiter.done():
+                        loop.call_soon_threadsafe(self._deliver, waiter, future.result())
+                        break
+                else:
+                    if len(self._ready) < self.high_watermark:
+                        self._ready.append(future.result())
+                        self._available.notify()
+                    else:
+                        # Generated for a waiter that was cancelled after its job had started
+                        REGISTRY.increment('key_pool.discarded')
+
+        # Failed jobs are not retried here, the next request for a key submits new ones
+        if error is None:
+            self._refill()
+
+    def _deliver(self, waiter, material):
+        """
+        Completes a waiting coroutine in its event loop, material of a cancelled one goes back to the pool
+        """
+        if waiter.done():
+            with self._lock:
+                self._ready.appendleft(material)
+                self._available.notify()
+        else:
+            waiter.set_result(material)
+
+    @staticmethod
+    def _fail(waiter, error):
+        if not waiter.done():
+            waiter.set_exception(error)
+
+    def _restore(self, material):
+        return self.scheme(*self.parameters, key_material=material)
+
+    def get_nowait(self):
+        """
+        Hands out a ready key pair without waiting
+        :raises KeyPoolEmpty: if no key pair is ready
+        :return: scheme instance
+        """
+        with self._lock:
+            if not self._ready:
+                raise KeyPoolEmpty("No key pair is ready")
+            material = self._ready.popleft()
+
+        self._refill()
+        return self._restore(material)
+
+    def take(self, timeout=None):
+        """
+        Hands out a key pair, blocking the calling thread until one is ready
+        :param timeout: maximum number of seconds to wait, unbounded if not given
+        :raises KeyPoolEmpty: if no key pair became ready in time
+        :return: scheme instance
+        """
+        self._refill(force=not self._ready)
+
+        with self._lock:
+            failed = lambda: self.last_error is not None and not self._pending
+            if not self._available.wait_for(lambda: self._ready or self._closed or failed(), timeout):
+                raise KeyPoolEmpty(f"No key pair became ready within {timeout} seconds")
+            if not self._ready:
+                if self._closed:
+                    raise KeyPoolEmpty("Key pool is closed")
+                raise self.last_error
+            material = self._ready.popleft()
+
+        self._refill()
+        return self._restore(material)
+
+    async def get(self):
+        """
+        Hands out a key pair, waiting without blocking the event loop until one is ready
+        :return: scheme instance
+        """
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            if self._closed:
+                raise KeyPoolEmpty("Key pool is closed")
+            if self._ready:
+                material = self._ready.popleft()
+                waiter = None
+            else:
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+
+        self._refill(force=waiter is not None)
+        if waiter is not None:
+            try:
+                material = await waiter
+            finally:
+                if waiter.cancelled():
+                    with self._lock:
+                        if (loop, waiter) in self._async_waiters:
+                            self._async_waiters.remove((loop, waiter))
+                    self._cancel_surplus()
+
+        return self._restore(material)
+
+    def close(self):
+        """
+        Stops the workers, key pairs being generated are dropped
+        """
+        with self._lock:
+            self._closed = True
+            self._available.notify_all()
+            waiters = list(self._async_waiters)
+            self._async_waiters.clear()
+
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(self._fail, waiter, KeyPoolEmpty("Key pool is closed"))
+
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,150 @@
+"""
+KEM/DEM hybrid encryption of arbitrarily large payloads.
+
+A public-key scheme (see key_encapsulation.py) encrypts a random session key,
+and the payload is split into chunks sealed with AES-GCM. Chunk nonces are
+a random prefix followed by the chunk counter and a flag marking the last chunk,
+so reordered, dropped or truncated chunks fail authentication.
+
+Stream layout:
+    MAGIC | version (1) | chunk size (4) | nonce prefix (7) | encapsulated key length (4) | encapsulated key
+    chunk 0 | chunk 1 | ... | last chunk
+Every chunk except the last one carries exactly 'chunk size' bytes of payload plus a 16 byte tag.
+The header is authenticated as associated data of every chunk.
+"""
+import os
+import struct
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+MAGIC = b'HKEM'
+VERSION = 1
+DEFAULT_CHUNK_SIZE = 64 * 1024
+# Upper bound of the chunk size, the header is not authenticated before the first chunk is read
+MAX_CHUNK_SIZE = 16 * 1024 * 1024
+NONCE_PREFIX_LENGTH = 7
+TAG_LENGTH = 16
+
+_HEADER_FORMAT = f'>4sBI{NONCE_PREFIX_LENGTH}sI'
+_HEADER_LENGTH = struct.calcsize(_HEADER_FORMAT)
+
+
+def _chunk_nonce(nonce_prefix, counter, last):
+    return nonce_prefix + struct.pack('>I?', counter, last)
+
+
+def _check_chunk_size(chunk_size):
+    if not 1 <= chunk_size <= MAX_CHUNK_SIZE:
+        raise ValueError(f"Chunk size must be between 1 and {MAX_CHUNK_SIZE} bytes, got {chunk_size}")
+
+
+def _read_exactly(readable, size):
+    """
+    Reads up to 'size' bytes, retrying short reads of pipes and sockets until EOF
+    """
+    data = bytearray()
+    while len(data) < size:
+        block = readable.read(size - len(data))
+        if not block:
+            break
+        data += block
+
+    return bytes(data)
+
+
+def encrypt_chunks(kem, readable, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Encrypts the payload read from the given stream, holding at most two chunks in memory
+    :param kem: key encapsulation of the recipient
+    :param readable: binary file-like object with the payload
+    :param chunk_size: number of payload bytes per chunk
+    :return: generator of encrypted stream pieces, the header first
+    :raises ValueError: if the chunk size is not between 1 and MAX_CHUNK_SIZE
+    """
+    # Checked here rather than in the generator, so that the error is raised on the call
+    _check_chunk_size(chunk_size)
+
+    return _encrypt_chunks(kem, readable, chunk_size)
+
+
+def _encrypt_chunks(kem, readable, chunk_size):
+    secret, encapsulated = kem.encapsulate()
+    nonce_prefix = os.urandom(NONCE_PREFIX_LENGTH)
+
+    header = struct.pack(_HEADER_FORMAT, MAGIC, VERSION, chunk_size, nonce_prefix, len(encapsulated)) + encapsulated
+    yield header
+
+    aes = AESGCM(secret)
+    counter = 0
+    current = _read_exactly(readable, chunk_size)
+    while True:
+        following = _read_exactly(readable, chunk_size)
+        last = not following
+
+        yield aes.encrypt(_chunk_nonce(nonce_prefix, counter, last), current, header)
+
+        if last:
+            return
+
+        current = following
+        counter += 1
+
+
+def decrypt_chunks(kem, readable):
+    """
+    Decrypts the stream produced by 'encrypt_chunks'. Every yielded chunk is authenticated,
+    but the payload is complete only once the generator finishes without an error.
+    :param kem: key encapsulation holding the private key of the recipient
+    :param readable: binary file-like object with the encrypted stream
+    :return: generator of payload chunks
+    """
+    fixed_header = _read_exactly(readable, _HEADER_LENGTH)
+    if len(fixed_header) != _HEADER_LENGTH:
+        raise ValueError("Decryption error: stream header is truncated")
+
+    magic, version, chunk_size, nonce_prefix, encapsulated_length = struct.unpack(_HEADER_FORMAT, fixed_header)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Decryption error: unsupported stream format")
+    if not 1 <= chunk_size <= MAX_CHUNK_SIZE:
+        raise ValueError(f"Decryption error: chunk size {chunk_size} is out of range")
+
+    encapsulated = _read_exactly(readable, encapsulated_length)
+    header = fixed_header + encapsulated
+
+    aes = AESGCM(kem.decapsulate(encapsulated))
+    counter = 0
+    current = _read_exactly(readable, chunk_size + TAG_LENGTH)
+    while True:
+        following = _read_exactly(readable, chunk_size + TAG_LENGTH)
+        last = not following
+
+        yield aes.decrypt(_chunk_nonce(nonce_prefix, counter, last), current, header)
+
+        if last:
+            return
+
+        current = following
+        counter += 1
+
+
+def encrypt_stream(kem, readable, writable, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Encrypts the payload of one binary stream into another in constant memory
+    :param kem: key encapsulation of the recipient
+    :param readable: binary file-like object with the payload
+    :param writable: binary file-like object receiving the encrypted stream
+    :param chunk_size: number of payload bytes per chunk
+    """
+    for piece in encrypt_chunks(kem, readable, chunk_size):
+        writable.write(piece)
+
+
+def decrypt_stream(kem, readable, writable):
+    """
+    Decrypts the encrypted stream into the payload in constant memory
+    :param kem: key encapsulation holding the private key of the recipient
+    :param readable: binary file-like object with the encrypted stream
+    :param writable: binary file-like object receiving the payload
+    """
+    for chunk in decrypt_chunks(kem, readable):
+        writable.write(chunk)
@@ -0,0 +1,116 @@
+import os
+
+import numpy as np
+
+from MatricesSerialisation.binary_matrix_serialisation import matrix_to_byte_array, byte_array_to_matrix
+from PolynomialsSerialisation.fixed_block_serialisation import compress_polynomial, decompress_polynomial
+from NTRUEncrypt.truncated_polynomial import TruncatedPolynomial
+from RSA.rsa import encrypt_bytes, decrypt_bytes
+
+# Overhead of OAEP padding with SHA-1 (2 * hLen + 2), which is used by NTRUEncrypt and McEliece
+OAEP_SHA1_OVERHEAD = 2 * 20 + 2
+
+# Overhead of OAEP padding with SHA-256, which is used by RSA
+OAEP_SHA256_OVERHEAD = 2 * 32 + 2
+
+
+def choose_secret_length(capacity):
+    """
+    Picks the longest AES key length that fits into a single public-key block
+    :param capacity: number of message bytes a public-key block can carry
+    :return: 32 or 16
+    """
+    for length in (32, 16):
+        if capacity >= length:
+            return length
+
+    raise ValueError(f"Public-key block carries only {capacity} bytes, at least 16 are needed for a session key")
+
+
+class KeyEncapsulation:
+    """
+    Encapsulates random session secrets with a public-key scheme.
+    Subclasses implement '_encrypt' and '_decrypt' of a single block of bytes.
+    """
+
+    secret_length = 32
+
+    def encapsulate(self):
+        """
+        Generates a random session secret and encrypts it
+        :return: tuple (secret, encapsulated secret bytes)
+        """
+        secret = os.urandom(self.secret_length)
+        return secret, self._encrypt(secret)
+
+    def decapsulate(self, encapsulated):
+        """
+        Recovers the session secret from its encapsulation
+        :param encapsulated: encapsulated secret bytes
+        :return: session secret
+        """
+        secret = self._decrypt(encapsulated)
+        if len(secret) != self.secret_length:
+            raise ValueError("Decapsulation error: session secret has unexpected length")
+
+        return secret
+
+    def _encrypt(self, secret):
+        raise NotImplementedError
+
+    def _decrypt(self, encapsulated):
+        raise NotImplementedError
+
+
+class NTRUKeyEncapsulation(KeyEncapsulation):
+    def __init__(self, ntru):
+        """
+        :param ntru: NTRUEncrypt instance, the private key is needed only for decapsulation
+        """
+        self.ntru = ntru
+        self.secret_length = choose_secret_length(ntru.mask_length_byes - OAEP_SHA1_OVERHEAD)
+
+    def _encrypt(self, secret):
+        ciphertext = self.ntru.encrypt_bytes(secret)
+        return compress_polynomial(ciphertext.coefficients, self.ntru.q)
+
+    def _decrypt(self, encapsulated):
+        coefficients = decompress_polynomial(encapsulated, self.ntru.q, self.ntru.N)
+        return self.ntru.decrypt_bytes(TruncatedPolynomial(coefficients))
+
+
+class McElieceKeyEncapsulation(KeyEncapsulation):
+    def __init__(self, mceliece):
+        """
+        :param mceliece: McEliece instance, the private key is needed only for decapsulation
+        """
+        self.mceliece = mceliece
+        self.secret_length = choose_secret_length(mceliece.k // 8 - OAEP_SHA1_OVERHEAD)
+
+    def _encrypt(self, secret):
+        ciphertext = self.mceliece.encrypt_bytes(secret)
+        return bytes(matrix_to_byte_array(np.asarray(ciphertext, dtype=np.uint8)))
+
+    def _decrypt(self, encapsulated):
+        ciphertext = byte_array_to_matrix(encapsulated, (1, self.mceliece.n))[0]
+        return self.mceliece.decrypt_bytes(ciphertext)
+
+
+class RSAKeyEncapsulation(KeyEncapsulation):
+    def __init__(self, public_key, private_key=None):
+        """
+        :param public_key: RSA public key
+        :param private_key: RSA private key, needed only for decapsulation
+        """
+        self.public_key = public_key
+        self.private_key = private_key
+        self.secret_length = choose_secret_length(public_key.key_size // 8 - OAEP_SHA256_OVERHEAD)
+
+    def _encrypt(self, secret):
+        return encrypt_bytes(self.public_key, secret)
+
+    def _decrypt(self, encapsulated):
+        if self.private_key is None:
+            raise ValueError("Private key is required for decapsulation")
+
+        return decrypt_bytes(self.private_key, encapsulated)
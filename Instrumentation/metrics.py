@@ -0,0 +1,207 @@
+"""
+Lightweight instrumentation shared by the scheme modules.
+
+Operations are wrapped with 'timed', which records their latency into a histogram
+and counts their calls and failures in a registry. Recording is off by default,
+a disabled timer only checks one flag. Recorded values can be pushed to callbacks
+or dumped in the Prometheus text format:
+
+    from Instrumentation.metrics import REGISTRY
+    REGISTRY.enable()
+    REGISTRY.add_callback(lambda operation, seconds, failed: ...)
+    print(REGISTRY.prometheus_text())
+"""
+import bisect
+import functools
+import threading
+import time
+
+# Upper bounds of the latency histogram buckets in seconds
+DEFAULT_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+
+class Histogram:
+    """
+    Latency histogram, every observation increments one bucket and cumulative counts are built on export
+    """
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last bucket collects values above all bounds
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Latency histograms and counters of named operations
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.enabled = False
+        self.buckets = buckets
+        self.histograms = {}
+        self.counters = {}
+        self.callbacks = []
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def add_callback(self, callback):
+        """
+        Registers a function called with (operation, seconds, failed) after every recorded operation
+        """
+        self.callbacks.append(callback)
+
+    def remove_callback(self, callback):
+        self.callbacks.remove(callback)
+
+    def increment(self, name, amount=1):
+        """
+        Increments a counter, does nothing while the registry is disabled
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record(self, operation, seconds, failed=False):
+        """
+        Records one call of an operation
+        :param operation: operation name, e.g. 'rsa.encrypt'
+        :param seconds: elapsed time
+        :param failed: whether the operation raised an exception
+        """
+        with self._lock:
+            histogram = self.histograms.get(operation)
+            if histogram is None:
+                histogram = self.histograms[operation] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+            if failed:
+                self.counters[operation + '.errors'] = self.counters.get(operation + '.errors', 0) + 1
+
+        for callback in self.callbacks:
+            callback(operation, seconds, failed)
+
+    def timed(self, operation):
+        """
+        Times an operation, usable both as a decorator and as a context manager
+        """
+        return Timer(self, operation)
+
+    def snapshot(self):
+        """
+        Copies the current values
+        :return: dictionary with 'histograms' (operation -> count, sum and bucket counts) and 'counters'
+        """
+        with self._lock:
+            return {
+                'histograms': {operation: {'count': histogram.count, 'sum': histogram.sum,
+                                           'buckets': dict(zip(histogram.buckets + (float('inf'),), histogram.counts))}
+                               for operation, histogram in self.histograms.items()},
+                'counters': dict(self.counters),
+            }
+
+    def prometheus_text(self, prefix='pqc'):
+        """
+        Dumps the histograms and counters in the Prometheus text exposition format
+        :param prefix: prefix of the metric names
+        :return: text dump
+        """
+        snapshot = self.snapshot()
+        lines = []
+
+        if snapshot['histograms']:
+            name = f'{prefix}_operation_duration_seconds'
+            lines += [f'# HELP {name} Latency of scheme operations.', f'# TYPE {name} histogram']
+            for operation, histogram in sorted(snapshot['histograms'].items()):
+                cumulative = 0
+                for bound, count in histogram['buckets'].items():
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{name}_bucket{{operation="{operation}",le="{le}"}} {cumulative}')
+                lines.append(f'{name}_sum{{operation="{operation}"}} {histogram["sum"]!r}')
+                lines.append(f'{name}_count{{operation="{operation}"}} {histogram["count"]}')
+
+        if snapshot['counters']:
+            name = f'{prefix}_events_total'
+            lines += [f'# HELP {name} Counters of scheme events.', f'# TYPE {name} counter']
+            for counter, value in sorted(snapshot['counters'].items()):
+                lines.append(f'{name}{{event="{counter}"}} {value}')
+
+        return '\n'.join(lines) + '\n' if lines else ''
+
+
+class Timer:
+    """
+    Records the latency of the wrapped function or block into a registry, if it is enabled
+    """
+
+    __slots__ = ('registry', 'operation', 'start')
+
+    def __init__(self, registry, operation):
+        self.registry = registry
+        self.operation = operation
+        self.start = None
+
+    def __enter__(self):
+        if self.registry.enabled:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.start is not None:
+            self.registry.record(self.operation, time.perf_counter() - self.start, exc_type is not None)
+            self.start = None
+        return False
+
+    def __call__(self, func):
+        registry, operation = self.registry, self.operation
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return func(*args, **kwargs)
+
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException:
+                registry.record(operation, time.perf_counter() - start, True)
+                raise
+            registry.record(operation, time.perf_counter() - start)
+            return result
+
+        return wrapper
+
+
+# Registry used by the scheme modules
+REGISTRY = MetricsRegistry()
+
+
+def timed(operation, registry=None):
+    """
+    Times an operation in the given registry, the shared one by default
+    :param operation: operation name, e.g. 'rsa.encrypt'
+    :param registry: metrics registry
+    :return: timer usable as a decorator or a context manager
+    """
+    return Timer(REGISTRY if registry is None else registry, operation)
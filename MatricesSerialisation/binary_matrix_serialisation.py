@@ -1,51 +1,131 @@
 import math
 import numpy as np
 
+DEFAULT_ROWS_PER_BLOCK = 1024
 
-def matrix_to_byte_array(binary_matrix):
-    # Flatten the matrix to a 1D array
-    flat_array = binary_matrix.flatten()
 
-    # Calculate the number of full bytes
-    num_full_bytes = math.ceil(len(flat_array) / 8)
+def _row_bytes(columns):
+    return math.ceil(columns / 8)
 
-    byte_array = bytearray(num_full_bytes)
 
-    # Fill the byte array with values
-    for i in range(num_full_bytes):
-        # Slice 8 bits
-        byte = flat_array[i*8:(i+1)*8]
-        # Convert bits to a single byte
-        byte_array[i] = np.packbits(byte)[0]
+def pack_matrix(binary_matrix, bitorder='big', pad_rows=False):
+    """
+    Packs a binary matrix into bytes with a single vectorised call
+    :param binary_matrix: matrix of zeros and ones
+    :param bitorder: 'big' stores the first bit in the most significant bit of a byte, 'little' in the least
+    :param pad_rows: start every row at a byte boundary instead of packing the matrix as one bit string
+    :return: uint8 array of the packed bits
+    """
+    binary_matrix = np.asarray(binary_matrix, dtype=np.uint8)
 
-    # Handle the remainder if there are leftover bits
-    remainder = len(flat_array) % 8
-    if remainder != 0:
-        # Slice the remaining bits
-        byte = flat_array[-remainder:]
-        byte = np.pad(byte, (0, 8 - remainder), 'constant')  # Pad to make 8 bits
-        byte_array[-1] = np.packbits(byte)[0]
+    if pad_rows:
+        return np.packbits(binary_matrix.reshape(len(binary_matrix), -1), axis=1, bitorder=bitorder).reshape(-1)
 
-    return byte_array
+    return np.packbits(binary_matrix.reshape(-1), bitorder=bitorder)
 
 
-def byte_array_to_matrix(byte_array, dims):
-    # Number of bits
-    num_bits = dims[0] * dims[1]
+def unpack_matrix(buffer, dims, bitorder='big', pad_rows=False):
+    """
+    Unpacks the bytes produced by 'pack_matrix'
+    :param buffer: bytes-like object
+    :param dims: dimensions of the matrix
+    :param bitorder: bit order used for packing
+    :param pad_rows: whether every row starts at a byte boundary
+    :return: uint8 matrix of zeros and ones
+    """
+    rows, columns = dims
+    packed = np.frombuffer(buffer, dtype=np.uint8)
 
-    # Convert byte array to a list of bits
-    bit_list = []
-    for byte in byte_array:
-        # Get 8 bits from each byte
-        bit_list.extend([int(bit) for bit in f'{byte:08b}'])
+    if pad_rows:
+        packed = packed[:rows * _row_bytes(columns)].reshape(rows, -1)
+        return np.unpackbits(packed, axis=1, count=columns, bitorder=bitorder)
 
-    # Truncate the list to the exact number of bits needed (in case of padding)
-    bit_list = bit_list[:num_bits]
+    return np.unpackbits(packed, count=rows * columns, bitorder=bitorder).reshape(dims)
 
-    # Convert list of bits back to a numpy array
-    bit_array = np.array(bit_list, dtype=np.uint8)
 
-    # Reshape the array to the original dimensions
-    matrix = bit_array.reshape(dims)
+def matrix_to_byte_array(binary_matrix, bitorder='big', pad_rows=False):
+    return bytearray(pack_matrix(binary_matrix, bitorder, pad_rows))
+
+
+def matrix_to_memoryview(binary_matrix, bitorder='big', pad_rows=False):
+    """
+    Packs a binary matrix and exposes the packed array without copying it
+    """
+    return memoryview(pack_matrix(binary_matrix, bitorder, pad_rows))
+
+
+def byte_array_to_matrix(byte_array, dims, bitorder='big', pad_rows=False):
+    return unpack_matrix(byte_array, dims, bitorder, pad_rows)
+
+
+def _block_rows(columns, rows_per_block, pad_rows):
+    """
+    Rounds the block height so that every block without row padding ends at a byte boundary,
+    which makes the concatenated blocks identical to the bytes of the whole matrix
+    """
+    if pad_rows:
+        return max(rows_per_block, 1)
+
+    alignment = 8 // math.gcd(columns, 8)
+    return max(rows_per_block // alignment, 1) * alignment
+
+
+def write_matrix(writable, binary_matrix, bitorder='big', pad_rows=False, rows_per_block=DEFAULT_ROWS_PER_BLOCK):
+    """
+    Serialises a matrix block by block, only one packed block is held in memory at a time.
+    The output is identical to 'pack_matrix' with the same options.
+    :param writable: binary file-like object, for a socket use socket.makefile('wb')
+    :param binary_matrix: matrix of zeros and ones, may be a memory-mapped array
+    :param bitorder: bit order of the packed bytes
+    :param pad_rows: start every row at a byte boundary
+    :param rows_per_block: approximate number of rows packed at once
+    :return: number of bytes written
+    """
+    rows, columns = binary_matrix.shape
+    block_rows = _block_rows(columns, rows_per_block, pad_rows)
+
+    written = 0
+    for start in range(0, rows, block_rows):
+        block = pack_matrix(binary_matrix[start:start + block_rows], bitorder, pad_rows)
+        writable.write(memoryview(block))
+        written += len(block)
+
+    return written
+
+
+def iter_matrix_blocks(readable, dims, bitorder='big', pad_rows=False, rows_per_block=DEFAULT_ROWS_PER_BLOCK):
+    """
+    Reads a matrix written by 'write_matrix' or 'pack_matrix' block by block
+    :param readable: binary file-like object
+    :param dims: dimensions of the matrix
+    :param bitorder: bit order of the packed bytes
+    :param pad_rows: whether every row starts at a byte boundary
+    :param rows_per_block: approximate number of rows unpacked at once
+    :return: generator of uint8 row blocks
+    """
+    rows, columns = dims
+    block_rows = _block_rows(columns, rows_per_block, pad_rows)
+
+    for start in range(0, rows, block_rows):
+        count = min(block_rows, rows - start)
+        size = count * _row_bytes(columns) if pad_rows else _row_bytes(count * columns)
+
+        block = readable.read(size)
+        if len(block) != size:
+            raise ValueError("Deserialisation error: matrix data is truncated")
+
+        yield unpack_matrix(block, (count, columns), bitorder, pad_rows)
+
+
+def read_matrix(readable, dims, bitorder='big', pad_rows=False, rows_per_block=DEFAULT_ROWS_PER_BLOCK):
+    """
+    Reads a whole matrix, unpacking it block by block into a single preallocated array
+    """
+    matrix = np.empty(dims, dtype=np.uint8)
+
+    start = 0
+    for block in iter_matrix_blocks(readable, dims, bitorder, pad_rows, rows_per_block):
+        matrix[start:start + len(block)] = block
+        start += len(block)
 
     return matrix
@@ -0,0 +1,213 @@
+import numpy as np
+
+WORD_BITS = 64
+
+
+def pack_rows(matrix):
+    """
+    Packs the rows of a binary matrix into 64-bit words.
+    Column j is stored in word j // 64 as bit j % 64.
+    :param matrix: r x c matrix of zeros and ones
+    :return: r x ceil(c / 64) uint64 matrix
+    """
+    matrix = np.asarray(matrix, dtype=np.uint8).reshape(len(matrix), -1)
+    words = -(-matrix.shape[1] // WORD_BITS)
+
+    packed = np.zeros((matrix.shape[0], words * 8), dtype=np.uint8)
+    packed[:, :-(-matrix.shape[1] // 8)] = np.packbits(matrix, axis=1, bitorder='little')
+
+    return packed.view('<u8')
+
+
+def unpack_rows(words, columns):
+    """
+    Unpacks the rows packed by 'pack_rows'
+    :param words: r x w uint64 matrix
+    :param columns: number of columns of the binary matrix
+    :return: r x columns uint8 matrix of zeros and ones
+    """
+    words = np.ascontiguousarray(words, dtype='<u8')
+    return np.unpackbits(words.view(np.uint8), axis=1, count=columns, bitorder='little')
+
+
+def multiply_packed(a, b):
+    """
+    Multiplies packed binary matrices with the method of the four Russians. Every group of 8 rows
+    of b is expanded into a table of its 256 XOR combinations, and every byte of a row of a selects
+    one table row, so a group takes a single gather and XOR over all rows of a.
+    :param a: r x ceil(m / 64) uint64 matrix packed by 'pack_rows'
+    :param b: m x w uint64 matrix packed by 'pack_rows'
+    :return: r x w packed product
+    """
+    # Byte g of a row holds columns 8g, ..., 8g + 7 in its bits 0, ..., 7
+    a_bytes = np.ascontiguousarray(a, dtype='<u8').view(np.uint8)
+    b = np.asarray(b, dtype=np.uint64)
+
+    product = np.zeros((a.shape[0], b.shape[1]), dtype=np.uint64)
+    table = np.zeros((256, b.shape[1]), dtype=np.uint64)
+    for group in range(-(-b.shape[0] // 8)):
+        # The padding bits of a are zero, so a short last group never selects stale table rows
+        for bit, row in enumerate(b[8 * group:8 * group + 8]):
+            table[1 << bit:2 << bit] = table[:1 << bit] ^ row
+        product ^= table[a_bytes[:, group]]
+
+    return product
+
+
+def permute_packed_columns(words, columns, permutation):
+    """
+    Permutes the columns of a packed matrix bit by bit, column j of the result is column permutation[j].
+    Every step moves bit b of all result words at once, so no unpacked copy of the matrix is made.
+    :param words: r x ceil(columns / 64) uint64 matrix packed by 'pack_rows'
+    :param columns: number of columns
+    :param permutation: index vector of length columns
+    :return: packed permuted matrix
+    """
+    words = np.asarray(words, dtype=np.uint64)
+    permutation = np.asarray(permutation, dtype=np.int64)
+
+    permuted = np.zeros_like(words)
+    for bit in range(WORD_BITS):
+        targets = np.arange(bit, columns, WORD_BITS)
+        sources = permutation[targets]
+        moved = (words[:, sources // WORD_BITS] >> (sources % WORD_BITS).astype(np.uint64)) & np.uint64(1)
+        permuted[:, :len(targets)] |= moved << np.uint64(bit)
+
+    return permuted
+
+
+def transpose_packed(words, columns):
+    """
+    Transposes a packed r x columns matrix
+    :return: packed columns x r matrix
+    """
+    return pack_rows(unpack_rows(words, columns).T)
+
+
+def invert_unit_lower_triangular(words, n):
+    """
+    Inverts a packed unit lower triangular n x n matrix L by blocked forward substitution of L X = I.
+    Once a group of 8 rows of X is solved, its table of XOR combinations eliminates the group
+    from all rows below with one gather, like in 'multiply_packed'.
+    :param words: n x ceil(n / 64) uint64 matrix packed by 'pack_rows', zero above the diagonal
+    :param n: matrix size
+    :return: packed inverse, again unit lower triangular
+    """
+    l_bytes = np.ascontiguousarray(words, dtype='<u8').view(np.uint8)
+
+    # Starts as the identity, row i becomes row i of the inverse
+    inverse = np.zeros((n, -(-n // WORD_BITS)), dtype=np.uint64)
+    diagonal = np.arange(n)
+    inverse[diagonal, diagonal // WORD_BITS] = np.uint64(1) << (diagonal % WORD_BITS).astype(np.uint64)
+
+    table = np.zeros((256, inverse.shape[1]), dtype=np.uint64)
+    for group in range(-(-n // 8)):
+        start, end = 8 * group, min(8 * group + 8, n)
+
+        # Rows above the group are eliminated already, what is left are the entries inside the group
+        for row in range(start + 1, end):
+            for column in range(start, row):
+                if l_bytes[row, group] >> (column - start) & 1:
+                    inverse[row] ^= inverse[column]
+
+        for bit, row in enumerate(inverse[start:end]):
+            table[1 << bit:2 << bit] = table[:1 << bit] ^ row
+        inverse[end:] ^= table[l_bytes[end:, group]]
+
+    return inverse
+
+
+def column_bits(words, column):
+    """
+    Extracts one column of a packed matrix as a boolean vector
+    """
+    word, bit = divmod(column, WORD_BITS)
+    return ((words[:, word] >> np.uint64(bit)) & np.uint64(1)) != 0
+
+
+def reduced_row_echelon_form(words, columns):
+    """
+    Brings a packed binary matrix to the reduced row echelon form over GF(2).
+    Every pivot eliminates its column from all other rows with a single masked XOR.
+    :param words: r x w uint64 matrix packed by 'pack_rows'
+    :param columns: number of columns of the binary matrix
+    :return: tuple (reduced packed matrix, list of pivot columns), the first len(pivots) rows are non-zero
+    """
+    words = np.array(words, dtype=np.uint64)
+    rows = words.shape[0]
+    pivots = []
+
+    for column in range(columns):
+        rank = len(pivots)
+        if rank == rows:
+            break
+
+        candidates = np.flatnonzero(column_bits(words[rank:], column))
+        if len(candidates) == 0:
+            continue
+
+        # Move the pivot row up
+        pivot = rank + candidates[0]
+        if pivot != rank:
+            words[[rank, pivot]] = words[[pivot, rank]]
+
+        # Clear the column in every other row at once. While every column so far held a pivot,
+        # the pivot row is zero left of the current column and the words there can be skipped.
+        mask = column_bits(words, column)
+        mask[rank] = False
+        first_word = column // WORD_BITS if rank == column else 0
+        rows_to_clear = np.flatnonzero(mask)
+        words[rows_to_clear, first_word:] ^= words[rank, first_word:]
+
+        pivots.append(column)
+
+    return words, pivots
+
+
+def invert_packed(words, n):
+    """
+    Inverts a packed n x n binary matrix with Gauss-Jordan elimination of [A | I]
+    :param words: n x ceil(n / 64) uint64 matrix packed by 'pack_rows'
+    :param n: matrix size
+    :return: packed inverse, or None if the matrix is singular
+    """
+    identity = pack_rows(np.identity(n, dtype=np.uint8))
+    augmented = np.hstack((words, identity))
+
+    # Pivots are searched only among the columns of A, the identity part follows the row operations
+    reduced, pivots = reduced_row_echelon_form(augmented, n)
+    if len(pivots) < n:
+        return None
+
+    return np.ascontiguousarray(reduced[:, words.shape[1]:])
+
+
+def systematic_form(h):
+    """
+    Finds the generator matrix of the binary code with parity-check matrix h
+    in systematic form. Columns are reordered so that G[:, column_order] = [I_k | Q].
+    :param h: r x n parity-check matrix of zeros and ones
+    :return: tuple (k x (n - k) uint8 matrix Q, column order of length n)
+    """
+    n = h.shape[1]
+    reduced, pivots = reduced_row_echelon_form(pack_rows(h), n)
+
+    # Free columns form the information set, every pivot column is a function of them
+    information_set = np.setdiff1d(np.arange(n), pivots)
+    Q = unpack_rows(reduced[:len(pivots)], n)[:, information_set].T
+
+    return np.ascontiguousarray(Q), np.concatenate((information_set, pivots))
+
+
+def generator_from_systematic_form(Q, column_order):
+    """
+    Rebuilds the generator matrix from its systematic form
+    :param Q: k x (n - k) matrix of the systematic form
+    :param column_order: column order returned by 'systematic_form'
+    :return: k x n uint8 generator matrix
+    """
+    k = Q.shape[0]
+    G = np.zeros((k, len(column_order)), dtype=np.uint8)
+    G[:, column_order] = np.hstack((np.identity(k, dtype=np.uint8), Q))
+
+    return G
@@ -1,49 +1,64 @@
 import numpy as np
-from scipy.linalg import null_space
-
-
-def generate_x_matrix(coefficients, GF2m):
-    t = len(coefficients) - 1
-    x = np.zeros((t, t), dtype=int)
 
+from McEliece.gf2_matrix_utils import systematic_form, generator_from_systematic_form
+
+
+def select_support(g_poly, n, GF2m):
+    """
+    Picks the first n elements of GF(2^m) which are not roots of the Goppa polynomial
+    :param g_poly: Goppa polynomial
+    :param n: code length
+    :param GF2m: field GF(2^m)
+    :return: FieldArray of n elements
+    """
+    elements = GF2m.elements
+    return elements[g_poly(elements) != 0][:n]
+
+
+def generate_h_matrix(L, g_poly, GF2m):
+    """
+    Computes the parity-check matrix H = XYZ of the Goppa code in O(t * n) memory.
+    Row i of XY equals g_(t-i) + L * (row i - 1 of XY), so the rows are built with
+    Horner's scheme, and Z is applied by scaling columns with g(L)^-1 through broadcasting.
+    :param L: support of the code, FieldArray of n elements
+    :param g_poly: Goppa polynomial of degree t
+    :param GF2m: field GF(2^m)
+    :return: t x n matrix over GF(2^m)
+    """
+    coefficients = g_poly.coeffs
+    t = g_poly.degree
+
+    # g evaluated on the whole support at once
+    column_scale = g_poly(L) ** -1
+
+    H = GF2m.Zeros((t, len(L)))
+    row = GF2m.Zeros(len(L))
     for i in range(t):
-        for j in range(i + 1):
-            x[i, j] = coefficients[i - j]
-
-    return GF2m(x)
+        row = coefficients[i] + L * row
+        H[i] = row * column_scale
 
+    return H
 
-def generate_y_matrix(L, t, GF2m):
-    n = len(L)
-    y = np.zeros((t, n), dtype=int)
-
-    for i in range(t):
-        for j in range(n):
-            y[i, j] = L[j] ** i
-
-    return GF2m(y)
 
+def binary_expansion(H):
+    """
+    Expands every GF(2^m) entry of the parity-check matrix into a column of m bits
+    :param H: t x n matrix over GF(2^m)
+    :return: (t * m) x n uint8 matrix
+    """
+    t, n = H.shape
+    return np.asarray(H.vector(), dtype=np.uint8).transpose(0, 2, 1).reshape(-1, n)
 
-def generate_z_matrix(L, g, GF2m):
-    n = len(L)
-    z = np.zeros((n, n), dtype=int)
 
-    for i in range(n):
-        z[i, i] = g(L[i]) ** -1
-
-    return GF2m(z)
+def generate_systematic_g_matrix(H):
+    """
+    Computes the generator matrix of the binary Goppa code exactly over GF(2)
+    :param H: parity-check matrix over GF(2^m)
+    :return: tuple (Q, column order) of the systematic form G[:, column_order] = [I_k | Q]
+    """
+    return systematic_form(binary_expansion(H))
 
 
 def generate_g_matrx(H, GF2m):
-    # Convert H to binary for conforming with binary Goppa codes
-    vectorized_rows = [np.column_stack([element.vector() for element in row]) for row in H]
-    h_bin = np.vstack(vectorized_rows)
-
-    h_bin_np = h_bin.view(np.ndarray).astype(np.int64)
-
-    # Use scipy to find the nullspace of the matrix
-    nullspace_h_bin = null_space(h_bin_np)
-    nullspace_int = np.round(nullspace_h_bin).astype(np.int64) % 2
-
-    return GF2m(nullspace_int).T
-
+    Q, column_order = generate_systematic_g_matrix(H)
+    return GF2m(generator_from_systematic_form(Q, column_order))
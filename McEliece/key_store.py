@@ -0,0 +1,84 @@
+"""
+Binary file format of McEliece public keys, loaded with a memory map so that
+worker processes on one host share the page-cached key and start in O(1).
+
+File layout:
+    MAGIC | version (1) | bit order (1) | reserved (2) | n (4) | k (4) | t (4) | m (4) | zero padding up to 64 bytes
+    k rows of G', every row is ceil(n / 64) little-endian 64-bit words
+The body starts at a 64 byte offset, so it can be mapped as an aligned uint64 matrix.
+"""
+import struct
+
+import numpy as np
+
+from McEliece.gf2_matrix_utils import WORD_BITS
+from McEliece.packed_binary_matrix import PackedBinaryMatrix
+
+MAGIC = b'MCPK'
+VERSION = 1
+HEADER_LENGTH = 64
+
+# Column j of a row is bit j % 64 of word j // 64, the layout of PackedBinaryMatrix
+BIT_ORDER_LITTLE = 0
+
+_HEADER_FORMAT = '>4sBB2xIIII'
+
+
+def pack_header(n, k, t, m):
+    """
+    :return: header of a public key file, padded to HEADER_LENGTH bytes
+    """
+    return struct.pack(_HEADER_FORMAT, MAGIC, VERSION, BIT_ORDER_LITTLE, n, k, t, m).ljust(HEADER_LENGTH, b'\x00')
+
+
+def save_public_key(path, mceliece):
+    """
+    Writes the public key of a McEliece instance to a file
+    :param path: file path
+    :param mceliece: McEliece instance or McEliecePublicKey
+    """
+    with open(path, 'wb') as file:
+        file.write(pack_header(mceliece.n, mceliece.k, mceliece.t, mceliece.m))
+        file.write(memoryview(np.ascontiguousarray(mceliece.G_prime.words, dtype='<u8')))
+
+
+def parse_header(header):
+    """
+    Validates the header of a public key
+    :param header: buffer starting with the header
+    :return: tuple (n, k, t, m)
+    """
+    if len(header) < HEADER_LENGTH:
+        raise ValueError("Key file error: header is truncated")
+
+    magic, version, bit_order, n, k, t, m = struct.unpack_from(_HEADER_FORMAT, header)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Key file error: unsupported key format")
+    if bit_order != BIT_ORDER_LITTLE:
+        raise ValueError(f"Key file error: unsupported bit order {bit_order}")
+    if k != n - t * m:
+        raise ValueError("Key file error: inconsistent code parameters")
+
+    return n, k, t, m
+
+
+def read_header(path):
+    """
+    Reads and validates the header of a public key file
+    :param path: file path
+    :return: tuple (n, k, t, m)
+    """
+    with open(path, 'rb') as file:
+        return parse_header(file.read(HEADER_LENGTH))
+
+
+def load_public_key(path):
+    """
+    Maps the public key matrix of a key file read-only, nothing is read from the body until it is used
+    :param path: file path
+    :return: tuple (read-only packed k x n matrix G', t, m)
+    """
+    n, k, t, m = read_header(path)
+    words = np.memmap(path, dtype='<u8', mode='r', offset=HEADER_LENGTH, shape=(k, -(-n // WORD_BITS)))
+
+    return PackedBinaryMatrix(words, n), t, m
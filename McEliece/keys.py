@@ -0,0 +1,252 @@
+"""
+Compact containers of McEliece keys and ciphertexts.
+
+Every container is a slotted dataclass over contiguous little-endian NumPy arrays in the
+layouts of the existing formats: binary matrices are rows of 64-bit words as in 'key_store',
+ciphertexts are bit strings packed by 'MatricesSerialisation'. 'from_buffer' returns views
+into the given buffer (bytes, mmap, memoryview, ...) without copying, and pickling sends
+the compact arrays only.
+
+Private key layout:
+    MAGIC | version (1) | reserved (3) | n (4) | t (4) | m (4) | zero padding up to 64 bytes
+    g_poly, L, H as 16-bit field elements | information_set, P as 32-bit indices | S, S_inv, G' as words
+Every section starts at a multiple of 8 bytes.
+"""
+import struct
+from dataclasses import dataclass
+
+import numpy as np
+
+from MatricesSerialisation.binary_matrix_serialisation import pack_matrix, unpack_matrix
+from McEliece.gf2_matrix_utils import WORD_BITS
+from McEliece.key_store import HEADER_LENGTH, pack_header, parse_header
+from McEliece.packed_binary_matrix import PackedBinaryMatrix
+
+PRIVATE_KEY_MAGIC = b'MCSK'
+CIPHERTEXT_MAGIC = b'MCCT'
+VERSION = 1
+
+_PRIVATE_KEY_HEADER_FORMAT = '>4sB3xIII'
+_CIPHERTEXT_HEADER_FORMAT = '>4sB3xI'
+_CIPHERTEXT_HEADER_LENGTH = struct.calcsize(_CIPHERTEXT_HEADER_FORMAT)
+
+# Field elements of GF(2^m) are stored as 16-bit integers
+_MAX_FIELD_DEGREE = 16
+
+
+def _words_per_row(columns):
+    return -(-columns // WORD_BITS)
+
+
+def _section_length(dtype, shape):
+    """
+    Length of an array section padded to a multiple of 8 bytes
+    """
+    return -(-int(np.prod(shape)) * np.dtype(dtype).itemsize // 8) * 8
+
+
+def _buffer_length(buffer):
+    return memoryview(buffer).nbytes
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class McEliecePublicKey:
+    """
+    Public key G' of McEliece, k x n over GF(2) packed into 64-bit words
+    """
+
+    n: int
+    t: int
+    m: int
+    words: np.ndarray
+
+    @classmethod
+    def from_mceliece(cls, mceliece):
+        return cls(mceliece.n, mceliece.t, mceliece.m, np.ascontiguousarray(mceliece.G_prime.words, dtype='<u8'))
+
+    @property
+    def k(self):
+        return self.n - self.t * self.m
+
+    @property
+    def G_prime(self):
+        return PackedBinaryMatrix(self.words, self.n)
+
+    @property
+    def nbytes(self):
+        return self.words.nbytes
+
+    def to_bytes(self):
+        """
+        Serialises the key in the format of a 'key_store' key file
+        """
+        return pack_header(self.n, self.k, self.t, self.m) + self.words.tobytes()
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        """
+        Wraps a serialised key without copying, the matrix is a read-only view into the buffer
+        :param buffer: bytes-like object produced by 'to_bytes' or the contents of a key file
+        :return: public key
+        """
+        n, k, t, m = parse_header(buffer)
+        shape = (k, _words_per_row(n))
+        if _buffer_length(buffer) < HEADER_LENGTH + _section_length('<u8', shape):
+            raise ValueError("Key file error: key matrix is truncated")
+
+        words = np.frombuffer(buffer, dtype='<u8', count=shape[0] * shape[1], offset=HEADER_LENGTH)
+        return cls(n, t, m, words.reshape(shape))
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class McEliecePrivateKey:
+    """
+    Private key of McEliece together with its public key G'
+    """
+
+    n: int
+    t: int
+    m: int
+    g_poly: np.ndarray
+    L: np.ndarray
+    H: np.ndarray
+    information_set: np.ndarray
+    P: np.ndarray
+    S: np.ndarray
+    S_inv: np.ndarray
+    G_prime: np.ndarray
+
+    @staticmethod
+    def _layout(n, t, m):
+        """
+        :return: list of (field name, dtype, shape) in the order of the serialised sections
+        """
+        k = n - t * m
+        return [('g_poly', '<u2', (t + 1,)), ('L', '<u2', (n,)), ('H', '<u2', (t, n)),
+                ('information_set', '<u4', (k,)), ('P', '<u4', (n,)),
+                ('S', '<u8', (k, _words_per_row(k))), ('S_inv', '<u8', (k, _words_per_row(k))),
+                ('G_prime', '<u8', (k, _words_per_row(n)))]
+
+    @classmethod
+    def from_key_material(cls, key_material):
+        """
+        Converts the dictionary of 'McEliece.export_key_material' to the compact container
+        """
+        n, t, m = key_material['n'], key_material['t'], key_material['m']
+        if m > _MAX_FIELD_DEGREE:
+            raise ValueError(f"Field elements of GF(2^{m}) do not fit into {_MAX_FIELD_DEGREE} bits")
+
+        arrays = {name: np.ascontiguousarray(key_material[name], dtype=dtype).reshape(shape)
+                  for name, dtype, shape in cls._layout(n, t, m)}
+        return cls(n, t, m, **arrays)
+
+    @classmethod
+    def from_mceliece(cls, mceliece):
+        return cls.from_key_material(mceliece.export_key_material())
+
+    def to_key_material(self):
+        """
+        :return: dictionary accepted as 'key_material' by the McEliece constructor
+        """
+        key_material = {'n': self.n, 't': self.t, 'm': self.m}
+        for name, dtype, _ in self._layout(self.n, self.t, self.m):
+            array = getattr(self, name)
+            key_material[name] = array if dtype == '<u8' else array.astype(np.int64)
+
+        return key_material
+
+    def public_key(self):
+        return McEliecePublicKey(self.n, self.t, self.m, self.G_prime)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name, _, _ in self._layout(self.n, self.t, self.m))
+
+    def to_bytes(self):
+        header = struct.pack(_PRIVATE_KEY_HEADER_FORMAT, PRIVATE_KEY_MAGIC, VERSION, self.n, self.t, self.m)
+        sections = [header.ljust(HEADER_LENGTH, b'\x00')]
+        for name, _, _ in self._layout(self.n, self.t, self.m):
+            data = getattr(self, name).tobytes()
+            sections.append(data.ljust(_section_length(np.uint8, (len(data),)), b'\x00'))
+
+        return b''.join(sections)
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        """
+        Wraps a serialised private key without copying, every array is a read-only view into the buffer
+        :param buffer: bytes-like object produced by 'to_bytes'
+        :return: private key
+        """
+        if _buffer_length(buffer) < HEADER_LENGTH:
+            raise ValueError("Key file error: header is truncated")
+
+        magic, version, n, t, m = struct.unpack_from(_PRIVATE_KEY_HEADER_FORMAT, buffer)
+        if magic != PRIVATE_KEY_MAGIC or version != VERSION:
+            raise ValueError("Key file error: unsupported key format")
+        if n <= t * m or m > _MAX_FIELD_DEGREE:
+            raise ValueError("Key file error: inconsistent code parameters")
+
+        layout = cls._layout(n, t, m)
+        if _buffer_length(buffer) < HEADER_LENGTH + sum(_section_length(dtype, shape) for _, dtype, shape in layout):
+            raise ValueError("Key file error: key is truncated")
+
+        arrays = {}
+        offset = HEADER_LENGTH
+        for name, dtype, shape in layout:
+            array = np.frombuffer(buffer, dtype=dtype, count=int(np.prod(shape)), offset=offset)
+            arrays[name] = array.reshape(shape)
+            offset += _section_length(dtype, shape)
+
+        return cls(n, t, m, **arrays)
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class McElieceCiphertext:
+    """
+    Ciphertext of McEliece, a binary vector of length n packed eight bits per byte
+    """
+
+    n: int
+    packed: np.ndarray
+
+    @classmethod
+    def from_bits(cls, bits):
+        """
+        Packs a binary vector returned by 'McEliece.encrypt_bytes'
+        """
+        return cls(len(bits), pack_matrix(bits))
+
+    @property
+    def bits(self):
+        """
+        Unpacked binary vector accepted by 'McEliece.decrypt_bytes'
+        """
+        return unpack_matrix(self.packed, (1, self.n))[0]
+
+    @property
+    def nbytes(self):
+        return self.packed.nbytes
+
+    def to_bytes(self):
+        return struct.pack(_CIPHERTEXT_HEADER_FORMAT, CIPHERTEXT_MAGIC, VERSION, self.n) + self.packed.tobytes()
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        """
+        Wraps a serialised ciphertext without copying
+        :param buffer: bytes-like object produced by 'to_bytes'
+        :return: ciphertext
+        """
+        if _buffer_length(buffer) < _CIPHERTEXT_HEADER_LENGTH:
+            raise ValueError("Deserialisation error: header is truncated")
+
+        magic, version, n = struct.unpack_from(_CIPHERTEXT_HEADER_FORMAT, buffer)
+        if magic != CIPHERTEXT_MAGIC or version != VERSION:
+            raise ValueError("Deserialisation error: unsupported ciphertext format")
+
+        packed = np.frombuffer(buffer, dtype=np.uint8, offset=_CIPHERTEXT_HEADER_LENGTH)
+        if len(packed) != -(-n // 8):
+            raise ValueError("Deserialisation error: ciphertext has unexpected length")
+
+        return cls(n, packed)
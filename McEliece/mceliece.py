@@ -1,59 +1,154 @@
 import numpy as np
-from galois import GF, irreducible_poly
-import random
+from galois import GF, Poly, irreducible_poly
 
-from McEliece.goppa_code_utils import generate_x_matrix, generate_y_matrix, generate_z_matrix, generate_g_matrx
-from McEliece.utils import generate_s_matrix, generate_p_matrix
-from OAEP.oaep import oaep_encode
+from McEliece.goppa_code_utils import select_support, generate_h_matrix, generate_systematic_g_matrix
+from McEliece.gf2_matrix_utils import generator_from_systematic_form
+from McEliece.key_store import load_public_key
+from McEliece.keys import McEliecePublicKey, McEliecePrivateKey, McElieceCiphertext
+from McEliece.packed_binary_matrix import PackedBinaryMatrix, unpack_vector, random_error_vector
+from McEliece.patterson_decoder import PattersonDecoder
+from McEliece.utils import generate_s_matrix, generate_permutation
+from Instrumentation.metrics import timed
+from OAEP.oaep import OAEP
 
 
 class McEliece:
-    def __init__(self, n, t, m):
+    def __init__(self, n, t, m, public_key=None, key_material=None):
+        """
+        :param n: code length
+        :param t: number of correctable errors
+        :param m: degree of the field GF(2^m)
+        :param public_key: packed k x n public matrix G' or McEliecePublicKey, if given no key pair
+        is generated and the instance can only encrypt
+        :param key_material: dictionary returned by 'export_key_material' or McEliecePrivateKey,
+        if given the key pair is restored from it instead of being generated
+        """
         self.n = n
         self.t = t
         self.m = m
         self.k = n - t * m
-        self.GF2m = GF(2 ** self.m)
+        self.GF2m = None
         self.L = None
         self.g_poly = None
         self.S = None
+        self.S_inv = None
         self.G = None
+        self.information_set = None
         self.P = None
         self.G_prime = None
+        self.decoder = None
+        self.oaep = OAEP.for_parameters(L=b'', k=self.k // 8)
+
+        if isinstance(public_key, McEliecePublicKey):
+            public_key = public_key.G_prime
+        if isinstance(key_material, McEliecePrivateKey):
+            key_material = key_material.to_key_material()
+
+        if key_material is not None:
+            self._load_key_material(key_material)
+        elif public_key is None:
+            self._generate_key_pair()
+        elif public_key.shape != (self.k, self.n):
+            raise ValueError(f"Public key must be a {self.k} x {self.n} matrix")
+        else:
+            self.G_prime = public_key
+
+    @classmethod
+    def from_key_file(cls, path):
+        """
+        Creates an encryption-only instance with the memory-mapped public key of a key file
+        :param path: file written by 'save_public_key'
+        :return: McEliece instance
+        """
+        G_prime, t, m = load_public_key(path)
+        return cls(G_prime.columns, t, m, public_key=G_prime)
+
+    @classmethod
+    def from_public_key(cls, public_key):
+        """
+        Creates an encryption-only instance for a public key container
+        :param public_key: McEliecePublicKey
+        :return: McEliece instance
+        """
+        return cls(public_key.n, public_key.t, public_key.m, public_key=public_key)
+
+    def export_public_key(self):
+        """
+        :return: McEliecePublicKey
+        """
+        return McEliecePublicKey.from_mceliece(self)
+
+    def export_private_key(self):
+        """
+        :return: McEliecePrivateKey, accepted as 'key_material' by the constructor
+        """
+        return McEliecePrivateKey.from_mceliece(self)
 
-        self._generate_key_pair()
+    def export_key_material(self):
+        """
+        Exports the key pair as plain integers and NumPy arrays, which can be pickled
+        and sent between processes. Field elements are stored as their integer representations.
+        :return: dictionary accepted as 'key_material' by the constructor
+        """
+        if self.decoder is None:
+            raise ValueError("Only a complete key pair can be exported")
+
+        return {
+            'n': self.n, 't': self.t, 'm': self.m,
+            'g_poly': np.asarray(self.g_poly.coeffs, dtype=np.int64),
+            'L': np.asarray(self.L, dtype=np.int64),
+            'H': np.asarray(self.decoder.H, dtype=np.int64),
+            'S': self.S.words, 'S_inv': self.S_inv.words,
+            'information_set': self.information_set, 'P': self.P,
+            'G_prime': self.G_prime.words,
+        }
+
+    def _load_key_material(self, key_material):
+        """
+        Restores the key pair exported by 'export_key_material'.
+        The private generator matrix G is not part of the key material and stays None.
+        :raises ValueError: if the key material belongs to other parameters
+        """
+        parameters = (key_material['n'], key_material['t'], key_material['m'])
+        if parameters != (self.n, self.t, self.m):
+            raise ValueError(f"Key material for (n, t, m) = {parameters} does not match this instance")
 
+        self.GF2m = GF(2 ** self.m)
+        self.g_poly = Poly(self.GF2m(key_material['g_poly']))
+        self.L = self.GF2m(key_material['L'])
+        self.S = PackedBinaryMatrix(key_material['S'], self.k)
+        self.S_inv = PackedBinaryMatrix(key_material['S_inv'], self.k)
+        self.information_set = key_material['information_set']
+        self.P = key_material['P']
+        self.G_prime = PackedBinaryMatrix(key_material['G_prime'], self.n)
+        self.decoder = PattersonDecoder(self.g_poly, self.L, self.GF2m(key_material['H']), self.GF2m)
+
+    @timed('mceliece.keygen')
     def _generate_key_pair(self):
         """
 
         :return:
         """
+        self.GF2m = GF(2 ** self.m)
+
         # Generate the Goppa polynomial
         self.g_poly = irreducible_poly(order=2 ** self.m, degree=self.t, method="random")
 
         # Pick a subset L
-        self.L = []
-        for element in self.GF2m.elements:
-            if self.g_poly(element) != 0:
-                self.L.append(element)
-            if len(self.L) == self.n:
-                break
+        self.L = select_support(self.g_poly, self.n, self.GF2m)
 
         # Generate parity matrix H = XYZ
-        g_coefficients = [int(coefficient) for coefficient in self.g_poly.coeffs]
-
-        X = generate_x_matrix(g_coefficients, self.GF2m)
-        Y = generate_y_matrix(self.L, self.t, self.GF2m)
-        Z = generate_z_matrix(self.L, self.g_poly, self.GF2m)
-
-        H = X @ Y @ Z
+        H = generate_h_matrix(self.L, self.g_poly, self.GF2m)
 
         # Generate public-key matrix G'
-        self.S = generate_s_matrix(self.k, self.GF2m)
-        self.G = generate_g_matrx(H, self.GF2m)
-        self.P = generate_p_matrix(self.n, self.GF2m)
+        self.S, self.S_inv = generate_s_matrix(self.k)
+        Q, column_order = generate_systematic_g_matrix(H)
+        self.G = PackedBinaryMatrix.from_dense(generator_from_systematic_form(Q, column_order)[:self.k])
+        self.information_set = column_order[:self.k]
+        self.P = generate_permutation(self.n)
 
-        self.G_prime = self.S @ self.G @ self.P
+        self.G_prime = (self.S @ self.G).permute_columns(self.P)
+        self.decoder = PattersonDecoder(self.g_poly, self.L, H, self.GF2m)
 
     def encrypt(self, plaintext):
         """
@@ -61,24 +156,60 @@ class McEliece:
         :param plaintext: message to encrypt
         :return: encrypted message
         """
+        return self.encrypt_bytes(plaintext.encode('ascii'))
+
+    @timed('mceliece.encrypt')
+    def encrypt_bytes(self, message):
+        """
+        Encrypts given byte message
+        :param message: bytes to encrypt, at most k // 8 - 42 of them
+        :return: encrypted message
+        """
 
         # Calculate the mask size
         mask_length_in_bytes = self.k // 8
-        padded_message = oaep_encode(plaintext.encode('ascii'), b'', mask_length_in_bytes)
+        padded_message = self.oaep.encode(message)
 
-        # Convert bytes to a list of bits
-        bit_list = [int(bit) for byte in padded_message for bit in format(byte, '08b')]
+        # Convert bytes to a binary array, padded with zeros up to k bits
+        msg = np.zeros(self.k, dtype=np.uint8)
+        msg[:8 * mask_length_in_bytes] = np.unpackbits(np.frombuffer(padded_message, dtype=np.uint8))
 
-        # Convert the list to a binary array
-        msg = np.array(bit_list, dtype=np.uint8)
+        # Encrypt the binary array and add an error vector of weight t
+        y = self.G_prime.vector_product(msg) ^ random_error_vector(self.n, self.t)
 
-        # Encrypt the binary array
-        y = np.array(self.GF2m(msg) @ self.G_prime)
+        return unpack_vector(y, self.n)
 
-        e = list(range(self.n))
-        random.shuffle(e)
+    def decrypt(self, ciphertext):
+        """
+        Decrypts given ciphertext message
+        :param ciphertext: binary vector of length n
+        :return: original message
+        """
+        return self.decrypt_bytes(ciphertext).decode('ascii')
+
+    @timed('mceliece.decrypt')
+    def decrypt_bytes(self, ciphertext):
+        """
+        Decrypts given ciphertext to the original byte message
+        :param ciphertext: binary vector of length n or McElieceCiphertext
+        :return: original bytes
+        """
+        if self.decoder is None:
+            raise ValueError("Decryption error: the private key is not available")
+        if isinstance(ciphertext, McElieceCiphertext):
+            ciphertext = ciphertext.bits
 
-        for err_loc in e[: self.t]:
-            y[err_loc] ^= 1
+        # Undo the permutation by scattering every column j back to column P[j]
+        word = np.empty(self.n, dtype=np.uint8)
+        word[self.P] = ciphertext
+
+        # Correct the errors of the Goppa codeword
+        codeword = word ^ self.decoder.decode(word)
+
+        # G is the identity on the information set, so the codeword holds m * S there
+        msg = unpack_vector(self.S_inv.vector_product(codeword[self.information_set]), self.k)
+
+        mask_length_in_bytes = self.k // 8
+        padded_message = np.packbits(msg[:8 * mask_length_in_bytes]).tobytes()
 
-        return y
\ No newline at end of file
+        return self.oaep.decode(padded_message)
@@ -0,0 +1,118 @@
+import numpy as np
+
+from McEliece.gf2_matrix_utils import WORD_BITS, pack_rows, unpack_rows, multiply_packed, permute_packed_columns
+
+# Number of set bits of every byte value
+_BYTE_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+
+def popcount(words):
+    """
+    Counts the set bits of packed vectors
+    :param words: uint64 array, the last axis holds the words of one vector
+    :return: number of set bits of every vector
+    """
+    words = np.ascontiguousarray(words, dtype=np.uint64)
+    return _BYTE_POPCOUNT[words.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+
+def pack_vector(bits):
+    """
+    Packs a binary vector into 64-bit words
+    """
+    return pack_rows(np.asarray(bits, dtype=np.uint8)[None, :])[0]
+
+
+def unpack_vector(words, length):
+    """
+    Unpacks a binary vector packed by 'pack_vector'
+    """
+    return unpack_rows(np.asarray(words)[None, :], length)[0]
+
+
+def random_error_vector(n, t):
+    """
+    Samples a packed binary vector of length n and weight exactly t
+    :param n: vector length
+    :param t: number of set bits
+    :return: uint64 words of the vector
+    """
+    positions = np.random.choice(n, t, replace=False).astype(np.uint64)
+
+    words = np.zeros(-(-n // WORD_BITS), dtype=np.uint64)
+    np.bitwise_or.at(words, positions // np.uint64(WORD_BITS), np.uint64(1) << (positions % np.uint64(WORD_BITS)))
+
+    return words
+
+
+class PackedBinaryMatrix:
+    """
+    Matrix over GF(2) with every row packed into 64-bit words,
+    column j of a row is stored in word j // 64 as bit j % 64.
+    """
+
+    __slots__ = ('words', 'columns')
+
+    def __init__(self, words, columns):
+        """
+        :param words: rows x ceil(columns / 64) uint64 matrix
+        :param columns: number of columns
+        """
+        self.words = words
+        self.columns = columns
+
+    @classmethod
+    def from_dense(cls, matrix):
+        """
+        Packs a dense matrix of zeros and ones
+        """
+        matrix = np.asarray(matrix, dtype=np.uint8)
+        return cls(pack_rows(matrix), matrix.shape[1])
+
+    def to_dense(self):
+        """
+        Unpacks the matrix to a dense uint8 matrix of zeros and ones
+        """
+        return unpack_rows(self.words, self.columns)
+
+    @property
+    def shape(self):
+        return self.words.shape[0], self.columns
+
+    @property
+    def nbytes(self):
+        return self.words.nbytes
+
+    def vector_product(self, bits):
+        """
+        Multiplies a row vector by the matrix, XOR-accumulating the rows selected by the vector
+        :param bits: binary vector of length equal to the number of rows
+        :return: packed product vector
+        """
+        selected = self.words[np.asarray(bits, dtype=bool)]
+        return np.bitwise_xor.reduce(selected, axis=0) if len(selected) else np.zeros_like(self.words[0])
+
+    def product_with_column(self, words):
+        """
+        Multiplies the matrix by a column vector, every entry of the result is
+        the parity of the popcount of a row ANDed with the vector
+        :param words: packed vector of length equal to the number of columns
+        :return: uint8 product vector
+        """
+        return (popcount(self.words & words) & 1).astype(np.uint8)
+
+    def permute_columns(self, permutation):
+        """
+        Applies a column permutation to the packed bits, column j of the result is column permutation[j]
+        :param permutation: index vector of length equal to the number of columns
+        :return: permuted matrix
+        """
+        return PackedBinaryMatrix(permute_packed_columns(self.words, self.columns, permutation), self.columns)
+
+    def __matmul__(self, other):
+        if not isinstance(other, PackedBinaryMatrix):
+            return NotImplemented
+        if self.columns != other.words.shape[0]:
+            raise ValueError(f"Cannot multiply {self.shape} and {other.shape} matrices")
+
+        return PackedBinaryMatrix(multiply_packed(self.words, other.words), other.columns)
@@ -0,0 +1,93 @@
+import numpy as np
+from galois import Poly, egcd
+
+
+class PattersonDecoder:
+    """
+    Corrects up to t errors of a binary Goppa code with Patterson's algorithm.
+    Polynomials live in GF(2^m)[x]/g(x) and are handled with galois Poly objects.
+    """
+
+    def __init__(self, g_poly, L, H, GF2m):
+        """
+        :param g_poly: Goppa polynomial g of degree t
+        :param L: support of the code, FieldArray of n elements of GF(2^m)
+        :param H: t x n parity-check matrix over GF(2^m), row i gives the coefficient of x^(t - 1 - i) of the syndrome
+        :param GF2m: field GF(2^m)
+        """
+        self.g_poly = g_poly
+        self.L = L
+        self.H = H
+        self.GF2m = GF2m
+        self.t = g_poly.degree
+        self.x = Poly.Identity(GF2m)
+
+        # Squaring is linear in GF(2^m)[x]/g(x), its inverse maps x to x^(2^(mt - 1))
+        self.sqrt_x = pow(self.x, 2 ** (GF2m.degree * self.t - 1), g_poly)
+
+    def syndrome(self, word):
+        """
+        Computes the syndrome polynomial S(x) = sum_i word_i / (x - L_i) mod g(x)
+        :param word: binary vector of length n
+        :return: syndrome polynomial
+        """
+        positions = np.flatnonzero(word)
+        return Poly(self.H[:, positions].sum(axis=1), field=self.GF2m)
+
+    def _sqrt(self, poly):
+        """
+        Square root in GF(2^m)[x]/g(x): the square roots of the even and odd
+        coefficients form E(x) and O(x), and sqrt(p) = E(x) + sqrt(x) * O(x)
+        """
+        coefficients = self.GF2m.Zeros(poly.degree + 2)
+        coefficients[:poly.degree + 1] = np.sqrt(poly.coeffs[::-1])
+        even = Poly(coefficients[0::2], field=self.GF2m, order='asc')
+        odd = Poly(coefficients[1::2], field=self.GF2m, order='asc')
+
+        return (even + self.sqrt_x * odd) % self.g_poly
+
+    def error_locator(self, syndrome):
+        """
+        Finds the error locator polynomial sigma(x) = a(x)^2 + x * b(x)^2
+        :param syndrome: non-zero syndrome polynomial
+        :return: error locator polynomial
+        """
+        # T(x) = S(x)^-1 mod g(x)
+        d, T, _ = egcd(syndrome, self.g_poly)
+        T = (T // d) % self.g_poly
+
+        tau = T + self.x
+        if tau == 0:
+            return self.x
+
+        # Solve a(x) = b(x) * R(x) mod g(x) with deg a <= t / 2 and deg b <= (t - 1) / 2
+        r0, r1 = self.g_poly, self._sqrt(tau)
+        u0, u1 = Poly.Zero(self.GF2m), Poly.One(self.GF2m)
+        while r1.degree > self.t // 2:
+            quotient, remainder = divmod(r0, r1)
+            r0, r1 = r1, remainder
+            u0, u1 = u1, u0 - quotient * u1
+
+        return r1 * r1 + self.x * u1 * u1
+
+    def decode(self, word):
+        """
+        Finds the error vector of the given word
+        :param word: binary vector of length n
+        :return: uint8 error vector of length n
+        """
+        errors = np.zeros(len(self.L), dtype=np.uint8)
+
+        syndrome = self.syndrome(word)
+        if syndrome == 0:
+            return errors
+
+        sigma = self.error_locator(syndrome)
+
+        # Evaluate sigma on the whole support at once
+        positions = np.flatnonzero(sigma(self.L) == 0)
+        if len(positions) != sigma.degree:
+            raise ValueError("Decryption error: too many errors to correct")
+
+        errors[positions] = 1
+        return errors
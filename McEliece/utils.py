@@ -1,42 +1,72 @@
 import numpy as np
 
+from McEliece.gf2_matrix_utils import WORD_BITS, pack_rows, reduced_row_echelon_form, invert_packed, \
+    multiply_packed, transpose_packed, invert_unit_lower_triangular
+from McEliece.packed_binary_matrix import PackedBinaryMatrix
+
 
 def is_invertible_F2(a):
     """
     Determine invertibility by Gaussian elimination
     """
-    a = np.array(a, dtype=np.bool_)
-    n = a.shape[0]
-    for i in range(n):
-        pivots = np.where(a[i:, i])[0]
-        if len(pivots) == 0:
-            return False
+    n = len(a)
+    _, pivots = reduced_row_echelon_form(pack_rows(a), n)
 
-        # swap pivot
-        piv = i + pivots[0]
-        row = a[piv, i:].copy()
-        a[piv, i:] = a[i, i:]
-        a[i, i:] = row
+    return len(pivots) == n
 
-        # eliminate
-        for j in range(i + 1, n):
-            if a[j, i]:
-                a[j, i:] ^= row  # XOR for elimination in GF(2)
 
-    return True
+def random_unit_lower_triangular(k):
+    """
+    Draws a random packed k x k binary matrix with ones on the diagonal and zeros above it
+    :return: k x ceil(k / 64) uint64 matrix
+    """
+    words = -(-k // WORD_BITS)
+    rows = np.arange(k)[:, None]
+    word_starts = np.arange(words)[None, :] * WORD_BITS
 
+    # Row i keeps the random bits of the columns left of i, then the diagonal bit is set
+    kept_bits = np.clip(rows - word_starts, 0, WORD_BITS).astype(np.uint64)
+    mask = np.where(kept_bits == WORD_BITS, np.uint64(2 ** 64 - 1), (np.uint64(1) << kept_bits) - np.uint64(1))
 
-def generate_s_matrix(k, GF2m):
-    while True:
-        candidate = np.random.randint(2, size=(k, k))
-        if is_invertible_F2(candidate):
-            return GF2m(candidate)
+    lower = np.frombuffer(np.random.bytes(8 * k * words), dtype='<u8').reshape(k, words) & mask
+    lower[rows[:, 0], rows[:, 0] // WORD_BITS] |= np.uint64(1) << (rows[:, 0] % WORD_BITS).astype(np.uint64)
+
+    return lower
+
+
+def generate_s_matrix(k, method='rejection'):
+    """
+    Generates a random invertible k x k binary matrix S together with its inverse
+    :param k: matrix size
+    :param method: 'rejection' draws uniform random matrices until the Gauss-Jordan elimination
+    that inverts them succeeds, 'lu' multiplies random unit triangular factors S = L * U and
+    finds S^-1 = U^-1 * L^-1 from the inverses of the factors without any elimination
+    :return: tuple (S, S_inv) of packed matrices
+    """
+    if method not in ('rejection', 'lu'):
+        raise ValueError(f"Unknown S generation method '{method}'")
 
+    if method == 'lu':
+        # U is the transpose of a unit lower triangular matrix, and so is its inverse
+        lower = random_unit_lower_triangular(k)
+        upper_transposed = random_unit_lower_triangular(k)
 
-def generate_p_matrix(n, GF2m):
-    permutation_matrix = np.identity(n, dtype=int)
+        S = multiply_packed(lower, transpose_packed(upper_transposed, k))
+        S_inv = multiply_packed(transpose_packed(invert_unit_lower_triangular(upper_transposed, k), k),
+                                invert_unit_lower_triangular(lower, k))
+        return PackedBinaryMatrix(S, k), PackedBinaryMatrix(S_inv, k)
+
+    while True:
+        candidate = pack_rows(np.random.randint(2, size=(k, k), dtype=np.uint8))
 
-    # Shuffle the rows to obtain a random permutation matrix.
-    np.random.shuffle(permutation_matrix)
+        inverse = invert_packed(candidate, k)
+        if inverse is not None:
+            return PackedBinaryMatrix(candidate, k), PackedBinaryMatrix(inverse, k)
 
-    return GF2m(permutation_matrix)
+
+def generate_permutation(n):
+    """
+    Generates a random permutation P of n columns stored as an index vector,
+    column j of G * P is column permutation[j] of G
+    """
+    return np.random.permutation(n)
@@ -0,0 +1,217 @@
+"""
+Encryption-only NTRUEncrypt objects for senders that encrypt to the same recipients over and over.
+
+An 'NTRUEncryptor' expands a public key once: the rotation windows of h for single messages
+and, on the first batch, the rotation matrix of h. 'EncryptorCache' keeps the encryptors
+of recently used recipients in an LRU keyed by the SHA-256 fingerprint of the public key.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from Instrumentation.metrics import REGISTRY, timed
+from NTRUEncrypt.plaintext_to_ternary_conversion_utils import encode_messages, ternary_capacity_in_bytes
+from NTRUEncrypt.ternary_polynomial import rotation_windows, sparse_ternary_product, random_ternary_matrix, \
+    default_weights
+from NTRUEncrypt.truncated_polynomial import TruncatedPolynomial, rotation_matrix, batch_cyclic_convolution
+from OAEP.oaep import OAEP
+
+
+def public_key_fingerprint(h, N, p, q):
+    """
+    SHA-256 fingerprint of a public key and its parameters. Coefficients are reduced modulo q first,
+    so centred and unreduced representations of one key share the fingerprint.
+    :param h: public key polynomial or its coefficients
+    :return: hex digest
+    """
+    coefficients = h.coefficients if isinstance(h, TruncatedPolynomial) else h
+    coefficients = np.ascontiguousarray(np.asarray(coefficients, dtype=np.int64) % q, dtype='<i8')
+
+    digest = hashlib.sha256(f'{N},{p},{q};'.encode())
+    digest.update(memoryview(coefficients))
+
+    return digest.hexdigest()
+
+
+class NTRUEncryptor:
+    """
+    Encrypts to one NTRUEncrypt public key h, which already carries the factor p
+    """
+
+    def __init__(self, h, N, p, q, dr=None):
+        """
+        :param h: public key polynomial or its coefficients
+        :param N: degree of the ring N
+        :param p: small modulus
+        :param q: large modulus
+        :param dr: number of +1 (and of -1) coefficients of r, see 'default_weights' if not given
+        """
+        coefficients = h.coefficients if isinstance(h, TruncatedPolynomial) else h
+        coefficients = np.array(coefficients, dtype=np.int64) % q
+        if coefficients.shape != (N,):
+            raise ValueError(f"Public key must have {N} coefficients")
+        coefficients.flags.writeable = False
+
+        self.N = N
+        self.p = p
+        self.q = q
+        self.dr = dr if dr is not None else default_weights(N)[2]
+        self.h = TruncatedPolynomial(coefficients)
+        self.fingerprint = public_key_fingerprint(coefficients, N, p, q)
+        self.mask_length_byes = ternary_capacity_in_bytes(N)
+        self.oaep = OAEP.for_parameters(L=b'', k=self.mask_length_byes)
+        self._h_windows = rotation_windows(coefficients)
+        self._h_rotations = None
+        # Called once the rotation matrix is built, lets a cache re-check its memory bound
+        self.on_grow = None
+
+    @classmethod
+    def from_ntru(cls, ntru):
+        """
+        Creates the encryptor of the public key of an NTRUEncrypt instance
+        :raises ValueError: for keys of the NTT mode, which are not keys of Z[x]/(x^N - 1)
+        """
+        if ntru.negacyclic:
+            raise ValueError("NTRUEncryptor supports keys of Z[x]/(x^N - 1) only, not of the NTT mode")
+        return cls(ntru.h, ntru.N, ntru.p, ntru.q, ntru.dr)
+
+    @classmethod
+    def from_public_key(cls, public_key, dr=None):
+        """
+        Creates the encryptor of a public key container
+        :param public_key: NTRUPublicKey
+        :raises ValueError: for keys of the NTT mode, which are not keys of Z[x]/(x^N - 1)
+        """
+        if public_key.negacyclic:
+            raise ValueError("NTRUEncryptor supports keys of Z[x]/(x^N - 1) only, not of the NTT mode")
+        return cls(public_key.h, public_key.N, public_key.p, public_key.q, dr)
+
+    @property
+    def nbytes(self):
+        """
+        Memory held by the expanded key
+        """
+        # The windows are a view over the doubled coefficient array
+        rotations = self._h_rotations.nbytes if self._h_rotations is not None else 0
+        return 2 * self.h.coefficients.nbytes + rotations
+
+    def encrypt(self, plaintext):
+        """
+        Encrypts given plaintext message
+        :param plaintext: message to encrypt
+        :return: encrypted message
+        """
+        return self.encrypt_bytes(plaintext.encode('ascii'))
+
+    @timed('ntru.encrypt')
+    def encrypt_bytes(self, message):
+        """
+        Encrypts given byte message
+        :param message: bytes to encrypt, at most mask_length_byes - 42 of them
+        :return: encrypted message
+        """
+        m = encode_messages(self.oaep, [message], self.N)[0]
+
+        indices = np.random.choice(self.N, 2 * self.dr, replace=False)
+        rh = sparse_ternary_product(self._h_windows, indices[:self.dr], indices[self.dr:])
+
+        return TruncatedPolynomial((rh + m) % self.q)
+
+    @timed('ntru.encrypt_batch')
+    def encrypt_many(self, messages):
+        """
+        Encrypts many byte messages at once with the rotation matrix of h
+        :param messages: list of byte messages
+        :return: list of encrypted messages
+        """
+        if self._h_rotations is None:
+            self._h_rotations = rotation_matrix(self.h.coefficients)
+            if self.on_grow is not None:
+                self.on_grow()
+
+        m = encode_messages(self.oaep, messages, self.N)
+        r = random_ternary_matrix(len(messages), self.N, self.dr, self.dr)
+        ciphertexts = (batch_cyclic_convolution(r, self._h_rotations) + m) % self.q
+
+        return [TruncatedPolynomial(coefficients) for coefficients in ciphertexts]
+
+
+class EncryptorCache:
+    """
+    Thread-safe LRU cache of expanded public keys with hit and miss counters
+    """
+
+    def __init__(self, max_entries=64, max_bytes=None):
+        """
+        :param max_entries: maximum number of cached encryptors
+        :param max_bytes: maximum memory of the cached encryptors, unbounded if not given
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, h, N, p, q, dr=None):
+        """
+        Returns the encryptor of the given public key, expanding the key on a miss
+        :param h: public key polynomial or its coefficients
+        :return: NTRUEncryptor
+        """
+        dr = dr if dr is not None else default_weights(N)[2]
+        key = (public_key_fingerprint(h, N, p, q), dr)
+
+        with self._lock:
+            encryptor = self._entries.get(key)
+            if encryptor is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                REGISTRY.increment('ntru.encryptor_cache.hits')
+                return encryptor
+
+            self.misses += 1
+            REGISTRY.increment('ntru.encryptor_cache.misses')
+
+            encryptor = NTRUEncryptor(h, N, p, q, dr)
+            encryptor.on_grow = self._on_grow
+            self._entries[key] = encryptor
+            self._evict()
+
+            return encryptor
+
+    def _on_grow(self):
+        """
+        Enforces the memory bound after a cached encryptor built its rotation matrix
+        """
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        """
+        Drops the least recently used encryptors until the cache fits into its bounds,
+        the most recent one is always kept
+        """
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries or
+                                           self.max_bytes is not None and self.nbytes > self.max_bytes):
+            self._entries.popitem(last=False)
+
+    @property
+    def nbytes(self):
+        return sum(encryptor.nbytes for encryptor in self._entries.values())
+
+    def stats(self):
+        """
+        :return: dictionary with the hit and miss counters, number of entries and their memory
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries), 'nbytes': self.nbytes}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,294 @@
+"""
+Compact containers of NTRUEncrypt keys and ciphertexts.
+
+Every container is a slotted dataclass over contiguous NumPy arrays of the narrowest integer
+type: coefficients modulo q = 2048 take 2 bytes instead of the 8 of a ring element, the sparse
+ternary polynomials f and g are kept as index lists. Pickling sends these arrays only.
+
+'to_bytes' builds on the binary wire format of 'compressed_string_serialisation':
+    ciphertext     one serialised polynomial
+    keys           MAGIC | version (1) | product form (1) | ring (1) | reserved (1) | N (4) | p (4) | q (4)
+                   followed by serialised polynomials, each prefixed with its length (4)
+Coefficients are bit-packed on the wire, so 'from_buffer' decodes them in one vectorised pass;
+sections are sliced from the buffer with memoryviews and are not copied before decoding.
+The ring byte is 0 for Z[x]/(x^N - 1) and 1 for the Z[x]/(x^N + 1) of the NTT mode, keys
+written before it existed carry 0 in the reserved byte and load as keys of the cyclic ring.
+"""
+import struct
+from dataclasses import dataclass
+
+import numpy as np
+
+from NTRUEncrypt.ternary_polynomial import TernaryPolynomial
+from NTRUEncrypt.truncated_polynomial import TruncatedPolynomial
+from PolynomialsSerialisation.compressed_string_serialisation import polynomial_to_bytes, bytes_to_polynomial, \
+    read_polynomial_header
+
+PUBLIC_KEY_MAGIC = b'NPUB'
+PRIVATE_KEY_MAGIC = b'NSEC'
+VERSION = 1
+
+_HEADER_FORMAT = '>4sBBBxIII'
+_HEADER_LENGTH = struct.calcsize(_HEADER_FORMAT)
+_SECTION_LENGTH_FORMAT = '>I'
+_SECTION_LENGTH_LENGTH = struct.calcsize(_SECTION_LENGTH_FORMAT)
+
+
+def _coefficient_dtype(modulus):
+    """
+    Narrowest unsigned type holding the coefficients in [0, modulus)
+    """
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if modulus - 1 <= np.iinfo(dtype).max:
+            return dtype
+
+    raise ValueError("Modulus must fit into 32 bits")
+
+
+def _coefficients(values, modulus):
+    array = np.ascontiguousarray(np.asarray(values, dtype=np.int64) % modulus, dtype=_coefficient_dtype(modulus))
+    array.flags.writeable = False
+    return array
+
+
+def _indices(values, N):
+    array = np.ascontiguousarray(values, dtype=_coefficient_dtype(N))
+    array.flags.writeable = False
+    return array
+
+
+def _ternary_coefficients(N, plus_indices, minus_indices):
+    coefficients = np.zeros(N, dtype=np.int64)
+    coefficients[plus_indices] = 1
+    coefficients[minus_indices] = -1
+    return coefficients
+
+
+def _pack_key(magic, N, p, q, product_form, negacyclic, polynomials):
+    """
+    Serialises the key header followed by length-prefixed polynomials
+    :param polynomials: list of (coefficients, modulus, encoding)
+    """
+    sections = [struct.pack(_HEADER_FORMAT, magic, VERSION, product_form, negacyclic, N, p, q)]
+    for coefficients, modulus, encoding in polynomials:
+        data = polynomial_to_bytes(coefficients, modulus, encoding)
+        sections += [struct.pack(_SECTION_LENGTH_FORMAT, len(data)), data]
+
+    return b''.join(sections)
+
+
+def _unpack_key(buffer, magic, count):
+    """
+    Parses the key header and decodes the polynomials that follow
+    :param count: expected number of polynomials
+    :return: tuple (N, p, q, product_form, negacyclic, list of (coefficients, modulus))
+    """
+    data = memoryview(buffer).cast('B')
+    if len(data) < _HEADER_LENGTH:
+        raise ValueError("Deserialisation error: header is truncated")
+
+    key_magic, version, product_form, negacyclic, N, p, q = struct.unpack_from(_HEADER_FORMAT, data)
+    if key_magic != magic or version != VERSION or negacyclic > 1:
+        raise ValueError("Deserialisation error: unsupported key format")
+
+    polynomials = []
+    offset = _HEADER_LENGTH
+    for _ in range(count):
+        if len(data) < offset + _SECTION_LENGTH_LENGTH:
+            raise ValueError("Deserialisation error: key is truncated")
+        length, = struct.unpack_from(_SECTION_LENGTH_FORMAT, data, offset)
+        offset += _SECTION_LENGTH_LENGTH
+
+        section = data[offset:offset + length]
+        if len(section) != length:
+            raise ValueError("Deserialisation error: key is truncated")
+        offset += length
+
+        section_N, modulus, _, _ = read_polynomial_header(section)
+        if section_N != N:
+            raise ValueError(f"Deserialisation error: polynomial of degree {section_N} in a key of degree {N}")
+        polynomials.append((bytes_to_polynomial(section), modulus))
+
+    return N, p, q, bool(product_form), bool(negacyclic), polynomials
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class NTRUPublicKey:
+    """
+    Public key h of NTRUEncrypt, which already carries the factor p. Keys of the NTT mode
+    are negacyclic, they belong to Z[x]/(x^N + 1) instead of Z[x]/(x^N - 1).
+    """
+
+    N: int
+    p: int
+    q: int
+    h: np.ndarray
+    negacyclic: bool = False
+
+    @classmethod
+    def create(cls, N, p, q, h, negacyclic=False):
+        """
+        :param h: public key polynomial or its coefficients
+        """
+        h = h.coefficients if isinstance(h, TruncatedPolynomial) else h
+        if np.shape(h) != (N,):
+            raise ValueError(f"Public key must have {N} coefficients")
+
+        return cls(N, p, q, _coefficients(h, q), bool(negacyclic))
+
+    @classmethod
+    def from_ntru(cls, ntru):
+        return cls.create(ntru.N, ntru.p, ntru.q, ntru.h, ntru.negacyclic)
+
+    def to_polynomial(self):
+        return TruncatedPolynomial(self.h)
+
+    @property
+    def nbytes(self):
+        return self.h.nbytes
+
+    def to_bytes(self):
+        return _pack_key(PUBLIC_KEY_MAGIC, self.N, self.p, self.q, False, self.negacyclic, [(self.h, self.q, 'packed')])
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        """
+        :param buffer: bytes-like object produced by 'to_bytes'
+        :return: public key
+        """
+        N, p, q, _, negacyclic, [(h, modulus)] = _unpack_key(buffer, PUBLIC_KEY_MAGIC, 1)
+        if modulus != q:
+            raise ValueError("Deserialisation error: public key is not reduced modulo q")
+
+        return cls.create(N, p, q, h, negacyclic)
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class NTRUPrivateKey:
+    """
+    Key pair of NTRUEncrypt. In product form f = 1 + p * F and the index lists describe F.
+    """
+
+    N: int
+    p: int
+    q: int
+    product_form: bool
+    f_plus: np.ndarray
+    f_minus: np.ndarray
+    g_plus: np.ndarray
+    g_minus: np.ndarray
+    fp: np.ndarray
+    fq: np.ndarray
+    h: np.ndarray
+    negacyclic: bool = False
+
+    @classmethod
+    def from_key_material(cls, key_material):
+        """
+        Converts the dictionary of 'NTRUEncrypt.export_key_material' to the compact container
+        """
+        N, p, q = key_material['N'], key_material['p'], key_material['q']
+        fp = TruncatedPolynomial(key_material['fp'], N).coefficients
+
+        return cls(N, p, q, bool(key_material['product_form']),
+                   _indices(key_material['f_plus'], N), _indices(key_material['f_minus'], N),
+                   _indices(key_material['g_plus'], N), _indices(key_material['g_minus'], N),
+                   _coefficients(fp, p), _coefficients(key_material['fq'], q), _coefficients(key_material['h'], q),
+                   bool(key_material.get('negacyclic', False)))
+
+    @classmethod
+    def from_ntru(cls, ntru):
+        return cls.from_key_material(ntru.export_key_material())
+
+    def to_key_material(self):
+        """
+        :return: dictionary accepted as 'key_material' by the NTRUEncrypt constructor
+        """
+        return {
+            'N': self.N, 'p': self.p, 'q': self.q, 'product_form': self.product_form,
+            'f_plus': self.f_plus.astype(np.int64), 'f_minus': self.f_minus.astype(np.int64),
+            'g_plus': self.g_plus.astype(np.int64), 'g_minus': self.g_minus.astype(np.int64),
+            'fp': self.fp.astype(np.int64), 'fq': self.fq.astype(np.int64), 'h': self.h.astype(np.int64),
+            'negacyclic': self.negacyclic,
+        }
+
+    def public_key(self):
+        return NTRUPublicKey(self.N, self.p, self.q, self.h, self.negacyclic)
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in (self.f_plus, self.f_minus, self.g_plus, self.g_minus,
+                                              self.fp, self.fq, self.h))
+
+    def to_bytes(self):
+        return _pack_key(PRIVATE_KEY_MAGIC, self.N, self.p, self.q, self.product_form, self.negacyclic, [
+            (_ternary_coefficients(self.N, self.f_plus, self.f_minus), 3, 'ternary'),
+            (_ternary_coefficients(self.N, self.g_plus, self.g_minus), 3, 'ternary'),
+            (self.fp, self.p, 'packed'),
+            (self.fq, self.q, 'packed'),
+            (self.h, self.q, 'packed'),
+        ])
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        """
+        :param buffer: bytes-like object produced by 'to_bytes'
+        :return: private key
+        """
+        N, p, q, product_form, negacyclic, polynomials = _unpack_key(buffer, PRIVATE_KEY_MAGIC, 5)
+        (f, _), (g, _), (fp, p_modulus), (fq, q_modulus), (h, h_modulus) = polynomials
+        if (p_modulus, q_modulus, h_modulus) != (p, q, q):
+            raise ValueError("Deserialisation error: key polynomials are not reduced modulo p and q")
+
+        return cls(N, p, q, product_form,
+                   _indices(np.flatnonzero(f == 1), N), _indices(np.flatnonzero(f == -1), N),
+                   _indices(np.flatnonzero(g == 1), N), _indices(np.flatnonzero(g == -1), N),
+                   _coefficients(fp, p), _coefficients(fq, q), _coefficients(h, q), negacyclic)
+
+    def to_ternary_polynomials(self):
+        """
+        :return: tuple (F or f, g) of sparse ternary polynomials
+        """
+        return (TernaryPolynomial(self.N, self.f_plus, self.f_minus),
+                TernaryPolynomial(self.N, self.g_plus, self.g_minus))
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class NTRUCiphertext:
+    """
+    Ciphertext of NTRUEncrypt with coefficients in [0, q)
+    """
+
+    q: int
+    coefficients: np.ndarray
+
+    @classmethod
+    def from_polynomial(cls, ciphertext, q):
+        """
+        :param ciphertext: ring element returned by 'NTRUEncrypt.encrypt_bytes' or its coefficients
+        """
+        coefficients = ciphertext.coefficients if isinstance(ciphertext, TruncatedPolynomial) else ciphertext
+        return cls(q, _coefficients(coefficients, q))
+
+    def to_polynomial(self):
+        return TruncatedPolynomial(self.coefficients)
+
+    @property
+    def N(self):
+        return len(self.coefficients)
+
+    @property
+    def nbytes(self):
+        return self.coefficients.nbytes
+
+    def to_bytes(self):
+        return polynomial_to_bytes(self.coefficients, self.q)
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        """
+        :param buffer: bytes-like object produced by 'to_bytes'
+        :return: ciphertext
+        """
+        _, modulus, _, _ = read_polynomial_header(buffer)
+        return cls(modulus, _coefficients(bytes_to_polynomial(buffer), modulus))
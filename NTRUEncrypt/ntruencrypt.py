@@ -1,74 +1,156 @@
-import base64
+import numpy as np
+from sympy import symbols
 
-from sympy import symbols, Poly, invert, NotInvertible
-from sympy.polys.specialpolys import random_poly
-from sympy.polys.domains import ZZ, GF
-import math
-
-from NTRUEncrypt.plaintext_to_ternary_conversion_utils import string_to_ternary, ternary_to_poly, poly_to_ternary, \
-    ternary_string_back
-from NTRUEncrypt.ring_math_utils import truncate_mod, modulo_poly
-from OAEP.oaep import oaep_encode, oaep_decode
+from NTRUEncrypt.keys import NTRUPublicKey, NTRUPrivateKey, NTRUCiphertext
+from NTRUEncrypt.plaintext_to_ternary_conversion_utils import encode_messages, decode_messages, \
+    ternary_capacity_in_bytes
+from NTRUEncrypt.ring_inversion import NotInvertibleError, invert_mod_prime, invert_mod_power_of_two
+from NTRUEncrypt.ternary_polynomial import TernaryPolynomial, ProductFormPolynomial, random_ternary_matrix, \
+    default_weights
+from NTRUEncrypt.truncated_polynomial import TruncatedPolynomial, rotation_matrix, batch_cyclic_convolution
+from Instrumentation.metrics import timed
+from OAEP.oaep import OAEP
 
 
 class NTRUEncrypt:
-    def __init__(self, N, p, q):
+    # Ring of the keys, Z[x]/(x^N - 1) here and Z[x]/(x^N + 1) in the NTT mode
+    negacyclic = False
+
+    def __init__(self, N, p, q, df=None, dg=None, dr=None, product_form=True, key_material=None):
+        """
+        :param df: number of +1 (and of -1) coefficients of F or f, see 'default_weights' if not given
+        :param dg: number of +1 (and of -1) coefficients of g
+        :param dr: number of +1 (and of -1) coefficients of r
+        :param key_material: dictionary returned by 'export_key_material' or NTRUPrivateKey,
+        if given the keys are restored from it instead of being generated
+        """
         self.N = N  # Degree of the polynomial
         self.p = p  # Small modulus
         self.q = q  # Large modulus
+        default_df, default_dg, default_dr = default_weights(N)
+        self.df = df if df is not None else default_df  # Number of +1 (and of -1) coefficients of F or f
+        self.dg = dg if dg is not None else default_dg  # Number of +1 (and of -1) coefficients of g
+        self.dr = dr if dr is not None else default_dr  # Number of +1 (and of -1) coefficients of r
+        self.product_form = product_form  # If set, f = 1 + p * F and f_p = 1
         self.f = None
         self.fp = None
         self.fq = None
         self.g = None
         self.h = None
+        self._h_rotations = None
+        self._F_rotations = None
+        self._fp_rotations = None
         self.MAX_F_GENERATION_ITERATIONS = 5
-        self.x = x = symbols('x')
-        self.R_poly = Poly(x ** N - 1, domain=ZZ)
-        self.mask_length_byes = (((self.N // 5) * 3) // 4) - 5
+        self.x = symbols('x')
+        self.mask_length_byes = ternary_capacity_in_bytes(self.N)
+        self.oaep = OAEP.for_parameters(L=b'', k=self.mask_length_byes)
+
+        if isinstance(key_material, NTRUPrivateKey):
+            key_material = key_material.to_key_material()
+        if key_material is not None:
+            self._load_key_material(key_material)
+            return
+
+        with timed('ntru.keygen'):
+            self._generate_private_key()
+            self._generate_public_key()
+
+    def export_key_material(self):
+        """
+        Exports the key pair as plain integers and NumPy arrays, which can be pickled
+        and sent between processes
+        :return: dictionary accepted as 'key_material' by the constructor
+        """
+        f = self.f.F if self.product_form else self.f
+        return {
+            'N': self.N, 'p': self.p, 'q': self.q, 'product_form': self.product_form,
+            'f_plus': f.plus_indices, 'f_minus': f.minus_indices,
+            'g_plus': self.g.plus_indices, 'g_minus': self.g.minus_indices,
+            'fp': self.fp.coefficients, 'fq': self.fq.coefficients, 'h': self.h.coefficients,
+            'negacyclic': self.negacyclic,
+        }
+
+    def export_public_key(self):
+        """
+        :return: NTRUPublicKey
+        """
+        return NTRUPublicKey.from_ntru(self)
+
+    def export_private_key(self):
+        """
+        :return: NTRUPrivateKey, accepted as 'key_material' by the constructor
+        """
+        return NTRUPrivateKey.from_ntru(self)
 
-        self._generate_private_key()
-        self._generate_public_key()
+    def _load_key_material(self, key_material):
+        """
+        Restores the key pair exported by 'export_key_material'
+        :raises ValueError: if the key material belongs to other parameters
+        """
+        parameters = (key_material['N'], key_material['p'], key_material['q'], key_material['product_form'])
+        if parameters != (self.N, self.p, self.q, self.product_form):
+            raise ValueError(f"Key material for (N, p, q, product_form) = {parameters} does not match this instance")
+        if key_material.get('negacyclic', False) != self.negacyclic:
+            ring = 'x^N + 1' if self.negacyclic else 'x^N - 1'
+            raise ValueError(f"Key material does not belong to the ring Z[x]/({ring}) of this instance")
+
+        f = TernaryPolynomial(self.N, key_material['f_plus'], key_material['f_minus'])
+        self.f = ProductFormPolynomial(f, self.p) if self.product_form else f
+        self.g = TernaryPolynomial(self.N, key_material['g_plus'], key_material['g_minus'])
+        self.fp = TruncatedPolynomial(key_material['fp'])
+        self.fq = TruncatedPolynomial(key_material['fq'])
+        self.h = TruncatedPolynomial(key_material['h'])
 
     def _generate_private_key(self):
         """
         Generates the polynomial components (f, f_p, f_q) of an NTRUEncrypt private key.
         This function attempts to generate a polynomial 'f' and its inverses 'f_p'
         and 'f_q' modulo two different primes 'p' and 'q', respectively.
+        In product form f = 1 + p * F, thus f_p = 1 and only f_q has to be found.
+        :raises ValueError: if no invertible 'f' was found within MAX_F_GENERATION_ITERATIONS attempts
         """
 
         for _ in range(self.MAX_F_GENERATION_ITERATIONS):
-            f = random_poly(self.x, self.N - 1, -1, 1, domain=ZZ)
+            if self.product_form:
+                f = ProductFormPolynomial(TernaryPolynomial.random(self.N, self.df, self.df), self.p)
+            else:
+                f = TernaryPolynomial.random(self.N, self.df + 1, self.df)
+            f_dense = f.to_dense()
             try:
                 # Find inverse f_p
-                fp = invert(f, self.R_poly, domain=GF(self.p))
+                if self.product_form:
+                    fp = TruncatedPolynomial([1], self.N)
+                else:
+                    fp = invert_mod_prime(f_dense, self.p)
 
                 # Find inverse f_q
-                fq = invert(f, self.R_poly, domain=GF(2))
-                inv_poly = invert(f, self.R_poly, domain=GF(2))
-                e = int(math.log(self.q, 2))
-                for i in range(1, e):
-                    fq = ((2 * fq - f * fq ** 2) % self.R_poly).trunc(self.q)
+                fq = self._invert_mod_q(f_dense)
 
-                if fp != 0 and fq != 0:
-                    self.g = random_poly(self.x, self.N - 1, -1, 1, domain=ZZ)
-                    self.f = f
-                    self.fp = fp
-                    self.fq = fq
-                    return
+            except NotInvertibleError:
+                continue
 
-            except NotInvertible:
-                pass
+            self.g = TernaryPolynomial.random(self.N, self.dg, self.dg)
+            self.f = f
+            self.fp = fp
+            self.fq = fq
+            return
 
-        return None, None, None
+        raise ValueError(f"Failed to generate an invertible private key polynomial "
+                         f"in {self.MAX_F_GENERATION_ITERATIONS} attempts")
+
+    def _invert_mod_q(self, f):
+        """
+        Finds the inverse of f modulo the large modulus q, which is a power of two
+        :raises NotInvertibleError: if f is not invertible
+        """
+        return invert_mod_power_of_two(f, self.q)
 
     def _generate_public_key(self):
         """
         Generates the NTRUEncrypt public key 'h'
         """
 
-        pfq = truncate_mod(self.p * self.fq, self.N)
-        pfqg = truncate_mod(pfq * self.g, self.N)
-        self.h = modulo_poly(pfqg, self.q)
+        self.h = (self.p * (self.g * self.fq)).mod(self.q)
 
     def encrypt(self, plaintext):
         """
@@ -76,48 +158,111 @@ class NTRUEncrypt:
         :param plaintext: message to encrypt
         :return: encrypted message
         """
+        return self.encrypt_bytes(plaintext.encode('ascii'))
 
-        # At the moment polynomial conversion supports only ASCII format thus
-        # the padded message should be base64 encoded
-        padded_plaintext = oaep_encode(M=plaintext.encode('ascii'), L=b'', k=self.mask_length_byes)
-        base64_encoded = base64.b64encode(padded_plaintext).decode('ascii')
-
-        ternary_representation = string_to_ternary(base64_encoded, self.N - 1)
-        poly_representation = ternary_to_poly(ternary_representation)
+    @timed('ntru.encrypt')
+    def encrypt_bytes(self, message):
+        """
+        Encrypts given byte message
+        :param message: bytes to encrypt, at most mask_length_byes - 42 of them
+        :return: encrypted message
+        """
+        message = TruncatedPolynomial(encode_messages(self.oaep, [message], self.N)[0])
 
-        r = Poly(random_poly(self.x, self.N - 1, -1, 1, domain=ZZ), self.x, domain=ZZ)
-        r = truncate_mod(r * self.p * self.h, self.N)
+        # The public key already carries the factor p
+        r = TernaryPolynomial.random(self.N, self.dr, self.dr)
 
-        return modulo_poly(r + poly_representation, self.q)
+        return (r * self.h + message).mod(self.q)
 
     def decrypt(self, ciphertext):
         """
         Decrypts given ciphertext message
-        :param ciphertext: ciphertext to decrypt
+        :param ciphertext: ciphertext to decrypt (ring element or SymPy Poly)
         :return: original message
         """
-        a = modulo_poly(truncate_mod(self.f * ciphertext, self.N), self.q)
+        return self.decrypt_bytes(ciphertext).decode('ascii')
+
+    @timed('ntru.decrypt')
+    def decrypt_bytes(self, ciphertext):
+        """
+        Decrypts given ciphertext to the original byte message
+        :param ciphertext: ciphertext to decrypt (ring element, NTRUCiphertext or SymPy Poly)
+        :return: original bytes
+        """
+        if isinstance(ciphertext, NTRUCiphertext):
+            ciphertext = ciphertext.to_polynomial()
+        elif not isinstance(ciphertext, TruncatedPolynomial):
+            ciphertext = TruncatedPolynomial.from_poly(ciphertext, self.N, self.x)
 
-        adjusted_coefficients = []
-        for coefficient in a.all_coeffs():
-            # Perform the modular operation to ensure it's within [0, q)
-            mod_coefficients = coefficient % self.q
+        # Adjust coefficients to fall within (-q/2, q/2]
+        a = (self.f * ciphertext).center_lift(self.q)
 
-            # Adjust coefficients that are greater than q/2 to fall within [-q/2, q/2]
-            if mod_coefficients > self.q / 2:
-                mod_coefficients -= self.q
+        b = a.mod(self.p)
+        c = b if self.product_form else (self.fp * b).mod(self.p)
 
-            adjusted_coefficients.append(mod_coefficients)
+        return decode_messages(self.oaep, c.coefficients[None, :])[0]
+
+    def encrypt_batch(self, plaintexts):
+        """
+        Encrypts many plaintext messages at once
+        :param plaintexts: list of messages to encrypt
+        :return: list of encrypted messages
+        """
+        return self.encrypt_many([plaintext.encode('ascii') for plaintext in plaintexts])
+
+    @timed('ntru.encrypt_batch')
+    def encrypt_many(self, messages):
+        """
+        Encrypts many byte messages at once. Messages are stacked as rows of
+        a coefficient matrix, which is multiplied by the matrix of rotations of 'h'.
+        :param messages: list of byte messages to encrypt
+        :return: list of encrypted messages
+        """
+        if self._h_rotations is None:
+            self._h_rotations = rotation_matrix(self.h.coefficients)
+
+        messages = encode_messages(self.oaep, messages, self.N)
+        r = random_ternary_matrix(len(messages), self.N, self.dr, self.dr)
+
+        ciphertexts = (batch_cyclic_convolution(r, self._h_rotations) + messages) % self.q
+
+        return [TruncatedPolynomial(coefficients) for coefficients in ciphertexts]
+
+    def decrypt_batch(self, ciphertexts):
+        """
+        Decrypts many ciphertexts at once
+        :param ciphertexts: list of ciphertexts or a matrix with one ciphertext per row
+        :return: list of original messages
+        """
+        return [message.decode('ascii') for message in self.decrypt_many(ciphertexts)]
+
+    @timed('ntru.decrypt_batch')
+    def decrypt_many(self, ciphertexts):
+        """
+        Decrypts many ciphertexts at once to the original byte messages
+        :param ciphertexts: list of ciphertexts or a matrix with one ciphertext per row
+        :return: list of original byte messages
+        """
+        if self._F_rotations is None:
+            F = self.f.F if self.product_form else self.f
+            self._F_rotations = rotation_matrix(F.to_dense().coefficients)
+            if not self.product_form:
+                self._fp_rotations = rotation_matrix(self.fp.coefficients)
 
-        # Construct the adjusted polynomial
-        a = sum(coefficient * self.x ** i for i, coefficient in enumerate(reversed(adjusted_coefficients)))
+        c = np.array([ciphertext.coefficients if isinstance(ciphertext, (TruncatedPolynomial, NTRUCiphertext))
+                      else ciphertext for ciphertext in ciphertexts], dtype=np.int64).reshape(-1, self.N)
 
-        b = modulo_poly(a, self.p)
-        c = modulo_poly(truncate_mod(self.fp * b, self.N), self.p)
+        if self.product_form:
+            a = c + self.p * batch_cyclic_convolution(c, self._F_rotations)
+        else:
+            a = batch_cyclic_convolution(c, self._F_rotations)
 
-        ternary_from_poly = poly_to_ternary(Poly(c))
+        # Adjust coefficients to fall within (-q/2, q/2]
+        a %= self.q
+        a[a > self.q // 2] -= self.q
 
-        plaintext = ternary_string_back(ternary_from_poly)
-        original_message = oaep_decode(base64.b64decode(plaintext), L=b'', k=self.mask_length_byes)
+        b = a % self.p
+        if not self.product_form:
+            b = batch_cyclic_convolution(b, self._fp_rotations) % self.p
 
-        return original_message.decode('ascii')
\ No newline at end of file
+        return decode_messages(self.oaep, b)
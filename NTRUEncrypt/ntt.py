@@ -0,0 +1,182 @@
+"""
+Number-theoretic transform over Z_q for the ring Z_q[x]/(x^N + 1).
+
+With N a power of two and a prime q such that 2N divides q - 1, Z_q holds a primitive
+2N-th root of unity psi, and the roots of x^N + 1 are its odd powers psi^(2j + 1).
+The transform twists the coefficients a_i to a_i * psi^i and runs the cyclic transform
+with the N-th root w = psi^2, which evaluates the polynomial at psi * w^j. Ring products
+become pointwise products of the transforms, and a polynomial is invertible exactly when
+none of its evaluations is zero.
+
+The cyclic ring Z_q[x]/(x^N - 1) is not supported: for N a power of two, x^N - 1 splits
+over x - 1 and the subrings of x^(N/2) +- 1, and keys folded into them are easier to attack.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from NTRUEncrypt.ring_inversion import NotInvertibleError
+
+
+def _prime_factors(n):
+    factors = []
+    factor = 2
+    while factor * factor <= n:
+        if n % factor == 0:
+            factors.append(factor)
+            while n % factor == 0:
+                n //= factor
+        factor += 1
+    if n > 1:
+        factors.append(n)
+
+    return factors
+
+
+def check_ntt_parameters(N, q):
+    """
+    Checks that the ring Z_q[x]/(x^N + 1) supports the transform
+    :raises ValueError: if N is not a power of two, q is not a prime below 2^31 or 2N does not divide q - 1
+    """
+    if N < 2 or N & (N - 1):
+        raise ValueError(f"NTT length must be a power of two, got {N}")
+    if not 2 < q < 2 ** 31 or _prime_factors(q) != [q]:
+        raise ValueError(f"NTT modulus must be an odd prime below 2^31, got {q}")
+    if (q - 1) % (2 * N):
+        raise ValueError(f"Twice the NTT length, {2 * N}, must divide q - 1 = {q - 1}")
+
+
+def primitive_root_of_unity(order, q):
+    """
+    Finds a primitive root of unity of the given order modulo the prime q
+    :raises ValueError: if the order does not divide q - 1
+    """
+    if (q - 1) % order:
+        raise ValueError(f"Z_{q} has no root of unity of order {order}")
+
+    # A generator of the multiplicative group is not a square, cube, ... of any other element
+    factors = _prime_factors(q - 1)
+    for generator in range(2, q):
+        if all(pow(generator, (q - 1) // factor, q) != 1 for factor in factors):
+            return pow(generator, (q - 1) // order, q)
+
+
+@lru_cache(maxsize=16)
+def ntt_tables(N, q):
+    """
+    Precomputes the bit-reversal order, the twiddle factors of every butterfly stage and the twists
+    :param N: transform length, a power of two
+    :param q: prime modulus with 2N | q - 1
+    :return: tuple (bit-reversal permutation, forward stage twiddles, inverse stage twiddles,
+             twist psi^i, inverse twist N^-1 * psi^-i mod q)
+    """
+    check_ntt_parameters(N, q)
+    psi = primitive_root_of_unity(2 * N, q)
+    inverse_psi = pow(psi, q - 2, q)
+    root = psi * psi % q
+    inverse_root = inverse_psi * inverse_psi % q
+
+    bits = N.bit_length() - 1
+    indices = np.arange(N)
+    bit_reversal = np.zeros(N, dtype=np.int64)
+    for bit in range(bits):
+        bit_reversal |= ((indices >> bit) & 1) << (bits - 1 - bit)
+
+    def stage_twiddles(base):
+        twiddles = []
+        length = 2
+        while length <= N:
+            step = pow(base, N // length, q)
+            powers = np.array([pow(step, j, q) for j in range(length // 2)], dtype=np.int64)
+            powers.flags.writeable = False
+            twiddles.append(powers)
+            length *= 2
+        return tuple(twiddles)
+
+    def powers(base, factor):
+        array = np.array([factor * pow(base, i, q) % q for i in range(N)], dtype=np.int64)
+        array.flags.writeable = False
+        return array
+
+    bit_reversal.flags.writeable = False
+    return (bit_reversal, stage_twiddles(root), stage_twiddles(inverse_root),
+            powers(psi, 1), powers(inverse_psi, pow(N, q - 2, q)))
+
+
+def _transform(coefficients, q, bit_reversal, twiddles):
+    """
+    Iterative radix-2 Cooley-Tukey transform along the last axis, every stage
+    runs the butterflies of all blocks with a few whole-array operations
+    """
+    values = np.asarray(coefficients, dtype=np.int64).take(bit_reversal, axis=-1) % q
+    shape = values.shape
+
+    # Every stage adds less than q to the magnitude of unreduced sums, so for q below 2^26
+    # products of such sums with twiddles stay far below 2^63 and sums are reduced only at the end
+    lazy = q < 2 ** 26
+
+    for stage_twiddles in twiddles:
+        # Every block holds its even half at index 0 and its odd half at index 1
+        blocks = values.reshape(shape[:-1] + (-1, 2, len(stage_twiddles)))
+        even = blocks[..., 0, :]
+
+        odd = blocks[..., 1, :] * stage_twiddles
+        odd %= q
+
+        values = np.empty_like(blocks)
+        np.add(even, odd, out=values[..., 0, :])
+        np.subtract(even, odd, out=values[..., 1, :])
+        if not lazy:
+            values %= q
+
+    values = values.reshape(shape)
+    return values % q if lazy else values
+
+
+def ntt(coefficients, q):
+    """
+    Forward transform of one polynomial or a matrix with one polynomial per row
+    :param coefficients: coefficients ordered from the lowest degree, the last axis has length N
+    :param q: prime modulus
+    :return: evaluations at the roots of x^N + 1
+    """
+    bit_reversal, twiddles, _, twist, _ = ntt_tables(np.shape(coefficients)[-1], q)
+    return _transform(np.asarray(coefficients, dtype=np.int64) % q * twist, q, bit_reversal, twiddles)
+
+
+def inverse_ntt(values, q):
+    """
+    Inverse of 'ntt'
+    :return: coefficients in [0, q)
+    """
+    bit_reversal, _, inverse_twiddles, _, inverse_twist = ntt_tables(np.shape(values)[-1], q)
+    return _transform(values, q, bit_reversal, inverse_twiddles) * inverse_twist % q
+
+
+def pointwise_inverse(values, q):
+    """
+    Inverts every evaluation by Fermat's little theorem, x^(q - 2) = x^-1 mod q
+    :raises NotInvertibleError: if any evaluation is zero
+    """
+    values = np.asarray(values, dtype=np.int64) % q
+    if not values.all():
+        raise NotInvertibleError("Polynomial is not invertible, it vanishes at a root of x^N + 1")
+
+    result = np.ones_like(values)
+    base = values
+    exponent = q - 2
+    while exponent:
+        if exponent & 1:
+            result = result * base % q
+        base = base * base % q
+        exponent >>= 1
+
+    return result
+
+
+def ntt_convolution(a, b, q):
+    """
+    Multiplies polynomials in Z_q[x]/(x^N + 1) through the transform, rows of matrices are multiplied pairwise
+    :return: coefficients of the product in [0, q)
+    """
+    return inverse_ntt(ntt(a, q) * ntt(b, q) % q, q)
@@ -0,0 +1,121 @@
+import numpy as np
+
+from Instrumentation.metrics import timed
+from NTRUEncrypt.keys import NTRUCiphertext
+from NTRUEncrypt.ntruencrypt import NTRUEncrypt
+from NTRUEncrypt.ntt import check_ntt_parameters, ntt, inverse_ntt, pointwise_inverse
+from NTRUEncrypt.plaintext_to_ternary_conversion_utils import encode_messages, decode_messages
+from NTRUEncrypt.ternary_polynomial import random_ternary_matrix
+from NTRUEncrypt.truncated_polynomial import TruncatedPolynomial
+
+
+class NTTNTRUEncrypt(NTRUEncrypt):
+    """
+    NTRUEncrypt in an NTT-friendly parameter mode over the ring Z_q[x]/(x^N + 1): N is a
+    power of two and the large modulus q is a prime with 2N | q - 1, e.g. N = 512 and
+    q = 12289. The transforms of f and h are kept with the keys, so every ring product is
+    a pointwise product in O(N log N) and f_q is found by inverting the evaluations of f
+    one by one. Private keys are always in product form f = 1 + p * F.
+
+    Keys and ciphertexts are elements of Z[x]/(x^N + 1), so they work with this class only,
+    not with NTRUEncrypt or NTRUEncryptor.
+    """
+
+    negacyclic = True
+
+    def __init__(self, N=512, p=3, q=12289, df=None, dg=None, dr=None, key_material=None):
+        check_ntt_parameters(N, q)
+        self._f_ntt = None
+        self._h_ntt = None
+
+        super().__init__(N, p, q, df, dg, dr, product_form=True, key_material=key_material)
+
+    def _invert_mod_q(self, f):
+        """
+        Finds the inverse of f modulo the prime q pointwise in the transform domain
+        :raises NotInvertibleError: if f vanishes at a root of unity
+        """
+        return TruncatedPolynomial(inverse_ntt(pointwise_inverse(ntt(f.coefficients, self.q), self.q), self.q))
+
+    def _generate_public_key(self):
+        """
+        Generates the NTRUEncrypt public key 'h' and keeps the transforms of f and h
+        """
+        self._f_ntt = ntt(self.f.to_dense().coefficients, self.q)
+
+        g_ntt = ntt(self.g.to_dense().coefficients, self.q)
+        self._h_ntt = self.p * g_ntt % self.q * ntt(self.fq.coefficients, self.q) % self.q
+        self.h = TruncatedPolynomial(inverse_ntt(self._h_ntt, self.q))
+
+    def _load_key_material(self, key_material):
+        super()._load_key_material(key_material)
+
+        self._f_ntt = ntt(self.f.to_dense().coefficients, self.q)
+        self._h_ntt = ntt(self.h.coefficients, self.q)
+
+    def _encrypt_coefficients(self, messages):
+        """
+        Encrypts the message polynomials given as rows of a coefficient matrix
+        :return: matrix with the coefficients of one ciphertext per row
+        """
+        r = random_ternary_matrix(len(messages), self.N, self.dr, self.dr)
+
+        return (inverse_ntt(ntt(r, self.q) * self._h_ntt % self.q, self.q) + messages) % self.q
+
+    def _decrypt_coefficients(self, ciphertexts):
+        """
+        Decrypts the ciphertexts given as rows of a coefficient matrix
+        :return: matrix with the coefficients of one message polynomial per row
+        """
+        a = inverse_ntt(ntt(ciphertexts, self.q) * self._f_ntt % self.q, self.q)
+
+        # Adjust coefficients to fall within (-q/2, q/2]
+        a[a > self.q // 2] -= self.q
+
+        return a % self.p
+
+    @timed('ntru.encrypt')
+    def encrypt_bytes(self, message):
+        """
+        Encrypts given byte message
+        :param message: bytes to encrypt, at most mask_length_byes - 42 of them
+        :return: encrypted message
+        """
+        return TruncatedPolynomial(self._encrypt_coefficients(encode_messages(self.oaep, [message], self.N))[0])
+
+    @timed('ntru.decrypt')
+    def decrypt_bytes(self, ciphertext):
+        """
+        Decrypts given ciphertext to the original byte message
+        :param ciphertext: ciphertext to decrypt (ring element, NTRUCiphertext or SymPy Poly)
+        :return: original bytes
+        """
+        if isinstance(ciphertext, NTRUCiphertext):
+            ciphertext = ciphertext.to_polynomial()
+        elif not isinstance(ciphertext, TruncatedPolynomial):
+            ciphertext = TruncatedPolynomial.from_poly(ciphertext, self.N, self.x)
+
+        return decode_messages(self.oaep, self._decrypt_coefficients(ciphertext.coefficients[None, :]))[0]
+
+    @timed('ntru.encrypt_batch')
+    def encrypt_many(self, messages):
+        """
+        Encrypts many byte messages at once
+        :param messages: list of byte messages to encrypt
+        :return: list of encrypted messages
+        """
+        ciphertexts = self._encrypt_coefficients(encode_messages(self.oaep, messages, self.N))
+
+        return [TruncatedPolynomial(coefficients) for coefficients in ciphertexts]
+
+    @timed('ntru.decrypt_batch')
+    def decrypt_many(self, ciphertexts):
+        """
+        Decrypts many ciphertexts at once to the original byte messages
+        :param ciphertexts: list of ciphertexts or a matrix with one ciphertext per row
+        :return: list of original byte messages
+        """
+        c = np.array([ciphertext.coefficients if isinstance(ciphertext, (TruncatedPolynomial, NTRUCiphertext))
+                      else ciphertext for ciphertext in ciphertexts], dtype=np.int64).reshape(-1, self.N)
+
+        return decode_messages(self.oaep, self._decrypt_coefficients(c))
@@ -1,67 +1,82 @@
-from sympy import symbols, Poly
-
-
-def decimal_to_ternary(n):
-    """Convert a decimal number to ternary (base 3), returning as a list of digits."""
-    if n == 0:
-        return [0]
-    digits = []
-    while n:
-        digits.append(n % 3)
-        n //= 3
-    return digits[::-1]
-
-
-def string_to_ternary(s, N):
-    """Convert a string to a ternary code, using ASCII values."""
-    s += chr(3)
-    ternary_array = []
-    for char in s:
-        ascii_val = ord(char)
-        ternary_digits = decimal_to_ternary(ascii_val)
-        # Prefix with necessary zeros to ensure fixed length for each character
-        ternary_digits = [0] * (5 - len(ternary_digits)) + ternary_digits
-        ternary_array.extend(ternary_digits)
-
-    for i in range(N - (len(s) * 5)):
-        ternary_array.append(0)
+import numpy as np
 
-    return ternary_array
 
+def ternary_capacity_in_bytes(N):
+    """Number of bytes that fit into N ternary digits when every 3 bits take 2 digits."""
+    return (N // 2) * 3 // 8
 
-def adjust_ternary(ternary_array):
-    """Adjust the ternary array from 0, 1, 2 to -1, 0, 1."""
-    return [x - 1 for x in ternary_array]
 
+def bytes_to_ternary(data, N):
+    """
+    Convert bytes to N ternary digits (0, 1, 2) by mapping every 3 bits to 2 digits.
+    Works on the last axis, so a matrix with one message per row is converted at once.
+    :param data: bytes or uint8 array of shape (..., length)
+    :param N: number of ternary digits of the result
+    :return: int64 array of shape (..., N), zero padded
+    """
+    if isinstance(data, (bytes, bytearray)):
+        data = np.frombuffer(data, dtype=np.uint8)
+    data = np.asarray(data, dtype=np.uint8)
 
-def ternary_to_poly(ternary_array, var='x'):
-    """Convert an adjusted ternary array to a SymPy Poly object."""
-    adjusted_array = ternary_array
-    x = symbols(var)
-    poly = Poly.from_list(adjusted_array[::-1], x)
-    return poly
+    length = data.shape[-1]
+    groups = -(-8 * length // 3)
+    if 2 * groups > N:
+        raise ValueError(f"{length} bytes do not fit into {N} ternary digits")
 
+    bits = np.zeros(data.shape[:-1] + (3 * groups,), dtype=np.int64)
+    bits[..., :8 * length] = np.unpackbits(data, axis=-1)
 
-def poly_to_ternary(poly):
-    """Convert a SymPy Poly object back to an original ternary array."""
-    return [coefficient for coefficient in poly.all_coeffs()][::-1]
+    # Every 3 bits form a value in [0, 8) which is written as 2 ternary digits
+    values = bits.reshape(data.shape[:-1] + (groups, 3)) @ np.array([4, 2, 1])
 
+    ternary_array = np.zeros(data.shape[:-1] + (N,), dtype=np.int64)
+    ternary_array[..., 0:2 * groups:2] = values // 3
+    ternary_array[..., 1:2 * groups:2] = values % 3
 
-def ternary_to_decimal(ternary_array):
-    """Convert a ternary number (as a list of digits) back to decimal."""
-    return sum(digit * 3 ** i for i, digit in enumerate(ternary_array[::-1]))
+    return ternary_array
 
 
-def ternary_string_back(ternary_array):
-    """Convert ternary code back to the original string."""
-    original_string = ""
-    i = 0
-    while i < len(ternary_array):
-        # Extract the ternary digits for one character
-        ternary_digit_chunk = ternary_array[i:i + 5]  # Fixed length for each ASCII character
-        decimal_value = ternary_to_decimal(ternary_digit_chunk)
-        if decimal_value == 3:
-            break
-        original_string += chr(decimal_value)
-        i += len(ternary_digit_chunk)
-    return original_string[:-1]
+def ternary_to_bytes(ternary_array, length):
+    """
+    Convert ternary digits produced by 'bytes_to_ternary' back to bytes.
+    Digit pairs above 7 can only come from corrupted input and are reduced modulo 8,
+    such errors are left to the integrity check of the padding scheme.
+    :param ternary_array: int array of shape (..., N)
+    :param length: number of bytes to restore
+    :return: uint8 array of shape (..., length)
+    """
+    ternary_array = np.asarray(ternary_array, dtype=np.int64)
+    groups = -(-8 * length // 3)
+
+    values = (3 * ternary_array[..., 0:2 * groups:2] + ternary_array[..., 1:2 * groups:2]) & 7
+    bits = (values[..., None] >> np.array([2, 1, 0])) & 1
+    bits = bits.reshape(ternary_array.shape[:-1] + (3 * groups,))[..., :8 * length]
+
+    return np.packbits(bits.astype(np.uint8), axis=-1)
+
+
+def encode_messages(oaep, messages, N):
+    """
+    Pad byte messages with OAEP and convert them to the coefficients of message polynomials
+    :param oaep: OAEP instance whose block length k is the byte capacity of the ring
+    :param messages: list of byte messages
+    :param N: degree of the ring
+    :return: int64 array of shape (len(messages), N), one message polynomial per row
+    """
+    padded_plaintexts = b''.join(oaep.encode_many(messages))
+    padded_plaintexts = np.frombuffer(padded_plaintexts, dtype=np.uint8).reshape(-1, oaep.k)
+
+    return bytes_to_ternary(padded_plaintexts, N)
+
+
+def decode_messages(oaep, coefficients):
+    """
+    Convert the coefficients of message polynomials back to the byte messages
+    :param oaep: OAEP instance the messages were encoded with
+    :param coefficients: int array of shape (count, N), one message polynomial per row
+    :return: list of byte messages
+    :raises ValueError: if the padding of a message is invalid
+    """
+    padded_plaintexts = ternary_to_bytes(coefficients, oaep.k)
+
+    return oaep.decode_many([padded_plaintext.tobytes() for padded_plaintext in padded_plaintexts])
@@ -0,0 +1,147 @@
+import numpy as np
+
+from NTRUEncrypt.truncated_polynomial import TruncatedPolynomial
+
+
+class NotInvertibleError(ValueError):
+    """
+    Raised when a polynomial has no inverse in the truncated polynomial ring
+    """
+
+
+def _bits_to_int(coefficients):
+    """
+    Packs GF(2) coefficients (lowest degree first) into an integer, bit i holding x^i
+    """
+    packed = np.packbits(np.asarray(coefficients, dtype=np.uint8) & 1, bitorder='little')
+    return int.from_bytes(packed.tobytes(), byteorder='little')
+
+
+def _int_to_bits(value, N):
+    """
+    Unpacks an integer built by '_bits_to_int' back to N GF(2) coefficients
+    """
+    packed = np.frombuffer(value.to_bytes((N + 7) // 8, byteorder='little'), dtype=np.uint8)
+    return np.unpackbits(packed, bitorder='little')[:N].astype(np.int64)
+
+
+def invert_mod_2(a):
+    """
+    Finds the inverse of the given polynomial in GF(2)[x]/(x^N - 1) with the almost inverse algorithm.
+    Polynomials are packed into Python integers, so every step is a single XOR or shift of N bits.
+    :param a: ring element to invert
+    :return: inverse with coefficients in {0, 1}
+    """
+    N = a.N
+    f = _bits_to_int(a.coefficients % 2)
+    g = (1 << N) | 1
+    b, c, k = 1, 0, 0
+
+    while True:
+        if f == 0:
+            raise NotInvertibleError("Polynomial is not invertible modulo 2")
+
+        # Divide f by x as long as its constant term is zero
+        shift = (f & -f).bit_length() - 1
+        f >>= shift
+        c <<= shift
+        k += shift
+
+        if f == 1:
+            break
+
+        if f.bit_length() < g.bit_length():
+            f, g = g, f
+            b, c = c, b
+
+        f ^= g
+        b ^= c
+
+    # Reduce b modulo x^N - 1 and multiply it by x^-k
+    mask = (1 << N) - 1
+    while b >> N:
+        b = (b & mask) ^ (b >> N)
+
+    shift = -k % N
+    b = ((b << shift) | (b >> (N - shift))) & mask
+
+    return TruncatedPolynomial(_int_to_bits(b, N))
+
+
+def invert_mod_prime(a, p):
+    """
+    Finds the inverse of the given polynomial in GF(p)[x]/(x^N - 1) for a prime p
+    with the almost inverse algorithm working on NumPy coefficient arrays.
+    :param a: ring element to invert
+    :param p: prime modulus
+    :return: inverse with coefficients in [0, p)
+    """
+    if p == 2:
+        return invert_mod_2(a)
+
+    N = a.N
+    size = 2 * N + 2
+
+    f = np.zeros(size, dtype=np.int64)
+    f[:N] = a.coefficients % p
+    g = np.zeros(size, dtype=np.int64)
+    g[0], g[N] = p - 1, 1
+    b = np.zeros(size, dtype=np.int64)
+    b[0] = 1
+    c = np.zeros(size, dtype=np.int64)
+    k = 0
+    degree_g = N
+
+    while True:
+        non_zero = np.flatnonzero(f)
+        if len(non_zero) == 0:
+            raise NotInvertibleError(f"Polynomial is not invertible modulo {p}")
+
+        # Divide f by x as long as its constant term is zero
+        shift = non_zero[0]
+        if shift:
+            f[:size - shift] = f[shift:].copy()
+            f[size - shift:] = 0
+            c[shift:] = c[:size - shift].copy()
+            c[:shift] = 0
+            k += shift
+
+        degree_f = non_zero[-1] - shift
+        if degree_f == 0:
+            break
+
+        if degree_f < degree_g:
+            f, g = g, f
+            b, c = c, b
+            degree_g = degree_f
+
+        u = f[0] * pow(int(g[0]), -1, p) % p
+        f = (f - u * g) % p
+        b = (b - u * c) % p
+
+    b = b * pow(int(f[0]), -1, p) % p
+    b = TruncatedPolynomial(b, N).coefficients
+
+    return TruncatedPolynomial(np.roll(b, -k) % p)
+
+
+def invert_mod_power_of_two(a, q):
+    """
+    Finds the inverse of the given polynomial in Z_q[x]/(x^N - 1) for q = 2^e by
+    inverting it modulo 2 and lifting the inverse with Newton iteration b = b * (2 - a * b),
+    which doubles the number of correct bits on every step.
+    :param a: ring element to invert
+    :param q: large modulus, must be a power of two
+    :return: inverse with coefficients in [0, q)
+    """
+    if q < 2 or q & (q - 1):
+        raise ValueError(f"Modulus {q} is not a power of two")
+
+    b = invert_mod_2(a)
+
+    modulus = 2
+    while modulus < q:
+        modulus = min(modulus * modulus, q)
+        b = (2 * b - a * (b * b).mod(modulus)).mod(modulus)
+
+    return b
@@ -0,0 +1,159 @@
+import math
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from NTRUEncrypt.truncated_polynomial import TruncatedPolynomial
+
+# Product-form parameter sets of IEEE 1363.1 as N: (df1 + df2 + df3, dg)
+EES_PRODUCT_FORM_WEIGHTS = {401: (22, 133), 439: (22, 146), 593: (28, 197), 743: (37, 247)}
+
+
+def rotation_windows(coefficients):
+    """
+    Builds a read-only view whose row N - i holds the coefficients of x^i * a(x)
+    in Z[x]/(x^N - 1), so that any rotation of 'a' is a single row lookup
+    :param coefficients: coefficients of a(x) ordered from the lowest degree
+    :return: (N + 1) x N view over the doubled coefficient array
+    """
+    return sliding_window_view(np.concatenate((coefficients, coefficients)), len(coefficients))
+
+
+def sparse_ternary_product(windows, plus_indices, minus_indices):
+    """
+    Multiplies a dense polynomial by a sparse ternary polynomial by adding and
+    subtracting rotated copies of the dense one, which costs O(N * d)
+    :param windows: rotation windows of the dense polynomial (see 'rotation_windows')
+    :param plus_indices: degrees of the +1 coefficients of the ternary polynomial
+    :param minus_indices: degrees of the -1 coefficients of the ternary polynomial
+    :return: coefficients of the product
+    """
+    N = windows.shape[1]
+    return windows[N - plus_indices].sum(axis=0) - windows[N - minus_indices].sum(axis=0)
+
+
+def random_ternary_matrix(count, N, d_plus, d_minus):
+    """
+    Generates dense coefficients of many random fixed weight ternary polynomials at once
+    :param count: number of polynomials
+    :param N: degree of the ring N
+    :param d_plus: number of +1 coefficients of each polynomial
+    :param d_minus: number of -1 coefficients of each polynomial
+    :return: count x N int64 matrix, one polynomial per row
+    """
+    # The first d_plus + d_minus columns of a random permutation per row
+    indices = np.argpartition(np.random.random((count, N)), d_plus + d_minus - 1, axis=1)[:, :d_plus + d_minus]
+    rows = np.arange(count)[:, None]
+
+    coefficients = np.zeros((count, N), dtype=np.int64)
+    coefficients[rows, indices[:, :d_plus]] = 1
+    coefficients[rows, indices[:, d_plus:]] = -1
+
+    return coefficients
+
+
+def default_weights(N):
+    """
+    Default numbers of +1 (and of -1) coefficients of F (or f), g and r. F and r enter every
+    encryption and decryption, so they get the small weight df1 + df2 + df3 of the product-form
+    EES parameter set of N, or ceil(sqrt(N)) for other degrees, which keeps those products
+    at O(N * sqrt(N)). g only enters key generation and keeps a weight of about N / 3.
+    :param N: degree of the ring N
+    :return: tuple (df, dg, dr)
+    """
+    d, dg = EES_PRODUCT_FORM_WEIGHTS.get(N, (math.isqrt(N - 1) + 1, N // 3))
+    return d, dg, d
+
+
+class TernaryPolynomial:
+    """
+    Sparse polynomial of Z[x]/(x^N - 1) with coefficients in {-1, 0, 1}
+    stored as the index lists of its +1 and -1 coefficients.
+    """
+
+    __slots__ = ('N', 'plus_indices', 'minus_indices')
+
+    __array_ufunc__ = None
+
+    def __init__(self, N, plus_indices, minus_indices):
+        """
+        :param N: degree of the ring N
+        :param plus_indices: degrees of the +1 coefficients
+        :param minus_indices: degrees of the -1 coefficients
+        """
+        self.N = N
+        self.plus_indices = np.asarray(plus_indices, dtype=np.int64)
+        self.minus_indices = np.asarray(minus_indices, dtype=np.int64)
+
+    @classmethod
+    def random(cls, N, d_plus, d_minus):
+        """
+        Generates a random ternary polynomial of a fixed weight
+        :param N: degree of the ring N
+        :param d_plus: number of +1 coefficients
+        :param d_minus: number of -1 coefficients
+        :return: sparse ternary polynomial
+        """
+        indices = np.random.choice(N, d_plus + d_minus, replace=False)
+        return cls(N, indices[:d_plus], indices[d_plus:])
+
+    def to_dense(self):
+        """
+        Converts the polynomial to a dense ring element
+        """
+        coefficients = np.zeros(self.N, dtype=np.int64)
+        coefficients[self.plus_indices] = 1
+        coefficients[self.minus_indices] = -1
+        return TruncatedPolynomial(coefficients)
+
+    def __mul__(self, other):
+        if isinstance(other, TruncatedPolynomial):
+            windows = rotation_windows(other.coefficients)
+            return TruncatedPolynomial(sparse_ternary_product(windows, self.plus_indices, self.minus_indices))
+
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __repr__(self):
+        return f"TernaryPolynomial({self.N}, {self.plus_indices.tolist()}, {self.minus_indices.tolist()})"
+
+
+class ProductFormPolynomial:
+    """
+    Private key polynomial of the form f = 1 + p * F, where F is a sparse ternary polynomial.
+    Such f is congruent to 1 modulo p, so its inverse modulo p is 1.
+    """
+
+    __slots__ = ('F', 'p')
+
+    __array_ufunc__ = None
+
+    def __init__(self, F, p):
+        """
+        :param F: sparse ternary polynomial F
+        :param p: small modulus p
+        """
+        self.F = F
+        self.p = p
+
+    @property
+    def N(self):
+        return self.F.N
+
+    def to_dense(self):
+        """
+        Converts the polynomial to a dense ring element
+        """
+        return self.p * self.F.to_dense() + 1
+
+    def __mul__(self, other):
+        if isinstance(other, TruncatedPolynomial):
+            return other + self.p * (self.F * other)
+
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __repr__(self):
+        return f"ProductFormPolynomial({self.F!r}, {self.p})"
@@ -0,0 +1,192 @@
+from numbers import Integral
+
+import numpy as np
+from sympy import symbols, Poly
+
+
+def fold_coefficients(coefficients, N):
+    """
+    Folds the coefficients of a conventional polynomial into the
+    truncated polynomial ring Z[x]/(x^N - 1), i.e. adds the coefficient
+    of x^(i + kN) to the coefficient of x^i.
+    :param coefficients: coefficients ordered from the lowest degree
+    :param N: degree of the ring N
+    :return: int64 array of exactly N coefficients
+    """
+    coefficients = np.asarray(coefficients, dtype=np.int64)
+    blocks = -(-len(coefficients) // N) or 1
+
+    padded = np.zeros(blocks * N, dtype=np.int64)
+    padded[:len(coefficients)] = coefficients
+
+    return padded.reshape(blocks, N).sum(axis=0)
+
+
+def cyclic_convolution(a, b):
+    """
+    Multiplies two coefficient arrays of the same length N in Z[x]/(x^N - 1)
+    :param a: coefficients of the first polynomial
+    :param b: coefficients of the second polynomial
+    :return: coefficients of the product
+    """
+    N = len(a)
+    product = np.convolve(a, b)
+
+    result = product[:N].copy()
+    result[:N - 1] += product[N:]
+
+    return result
+
+
+def negacyclic_convolution(a, b):
+    """
+    Multiplies two coefficient arrays of the same length N in Z[x]/(x^N + 1)
+    :param a: coefficients of the first polynomial
+    :param b: coefficients of the second polynomial
+    :return: coefficients of the product
+    """
+    N = len(a)
+    product = np.convolve(a, b)
+
+    result = product[:N].copy()
+    result[:N - 1] -= product[N:]
+
+    return result
+
+
+def rotation_matrix(coefficients):
+    """
+    Builds the matrix of rotations of a(x), whose row i holds the coefficients of x^i * a(x)
+    in Z[x]/(x^N - 1). A row vector of coefficients of b(x) multiplied by it gives a(x) * b(x).
+    :param coefficients: coefficients of a(x) ordered from the lowest degree
+    :return: N x N int64 matrix
+    """
+    N = len(coefficients)
+    indices = (np.arange(N)[None, :] - np.arange(N)[:, None]) % N
+    return np.asarray(coefficients, dtype=np.int64)[indices]
+
+
+def batch_cyclic_convolution(rows, rotations):
+    """
+    Multiplies every row of the given coefficient matrix by the same polynomial
+    :param rows: B x N matrix of coefficients, one polynomial per row
+    :param rotations: matrix of rotations of the common factor (see 'rotation_matrix')
+    :return: B x N int64 matrix of products
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+
+    # Float64 BLAS product is exact as long as no partial sum reaches 2^53
+    bound = rows.shape[1] * int(np.abs(rows).max(initial=0)) * int(np.abs(rotations).max(initial=0))
+    if bound < 2 ** 53:
+        return np.rint(rows.astype(np.float64) @ rotations.astype(np.float64)).astype(np.int64)
+
+    return rows @ rotations
+
+
+class TruncatedPolynomial:
+    """
+    Element of the truncated polynomial ring Z[x]/(x^N - 1) backed by an
+    int64 NumPy array. coefficients[i] holds the coefficient of x^i.
+    Reduction modulo q or p is explicit (see 'mod' and 'center_lift'),
+    so the same type serves as an element of Z_q[x]/(x^N - 1) and Z_p[x]/(x^N - 1).
+    """
+
+    __slots__ = ('coefficients',)
+
+    # Make NumPy scalars defer to the reflected operators of this class
+    __array_ufunc__ = None
+
+    def __init__(self, coefficients, N=None):
+        """
+        :param coefficients: coefficients ordered from the lowest degree
+        :param N: degree of the ring N, the coefficients are padded or folded to it if given
+        """
+        if N is None:
+            self.coefficients = np.array(coefficients, dtype=np.int64)
+        else:
+            self.coefficients = fold_coefficients(coefficients, N)
+
+    @classmethod
+    def from_poly(cls, poly, N, x=None):
+        """
+        Converts SymPy polynomial (or expression) to the ring element
+        :param poly: SymPy Poly or expression in x
+        :param N: degree of the ring N
+        :param x: generator symbol, 'x' by default
+        :return: ring element
+        """
+        if not isinstance(poly, Poly):
+            poly = Poly(poly, x if x is not None else symbols('x'))
+
+        coefficients = [int(coefficient) for coefficient in reversed(poly.all_coeffs())]
+        return cls(coefficients, N)
+
+    def to_poly(self, x=None):
+        """
+        Converts the ring element to SymPy polynomial
+        :param x: generator symbol, 'x' by default
+        :return: SymPy Poly object
+        """
+        x = x if x is not None else symbols('x')
+        return Poly([int(coefficient) for coefficient in self.coefficients[::-1]], x)
+
+    @property
+    def N(self):
+        return len(self.coefficients)
+
+    def mod(self, n):
+        """
+        Takes modulo n of every coefficient
+        :param n: the number to take the modulo of
+        :return: ring element with coefficients in [0, n)
+        """
+        return TruncatedPolynomial(self.coefficients % n)
+
+    def center_lift(self, n):
+        """
+        Reduces every coefficient modulo n and lifts it to the interval (-n/2, n/2]
+        :param n: the number to take the modulo of
+        :return: centered ring element
+        """
+        coefficients = self.coefficients % n
+        coefficients[coefficients > n // 2] -= n
+        return TruncatedPolynomial(coefficients)
+
+    def __add__(self, other):
+        if isinstance(other, TruncatedPolynomial):
+            return TruncatedPolynomial(self.coefficients + other.coefficients)
+
+        coefficients = self.coefficients.copy()
+        coefficients[0] += other
+        return TruncatedPolynomial(coefficients)
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        return TruncatedPolynomial(-self.coefficients)
+
+    def __sub__(self, other):
+        return self + (-other)
+
+    def __rsub__(self, other):
+        return (-self) + other
+
+    def __mul__(self, other):
+        if isinstance(other, TruncatedPolynomial):
+            return TruncatedPolynomial(cyclic_convolution(self.coefficients, other.coefficients))
+
+        if isinstance(other, Integral):
+            return TruncatedPolynomial(self.coefficients * other)
+
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other):
+        if not isinstance(other, TruncatedPolynomial):
+            return NotImplemented
+
+        return np.array_equal(self.coefficients, other.coefficients)
+
+    def __repr__(self):
+        return f"TruncatedPolynomial({self.coefficients.tolist()})"
@@ -1,5 +1,6 @@
 # Implemented according to https://www.ietf.org/rfc/rfc2437.txt
 
+from functools import lru_cache
 from math import ceil
 import os
 import hashlib
@@ -10,95 +11,118 @@ def i2osp(x, xLen):
     return x.to_bytes(xLen, byteorder='big')
 
 
-def mgf1(Z, l, hash_func=hashlib.sha1):
-    h_len = hash_func().digest_size
+def xor_bytes(a, b):
+    """ XORs two octet strings of the same length as big integers. """
+    return (int.from_bytes(a, byteorder='big') ^ int.from_bytes(b, byteorder='big')).to_bytes(len(a), byteorder='big')
+
+
+# Octet strings of the counters used by masks up to 256 hash blocks long
+_COUNTERS = [i2osp(counter, 4) for counter in range(256)]
+
+
+def mgf1(Z, l, hash_func=hashlib.sha1, h_len=None):
+    if h_len is None:
+        h_len = hash_func().digest_size
 
     if l > (2 ** 32) * h_len:
         raise ValueError("mask too long")
 
-    t = b""
+    blocks = ceil(l / h_len)
+    counters = _COUNTERS[:blocks] if blocks <= len(_COUNTERS) else (i2osp(counter, 4) for counter in range(blocks))
 
-    for counter in range(ceil(l / h_len)):
-        c = i2osp(counter, 4)
-        t += hash_func(Z + c).digest()
+    # All hash blocks are joined into a single buffer allocated once
+    t = b"".join([hash_func(Z + c).digest() for c in counters])
 
-    return t[:l]
+    return t[:l] if len(t) > l else t
 
 
-def oaep_encode(M: bytes, L: bytes = b'', k: int = 128, hash_func=hashlib.sha1):
-    h_len = hash_func().digest_size
-    m_len = len(M)
+class OAEP:
+    """
+    OAEP codec for fixed label L, encoded message length k and hash function.
+    The label hash and hash parameters are computed once per codec.
+    """
 
-    # 1. Hash the label L
-    l_hash = hash_func(L).digest()
+    def __init__(self, L: bytes = b'', k: int = 128, hash_func=hashlib.sha1):
+        self.L = L
+        self.k = k
+        self.hash_func = hash_func
+        self.h_len = hash_func().digest_size
+        self.l_hash = hash_func(L).digest()
+        self.db_length = k - self.h_len - 1
+        self.max_message_length = k - 2 * self.h_len - 2
 
-    # 2. Generate a padding string PS
-    ps = b'\x00' * (k - m_len - 2 * h_len - 2)
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def for_parameters(L: bytes = b'', k: int = 128, hash_func=hashlib.sha1):
+        """
+        Returns a shared codec for the given parameters, creating it on the first call
+        """
+        return OAEP(L, k, hash_func)
 
-    # 3. Concatenate lHash, PS, a single byte 0x01, and the message M
-    db = l_hash + ps + b'\x01' + M
+    def encode(self, M: bytes, seed: bytes = None) -> bytes:
+        if len(M) > self.max_message_length:
+            raise ValueError("Encoding error: message too long")
 
-    # 4. Generate a random seed
-    seed = os.urandom(h_len)
+        # 1. - 3. Concatenate lHash, a padding string PS of zeros, a single byte 0x01, and the message M
+        db = self.l_hash + b'\x00' * (self.max_message_length - len(M)) + b'\x01' + M
 
-    # 5. Use MGF1 to generate a mask for the data block
-    db_mask = mgf1(seed, k - h_len - 1, hash_func)
+        # 4. Generate a random seed
+        if seed is None:
+            seed = os.urandom(self.h_len)
 
-    # 6. Mask the data block
-    masked_db = bytes(a ^ b for a, b in zip(db, db_mask))
+        # 5. - 6. Mask the data block with MGF1 of the seed
+        masked_db = xor_bytes(db, mgf1(seed, self.db_length, self.hash_func, self.h_len))
 
-    # 7. Use MGF1 to generate a mask for the seed
-    seed_mask = mgf1(masked_db, h_len, hash_func)
+        # 7. - 8. Mask the seed with MGF1 of the masked data block
+        masked_seed = xor_bytes(seed, mgf1(masked_db, self.h_len, self.hash_func, self.h_len))
 
-    # 8. Mask the seed
-    masked_seed = bytes(a ^ b for a, b in zip(seed, seed_mask))
+        # 9. Concatenate maskedSeed and maskedDB to form the encoded message EM
+        return b'\x00' + masked_seed + masked_db
 
-    # 9. Concatenate maskedSeed and maskedDB to form the encoded message EM
-    em = b'\x00' + masked_seed + masked_db
-    return em
+    def decode(self, EM: bytes) -> bytes:
+        # The encoded message must be exactly k octets long and start with a zero octet
+        if len(EM) != self.k:
+            raise ValueError("Decryption error: encoded message has incorrect length")
+        if EM[0] != 0:
+            raise ValueError("Decryption error: encoded message does not start with a zero octet")
 
+        # 1. Split the encoded message EM = 0x00 || maskedSeed || maskedDB
+        masked_seed, masked_db = EM[1:self.h_len + 1], EM[self.h_len + 1:]
 
-def oaep_decode(EM: bytes, L: bytes = b'', k: int = 128, hash_func=hashlib.sha1) -> bytes:
-    h_len = hash_func().digest_size
-    # 1. Hash the label L
-    l_hash = hash_func(L).digest()
+        # 2. - 3. Recover the seed
+        seed = xor_bytes(masked_seed, mgf1(masked_db, self.h_len, self.hash_func, self.h_len))
 
-    # 2. Split the encoded message EM
-    # EM = 0x00 || maskedSeed || maskedDB
-    _, masked_seed, masked_db = EM[0], EM[1:h_len + 1], EM[h_len + 1:]
+        # 4. - 5. Recover the data block DB
+        db = xor_bytes(masked_db, mgf1(seed, self.db_length, self.hash_func, self.h_len))
 
-    # 3. Generate the seedMask which was used to mask the seed
-    seed_mask = mgf1(masked_db, h_len, hash_func)
+        # 6. Find the index of the 0x01 byte, which is the separator
+        index_of_separator = db.find(b'\x01', self.h_len)
 
-    # 4. Recover the seed
-    seed = bytes(a ^ b for a, b in zip(masked_seed, seed_mask))
+        # Verify the conditions
+        if db[:self.h_len] != self.l_hash:
+            raise ValueError("Decryption error: label hash does not match")
+        if index_of_separator < 0:
+            raise ValueError("Decryption error: incorrect separator")
+        if db[self.h_len:index_of_separator].strip(b'\x00'):
+            raise ValueError("Decryption error: padding string is not correct")
 
-    # 5. Generate the dbMask which was used to mask the data block
-    db_mask = mgf1(seed, k - h_len - 1, hash_func)
+        # Extract the message M after the 0x01 separator
+        return db[index_of_separator + 1:]
 
-    # 6. Recover the data block DB
-    db = bytes(a ^ b for a, b in zip(masked_db, db_mask))
+    def encode_many(self, messages):
+        """
+        Encodes many messages, drawing the random seeds for all of them at once
+        """
+        seeds = os.urandom(self.h_len * len(messages))
+        return [self.encode(M, seeds[i * self.h_len:(i + 1) * self.h_len]) for i, M in enumerate(messages)]
 
-    # 7. Split the data block into its parts
-    l_hash_prime = db[:h_len]
-    # Find the index of the 0x01 byte, which is the separator
-    index_of_0x01 = db[h_len:].find(b'\x01') + h_len
-    ps = db[h_len:index_of_0x01]  # This should only consist of 0x00 bytes
-    separator = db[index_of_0x01]
-    m = db[index_of_0x01 + 1:]
+    def decode_many(self, encoded_messages):
+        return [self.decode(EM) for EM in encoded_messages]
 
-    # Verify the conditions
-    if l_hash_prime != l_hash:
-        raise ValueError("Decryption error: label hash does not match")
-    if separator != 0x01:
-        raise ValueError("Decryption error: incorrect separator")
-    if any(x != 0x00 for x in ps):
-        raise ValueError("Decryption error: padding string is not correct")
 
-    # Find the index of the first non-zero byte after lHash_prime which should be the separator 0x01
-    index_of_separator = db.find(b'\x01', h_len)
+def oaep_encode(M: bytes, L: bytes = b'', k: int = 128, hash_func=hashlib.sha1):
+    return OAEP.for_parameters(L, k, hash_func).encode(M)
 
-    # Extract the message M after the 0x01 separator
-    m = db[index_of_separator + 1:]
 
-    return m
+def oaep_decode(EM: bytes, L: bytes = b'', k: int = 128, hash_func=hashlib.sha1) -> bytes:
+    return OAEP.for_parameters(L, k, hash_func).decode(EM)
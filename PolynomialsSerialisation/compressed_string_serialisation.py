@@ -1,7 +1,155 @@
 from sympy import symbols, Poly
 import base64
+import lzma
+import struct
 import zlib
 
+import numpy as np
+
+from PolynomialsSerialisation.fixed_block_serialisation import compress_polynomial, decompress_polynomials
+
+# Binary wire format:
+#     MAGIC | version (1) | coefficient encoding (1) | compressor (1) | reserved (1) | N (4) | modulus (4) | payload
+# The payload holds the encoded coefficients, compressed with the compressor named in the header.
+MAGIC = b'NPOL'
+VERSION = 1
+
+# Coefficients in [0, modulus) packed with ceil(log2(modulus)) bits each
+ENCODING_PACKED = 0
+# Coefficients in {-1, 0, 1}, five base 3 digits per byte
+ENCODING_TERNARY = 1
+# Packed like ENCODING_PACKED, decoded to the centered range (-modulus / 2, modulus / 2]
+ENCODING_CENTERED = 2
+
+_ENCODINGS = {'packed': ENCODING_PACKED, 'ternary': ENCODING_TERNARY, 'centered': ENCODING_CENTERED}
+
+_HEADER_FORMAT = '>4sBBBxII'
+_HEADER_LENGTH = struct.calcsize(_HEADER_FORMAT)
+
+_TRITS_PER_BYTE = 5
+_TRIT_WEIGHTS = 3 ** np.arange(_TRITS_PER_BYTE, dtype=np.int64)
+
+# Compressor identifier -> (name, compress(data, level), decompress(data))
+_COMPRESSORS = {
+    0: ('none', lambda data, level: data, lambda data: data),
+    1: ('zlib', lambda data, level: zlib.compress(data, -1 if level is None else level), zlib.decompress),
+    2: ('lzma', lambda data, level: lzma.compress(data, preset=level), lzma.decompress),
+}
+
+
+def register_compressor(identifier, name, compress, decompress):
+    """
+    Registers a compressor usable by 'polynomial_to_bytes'
+    :param identifier: number stored in the header, 0 - 255
+    :param name: name passed as 'compression'
+    :param compress: function of (data, level) returning compressed bytes
+    :param decompress: function of data returning decompressed bytes
+    """
+    if not 0 <= identifier <= 255 or identifier in _COMPRESSORS:
+        raise ValueError(f"Compressor identifier {identifier} is invalid or already registered")
+
+    _COMPRESSORS[identifier] = (name, compress, decompress)
+
+
+def _compressor_identifier(name):
+    for identifier, (compressor_name, _, _) in _COMPRESSORS.items():
+        if compressor_name == name:
+            return identifier
+
+    raise ValueError(f"Unknown compressor '{name}'")
+
+
+def _encode_ternary(coefficients):
+    digits = np.zeros(-(-len(coefficients) // _TRITS_PER_BYTE) * _TRITS_PER_BYTE, dtype=np.int64)
+    digits[:len(coefficients)] = coefficients % 3
+
+    return (digits.reshape(-1, _TRITS_PER_BYTE) @ _TRIT_WEIGHTS).astype(np.uint8).tobytes()
+
+
+def _decode_ternary(payload, N):
+    if len(payload) != -(-N // _TRITS_PER_BYTE):
+        raise ValueError("Deserialisation error: ternary payload has unexpected length")
+
+    digits = (np.frombuffer(payload, dtype=np.uint8).astype(np.int64)[:, None] // _TRIT_WEIGHTS) % 3
+    digits = digits.reshape(-1)[:N]
+
+    # Digit 2 stands for -1
+    return np.where(digits == 2, -1, digits)
+
+
+def polynomial_to_bytes(coefficients, modulus, encoding='packed', compression='none', level=None):
+    """
+    Serialises polynomial coefficients to the binary wire format
+    :param coefficients: integer array of coefficients
+    :param modulus: modulo of coefficients, 3 for the ternary encoding
+    :param encoding: 'packed', 'ternary' or 'centered'
+    :param compression: 'none', 'zlib', 'lzma' or the name of a registered compressor
+    :param level: compression level, the compressor default if not given
+    :return: serialised polynomial
+    """
+    if encoding not in _ENCODINGS:
+        raise ValueError(f"Unknown coefficient encoding '{encoding}'")
+    if not 2 <= modulus < 2 ** 32:
+        raise ValueError("Modulus must fit into 32 bits")
+
+    coefficients = np.asarray(coefficients, dtype=np.int64)
+    identifier = _compressor_identifier(compression)
+
+    if _ENCODINGS[encoding] == ENCODING_TERNARY:
+        payload = _encode_ternary(coefficients)
+    else:
+        payload = compress_polynomial(coefficients % modulus, modulus)
+
+    header = struct.pack(_HEADER_FORMAT, MAGIC, VERSION, _ENCODINGS[encoding], identifier, len(coefficients), modulus)
+    return header + _COMPRESSORS[identifier][1](payload, level)
+
+
+def read_polynomial_header(data):
+    """
+    Parses the header of a serialised polynomial
+    :param data: serialised polynomial
+    :return: tuple (N, modulus, encoding, compressor identifier)
+    """
+    if len(data) < _HEADER_LENGTH:
+        raise ValueError("Deserialisation error: header is truncated")
+
+    magic, version, encoding, identifier, N, modulus = struct.unpack_from(_HEADER_FORMAT, data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Deserialisation error: unsupported polynomial format")
+    if encoding not in _ENCODINGS.values():
+        raise ValueError(f"Deserialisation error: unknown coefficient encoding {encoding}")
+    if identifier not in _COMPRESSORS:
+        raise ValueError(f"Deserialisation error: unknown compressor {identifier}")
+
+    return N, modulus, encoding, identifier
+
+
+def bytes_to_polynomial(data):
+    """
+    Deserialises the binary wire format straight to a coefficient array
+    :param data: serialised polynomial
+    :return: int64 array of N coefficients
+    """
+    N, modulus, encoding, identifier = read_polynomial_header(data)
+
+    # Uncompressed payloads are decoded straight from the given buffer
+    payload = memoryview(data)[_HEADER_LENGTH:]
+    if identifier != _compressor_identifier('none'):
+        payload = _COMPRESSORS[identifier][2](bytes(payload))
+
+    if encoding == ENCODING_TERNARY:
+        return _decode_ternary(payload, N)
+
+    polynomials = decompress_polynomials(payload, modulus, N)
+    if len(polynomials) != 1:
+        raise ValueError("Deserialisation error: packed payload has unexpected length")
+
+    coefficients = polynomials[0]
+    if encoding == ENCODING_CENTERED:
+        coefficients = np.where(coefficients > modulus // 2, coefficients - modulus, coefficients)
+
+    return coefficients
+
 
 def poly_to_base64(poly, apply_compression=False):
     """
@@ -19,13 +167,9 @@ def poly_to_base64(poly, apply_compression=False):
 
     # Apply compression if needed
     if apply_compression:
-        compressed_data = zlib.compress(encoded_bytes)
-        print(f"Size of uncompressed data: {len(encoded_bytes)}")
-        print(f"Size of compressed data {len(compressed_data)}")
+        encoded_bytes = zlib.compress(encoded_bytes)
 
-        return base64.b64encode(compressed_data).decode()
-    else:
-        return base64.b64encode(encoded_bytes).decode()
+    return base64.b64encode(encoded_bytes).decode()
 
 
 def base64_to_poly(base64_str, compression_applied=False):
@@ -46,6 +190,6 @@ def base64_to_poly(base64_str, compression_applied=False):
 
     decoded_string = decoded_bytes.decode('utf-8')
 
-    # Parse a stringified array to an array of integers
+    # Parse a stringified array to an array of integers, the highest degree first
     coefficients = [int(x) for x in decoded_string.split(',')]
-    return Poly(sum(coefficients[i] * x ** (len(coefficients) - 1 - i) for i in range(len(coefficients))), x)
+    return Poly(coefficients, x)
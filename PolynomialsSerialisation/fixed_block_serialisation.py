@@ -1,3 +1,4 @@
+import numpy as np
 import sympy
 import random
 from typing import List
@@ -26,6 +27,40 @@ def random_polynomial(degree, coeff_range):
     return sympy.poly(polynomial)
 
 
+def _coefficient_width(n):
+    return math.ceil(math.log2(n)) if n > 1 else 0
+
+
+def _bit_weights(b):
+    """
+    Weights of the bits of one coefficient, the most significant bit first
+    """
+    return np.left_shift(np.uint64(1), np.arange(b - 1, -1, -1, dtype=np.uint64))
+
+
+def _pack_rows(coefficient_matrix, b):
+    """
+    Packs every row of coefficients into a big-endian bit stream of b bits per coefficient,
+    zero bits are prepended to the first coefficient to fill whole bytes
+    """
+    coefficient_matrix = np.asarray(coefficient_matrix, dtype=np.uint64)
+    count, length = coefficient_matrix.shape
+    pad = -(length * b) % 8
+
+    bits = np.zeros((count, pad + length * b), dtype=np.uint8)
+    shifts = np.arange(b - 1, -1, -1, dtype=np.uint64)
+    bits[:, pad:] = ((coefficient_matrix[:, :, None] >> shifts) & np.uint64(1)).reshape(count, -1)
+
+    return np.packbits(bits, axis=1)
+
+
+def _unpack_bits(bits, b, length):
+    """
+    Rebuilds coefficients from rows of length * b bits
+    """
+    return bits.reshape(len(bits), length, b).astype(np.int64) @ _bit_weights(b).astype(np.int64)
+
+
 def compress_polynomial(coefficients: List[int], n: int) -> bytes:
     """
     Serialises the given polynomial coefficients to a compressed form
@@ -34,31 +69,9 @@ def compress_polynomial(coefficients: List[int], n: int) -> bytes:
     :return: compressed polynomial
     """
     # Calculate bits needed per coefficient
-    b = math.ceil(math.log2(n))
-
-    # Initialize the bit stream
-    bit_stream = 0
-    current_bit_length = 0
-
-    # Pack each coefficient into the bit stream
-    for coefficient in coefficients:
-        bit_stream <<= b
-        bit_stream |= coefficient
-        current_bit_length += b
-
-    # Convert the bit stream into bytes
-    # Calculate how many full bytes are in the bit stream
-    byte_count = (current_bit_length + 7) // 8
-
-    # Create a byte array
-    byte_array = bytearray(byte_count)
-
-    # Fill the byte array from the bit stream
-    for i in range(byte_count - 1, -1, -1):
-        byte_array[i] = bit_stream & 0xFF  # Mask the lowest 8 bits
-        bit_stream >>= 8  # Shift right by 8 bits
+    b = _coefficient_width(n)
 
-    return bytes(byte_array)
+    return _pack_rows(np.asarray(coefficients).reshape(1, -1), b).tobytes()
 
 
 def decompress_polynomial(compressed_bytes: bytes, n: int, length: int) -> List[int]:
@@ -66,25 +79,44 @@ def decompress_polynomial(compressed_bytes: bytes, n: int, length: int) -> List[
     Decompresses the given compressed polynomial
     """
     # Calculate bits needed per coefficient
-    b = math.ceil(math.log2(n))
+    b = _coefficient_width(n)
 
-    # Convert bytes back into a bit stream
-    bit_stream = 0
-    for byte in compressed_bytes:
-        bit_stream = (bit_stream << 8) | byte
+    # Coefficients are taken from the end of the bit stream, missing leading bits are zeros
+    bits = np.unpackbits(np.frombuffer(compressed_bytes, dtype=np.uint8))
+    needed = length * b
+    if len(bits) >= needed:
+        bits = bits[len(bits) - needed:]
+    else:
+        bits = np.concatenate((np.zeros(needed - len(bits), dtype=np.uint8), bits))
 
-    # Extract coefficients from the bit stream
-    coefficients = []
-    # We'll use a mask to extract 'b' bits at a time
-    mask = (1 << b) - 1
+    return _unpack_bits(bits[None, :], b, length)[0].tolist()
 
-    # Extract exactly 'length' coefficients
-    for _ in range(length):
-        # Extract the last 'b' bits (current coefficient)
-        coefficient = (bit_stream >> (b * (_))) & mask
-        coefficients.append(coefficient)
 
-    # Reverse the list to restore the original order since they are extracted from least to most significant
-    coefficients.reverse()
+def compress_polynomials(coefficient_matrix, n: int) -> bytes:
+    """
+    Serialises many polynomials of the same length into one contiguous buffer,
+    every polynomial takes ceil(length * b / 8) bytes in the format of 'compress_polynomial'
+    :param coefficient_matrix: count x length integer matrix of coefficients
+    :param n: modulo of coefficients
+    :return: compressed polynomials
+    """
+    return _pack_rows(coefficient_matrix, _coefficient_width(n)).tobytes()
+
+
+def decompress_polynomials(compressed_bytes: bytes, n: int, length: int) -> np.ndarray:
+    """
+    Decompresses the buffer produced by 'compress_polynomials'
+    :param compressed_bytes: compressed polynomials
+    :param n: modulo of coefficients
+    :param length: number of coefficients of every polynomial
+    :return: count x length int64 matrix of coefficients
+    """
+    b = _coefficient_width(n)
+    row_bytes = (length * b + 7) // 8
+
+    data = np.frombuffer(compressed_bytes, dtype=np.uint8)
+    if row_bytes == 0 or len(data) % row_bytes:
+        raise ValueError("Deserialisation error: buffer length is not a multiple of the polynomial size")
 
-    return coefficients
+    bits = np.unpackbits(data.reshape(-1, row_bytes), axis=1)[:, row_bytes * 8 - length * b:]
+    return _unpack_bits(bits, b, length)
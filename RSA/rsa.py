@@ -1,52 +1,140 @@
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
 from cryptography.hazmat.primitives import serialization
 
+from Instrumentation.metrics import timed
+
+# Padding objects are immutable, so one instance is shared by all calls and threads
+OAEP_SHA256_PADDING = padding.OAEP(
+    mgf=padding.MGF1(algorithm=hashes.SHA256()),
+    algorithm=hashes.SHA256(),
+    label=None
+)
 
+
+@timed('rsa.keygen')
 def generate_rsa_key_pair(key_size):
-    start_time = time.time()
     private_key = rsa.generate_private_key(
         public_exponent=65537,
         key_size=key_size,
         backend=default_backend()
     )
-    end_time = time.time()
-    print("Key generation time:", end_time - start_time, "seconds")
 
     public_key = private_key.public_key()
     return private_key, public_key
 
 
 def encrypt_message(public_key, message):
-    start_time = time.time()
-    encrypted_message = public_key.encrypt(
-        message.encode(),
-        padding.OAEP(
-            mgf=padding.mgf1(algorithm=hashes.SHA256()),
-            algorithm=hashes.SHA256(),
-            label=None
-        )
-    )
-    end_time = time.time()
-    print("Encryption time:", end_time - start_time, "seconds")
-    return encrypted_message
+    return encrypt_bytes(public_key, message.encode())
 
 
 def decrypt_message(private_key, encrypted_message):
-    start_time = time.time()
-    decrypted_message = private_key.decrypt(
-        encrypted_message,
-        padding.OAEP(
-            mgf=padding.mgf1(algorithm=hashes.SHA256()),
-            algorithm=hashes.SHA256(),
-            label=None
-        )
-    )
-    end_time = time.time()
-    print("Decryption time:", end_time - start_time, "seconds")
-    return decrypted_message.decode()
+    return decrypt_bytes(private_key, encrypted_message).decode()
+
+
+@timed('rsa.encrypt')
+def encrypt_bytes(public_key, message):
+    return public_key.encrypt(message, OAEP_SHA256_PADDING)
+
+
+@timed('rsa.decrypt')
+def decrypt_bytes(private_key, encrypted_message):
+    return private_key.decrypt(encrypted_message, OAEP_SHA256_PADDING)
+
+
+class RSACipher:
+    """
+    RSA-OAEP with SHA-256 bound to a key pair. Batches are spread over a thread pool,
+    OpenSSL releases the GIL during the modular exponentiation.
+    """
+
+    def __init__(self, public_key=None, private_key=None, max_workers=None, executor=None):
+        """
+        :param public_key: public key, derived from the private key if not given
+        :param private_key: private key, needed only for decryption
+        :param max_workers: size of the thread pool created on the first batch, the number of CPUs by default
+        :param executor: executor to use for batches instead of an own thread pool
+        """
+        if public_key is None:
+            if private_key is None:
+                raise ValueError("RSACipher needs a public or a private key")
+            public_key = private_key.public_key()
+
+        self.public_key = public_key
+        self.private_key = private_key
+        self.max_workers = max_workers
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._executor_lock = threading.Lock()
+
+    @classmethod
+    def generate(cls, key_size=2048, **kwargs):
+        """
+        Creates a cipher with a freshly generated key pair
+        """
+        private_key, public_key = generate_rsa_key_pair(key_size)
+        return cls(public_key, private_key, **kwargs)
+
+    def encrypt(self, message):
+        return encrypt_bytes(self.public_key, message)
+
+    def decrypt(self, ciphertext):
+        if self.private_key is None:
+            raise ValueError("Decryption error: the private key is not available")
+
+        return decrypt_bytes(self.private_key, ciphertext)
+
+    def _map(self, func, items):
+        items = list(items)
+        if len(items) <= 1 or self.max_workers == 1:
+            return [func(item) for item in items]
+
+        # Concurrent first batches must not create two pools
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            executor = self._executor
+
+        return list(executor.map(func, items))
+
+    def encrypt_many(self, messages):
+        """
+        Encrypts many byte messages in parallel
+        :param messages: iterable of byte messages
+        :return: list of ciphertexts in the order of the messages
+        """
+        return self._map(self.encrypt, messages)
+
+    def decrypt_many(self, ciphertexts):
+        """
+        Decrypts many ciphertexts in parallel
+        :param ciphertexts: iterable of ciphertexts
+        :return: list of byte messages in the order of the ciphertexts
+        """
+        return self._map(self.decrypt, ciphertexts)
+
+    def close(self):
+        """
+        Shuts down the thread pool created by the cipher
+        """
+        if not self._owns_executor:
+            return
+
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
 
 def measure_private_key_size(private_key):
@@ -0,0 +1,51 @@
+"""
+Benchmark suite comparing RSA, NTRUEncrypt and McEliece over their standard parameter sets.
+Key generation, encryption, decryption and public key serialisation are timed with warmup
+and repetitions. Every parameter set runs in a fresh process, so the reported peak RSS
+belongs to that parameter set alone.
+
+Run from the repository root:
+    python -m benchmarks --schemes ntru mceliece --json results.json --csv results.csv
+    python -m benchmarks --schemes rsa --parameters 2048 --repetitions 200
+"""
+import argparse
+import json
+
+from benchmarks.schemes import SCHEMES
+from benchmarks.suite import run_parameter_set, run_isolated, write_csv, print_result
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--schemes', nargs='+', choices=sorted(SCHEMES), default=sorted(SCHEMES))
+    parser.add_argument('--parameters', nargs='+', help="parameter set labels to run, all by default")
+    parser.add_argument('--repetitions', type=int, default=50)
+    parser.add_argument('--keygen-repetitions', type=int, default=3)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--no-isolation', action='store_true', help="run every parameter set in this process")
+    parser.add_argument('--json', help="path of the JSON report")
+    parser.add_argument('--csv', help="path of the CSV report")
+    args = parser.parse_args()
+
+    run = run_parameter_set if args.no_isolation else run_isolated
+
+    results = []
+    for scheme_name in args.schemes:
+        for label in SCHEMES[scheme_name].PARAMETER_SETS:
+            if args.parameters and label not in args.parameters:
+                continue
+
+            result = run(scheme_name, label, args.repetitions, args.warmup, args.keygen_repetitions)
+            print_result(result)
+            results.append(result)
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2)
+    if args.csv:
+        write_csv(args.csv, results)
+
+
+if __name__ == '__main__':
+    main()
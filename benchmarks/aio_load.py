@@ -0,0 +1,105 @@
+"""
+Local load generator of the asyncio front-end. Concurrent clients encrypt and decrypt
+session keys through one AsyncCipher; every request is checked to round-trip and the
+throughput and tail latency are reported for each micro-batch size.
+
+Run from the repository root:
+    python -m benchmarks.aio_load --scheme ntru --clients 64 --requests 2000 --max-batch 1 32
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from Concurrency.aio import AsyncCipher
+from HybridEncryption.key_encapsulation import choose_secret_length, OAEP_SHA256_OVERHEAD
+from McEliece.mceliece import McEliece
+from NTRUEncrypt.ntruencrypt import NTRUEncrypt
+from NTRUEncrypt.ntt_ntruencrypt import NTTNTRUEncrypt
+from RSA.rsa import RSACipher
+from benchmarks.timing import percentile
+
+
+def create_instance(scheme):
+    """
+    :return: scheme instance and the length of the session keys it encrypts
+    """
+    if scheme == 'rsa':
+        instance = RSACipher.generate(2048)
+        return instance, choose_secret_length(instance.public_key.key_size // 8 - OAEP_SHA256_OVERHEAD)
+    if scheme == 'ntru':
+        instance = NTRUEncrypt(821, 3, 4096)
+    elif scheme == 'ntt':
+        instance = NTTNTRUEncrypt(512, 3, 12289)
+    else:
+        instance = McEliece(1024, 50, 10)
+
+    return instance, choose_secret_length(instance.oaep.max_message_length)
+
+
+async def run_load(cipher, message_length, clients, requests):
+    """
+    Runs 'requests' encrypt-then-decrypt round trips spread over concurrent clients
+    :return: wall time in nanoseconds and the latencies of encryption and decryption in nanoseconds
+    """
+    latencies = {'encrypt': [], 'decrypt': []}
+    remaining = requests
+
+    async def client():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            message = os.urandom(message_length)
+
+            start = time.perf_counter_ns()
+            ciphertext = await cipher.encrypt(message)
+            middle = time.perf_counter_ns()
+            decrypted = await cipher.decrypt(ciphertext)
+            end = time.perf_counter_ns()
+
+            assert decrypted == message
+            latencies['encrypt'].append(middle - start)
+            latencies['decrypt'].append(end - middle)
+
+    start = time.perf_counter_ns()
+    await asyncio.gather(*(client() for _ in range(clients)))
+
+    return time.perf_counter_ns() - start, latencies
+
+
+async def main_async(args):
+    instance, message_length = create_instance(args.scheme)
+
+    print(f"{os.cpu_count()} CPUs, {args.scheme}, {args.clients} clients, {args.requests} round trips, "
+          f"at most {args.max_in_flight} requests in flight")
+    print(f"{'batch':>6} {'round trips/s':>14} {'encrypt p50, ms':>16} {'encrypt p99, ms':>16} "
+          f"{'decrypt p50, ms':>16} {'decrypt p99, ms':>16}")
+
+    for max_batch in args.max_batch:
+        async with AsyncCipher.for_scheme(instance, max_workers=args.workers, max_in_flight=args.max_in_flight,
+                                          max_batch=max_batch, batch_window=args.batch_window) as cipher:
+            # Warms up the pools, McEliece workers restore their keys on the first request
+            await run_load(cipher, message_length, args.clients, args.clients)
+            elapsed, latencies = await run_load(cipher, message_length, args.clients, args.requests)
+
+        print(f"{max_batch:>6} {args.requests * 1e9 / elapsed:>14.0f}" +
+              ''.join(f" {percentile(latencies[operation], q) / 1e6:>16.3f}"
+                      for operation in ('encrypt', 'decrypt') for q in (50, 99)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scheme', choices=('rsa', 'ntru', 'ntt', 'mceliece'), default='ntru')
+    parser.add_argument('--clients', type=int, default=64)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--max-in-flight', type=int, default=64)
+    parser.add_argument('--max-batch', type=int, nargs='+', default=[1, 32])
+    parser.add_argument('--batch-window', type=float, default=0.0005, help='seconds')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Sizes of the key and ciphertext containers against the scheme objects they replace, and the
+time of their serialisation. Correctness is covered by tests/test_key_containers.py.
+
+Run from the repository root:
+    python -m benchmarks.key_containers --ntru 821 3 4096 --mceliece 1024 50 10
+"""
+import argparse
+import os
+import pickle
+
+import numpy as np
+
+from McEliece.keys import McElieceCiphertext
+from McEliece.mceliece import McEliece
+from NTRUEncrypt.keys import NTRUCiphertext
+from NTRUEncrypt.ntruencrypt import NTRUEncrypt
+from benchmarks.timing import measure, median_ms
+
+
+def report(name, container, dense_nbytes, repetitions):
+    data = container.to_bytes()
+
+    to_bytes_ms = median_ms(measure(container.to_bytes, repetitions))
+    from_buffer_ms = median_ms(measure(lambda: type(container).from_buffer(data), repetitions))
+
+    print(f"{name:<22} {dense_nbytes:>12} {container.nbytes:>12} {len(data):>12} "
+          f"{len(pickle.dumps(container, protocol=5)):>12} {to_bytes_ms:>10.3f} {from_buffer_ms:>12.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ntru', type=int, nargs=3, default=[821, 3, 4096], metavar=('N', 'p', 'q'))
+    parser.add_argument('--mceliece', type=int, nargs=3, default=[1024, 50, 10], metavar=('n', 't', 'm'))
+    parser.add_argument('--repetitions', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'container':<22} {'dense, B':>12} {'arrays, B':>12} {'to_bytes, B':>12} {'pickle, B':>12} "
+          f"{'to_bytes, ms':>10} {'from_buffer, ms':>12}")
+
+    ntru = NTRUEncrypt(*args.ntru)
+    message = os.urandom(16)
+    ciphertext = ntru.encrypt_bytes(message)
+    dense_key = sum(polynomial.coefficients.nbytes for polynomial in (ntru.h, ntru.fp, ntru.fq, ntru.f.to_dense(),
+                                                                      ntru.g.to_dense()))
+
+    report('NTRUPublicKey', ntru.export_public_key(), ntru.h.coefficients.nbytes, args.repetitions)
+    report('NTRUPrivateKey', ntru.export_private_key(), dense_key, args.repetitions)
+    report('NTRUCiphertext', NTRUCiphertext.from_polynomial(ciphertext, ntru.q), ciphertext.coefficients.nbytes,
+           args.repetitions)
+
+    mceliece = McEliece(*args.mceliece)
+    ciphertext = mceliece.encrypt_bytes(message)
+    dense_key = mceliece.G_prime.nbytes + mceliece.S.nbytes + mceliece.S_inv.nbytes + sum(
+        np.asarray(array).astype(np.int64).nbytes for array in (mceliece.g_poly.coeffs, mceliece.L, mceliece.decoder.H,
+                                                                mceliece.information_set, mceliece.P))
+
+    report('McEliecePublicKey', mceliece.export_public_key(), mceliece.G_prime.nbytes, args.repetitions)
+    report('McEliecePrivateKey', mceliece.export_private_key(), dense_key, args.repetitions)
+    report('McElieceCiphertext', McElieceCiphertext.from_bits(ciphertext), ciphertext.nbytes, args.repetitions)
+
+
+if __name__ == '__main__':
+    main()
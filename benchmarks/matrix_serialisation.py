@@ -0,0 +1,56 @@
+"""
+Benchmark of binary matrix serialisation against the previous implementation,
+which packed one byte per loop iteration and parsed bytes back from binary strings.
+Correctness is covered by tests/test_binary_matrix_serialisation.py.
+
+Run from the repository root:
+    python -m benchmarks.matrix_serialisation --dims 2720 3488
+"""
+import argparse
+import math
+
+import numpy as np
+
+from MatricesSerialisation.binary_matrix_serialisation import matrix_to_byte_array, byte_array_to_matrix
+from benchmarks.timing import measure, median_ms
+
+
+def legacy_matrix_to_byte_array(binary_matrix):
+    flat_array = binary_matrix.flatten()
+    byte_array = bytearray(math.ceil(len(flat_array) / 8))
+    for i in range(len(byte_array)):
+        byte_array[i] = np.packbits(flat_array[i * 8:(i + 1) * 8])[0]
+    return byte_array
+
+
+def legacy_byte_array_to_matrix(byte_array, dims):
+    bit_list = []
+    for byte in byte_array:
+        bit_list.extend([int(bit) for bit in f'{byte:08b}'])
+    return np.array(bit_list[:dims[0] * dims[1]], dtype=np.uint8).reshape(dims)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dims', type=int, nargs=2, default=[2720, 3488])
+    parser.add_argument('--repetitions', type=int, default=3)
+    args = parser.parse_args()
+
+    dims = tuple(args.dims)
+    matrix = np.random.randint(2, size=dims, dtype=np.uint8)
+
+    serialised = legacy_matrix_to_byte_array(matrix)
+
+    cases = [
+        ('serialise', lambda: legacy_matrix_to_byte_array(matrix), lambda: matrix_to_byte_array(matrix)),
+        ('deserialise', lambda: legacy_byte_array_to_matrix(serialised, dims),
+         lambda: byte_array_to_matrix(serialised, dims)),
+    ]
+    print(f"{'operation':<12} {'previous, ms':>13} {'vectorised, ms':>15}")
+    for name, legacy, vectorised in cases:
+        previous_ms = median_ms(measure(legacy, args.repetitions, warmup=0))
+        print(f"{name:<12} {previous_ms:>13.1f} {median_ms(measure(vectorised, args.repetitions)):>15.3f}")
+
+
+if __name__ == '__main__':
+    main()
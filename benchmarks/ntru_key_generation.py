@@ -0,0 +1,69 @@
+"""
+Compares NTRUEncrypt private key inversion through SymPy 'invert' with Hensel lifting
+(the previous key generation path) against the almost inverse algorithm with Newton lifting.
+Correctness is covered by tests/test_ring_inversion.py.
+
+Run from the repository root:
+    python -m benchmarks.ntru_key_generation --N 509 677 821
+"""
+import argparse
+import math
+
+from sympy import symbols, Poly, invert
+from sympy.polys.domains import ZZ, GF
+
+from NTRUEncrypt.ring_inversion import invert_mod_prime, invert_mod_power_of_two
+from NTRUEncrypt.ternary_polynomial import TernaryPolynomial
+from NTRUEncrypt.truncated_polynomial import TruncatedPolynomial
+from benchmarks.timing import measure, median_ms
+
+
+def sympy_invert_mod_prime(f, p):
+    x = symbols('x')
+    inverse = invert(f.to_poly(x), Poly(x ** f.N - 1, x, domain=ZZ), domain=GF(p))
+    return TruncatedPolynomial.from_poly(inverse, f.N, x).mod(p)
+
+
+def sympy_invert_mod_power_of_two(f, q):
+    fq = sympy_invert_mod_prime(f, 2)
+    for _ in range(1, int(math.log(q, 2))):
+        fq = (2 * fq - f * (fq * fq).mod(q)).mod(q)
+    return fq
+
+
+def random_invertible_f(N, d):
+    while True:
+        f = TernaryPolynomial.random(N, d + 1, d).to_dense()
+        try:
+            invert_mod_prime(f, 3)
+            invert_mod_power_of_two(f, 2)
+            return f
+        except ValueError:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--N', type=int, nargs='+', default=[509, 677, 821])
+    parser.add_argument('--p', type=int, default=3)
+    parser.add_argument('--q', type=int, default=2048)
+    parser.add_argument('--repetitions', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'N':>5} {'operation':<12} {'sympy, ms':>12} {'almost inverse, ms':>20} {'speedup':>9}")
+    for N in args.N:
+        f = random_invertible_f(N, N // 3)
+
+        cases = [
+            (f"mod {args.p}", lambda: sympy_invert_mod_prime(f, args.p), lambda: invert_mod_prime(f, args.p)),
+            (f"mod {args.q}", lambda: sympy_invert_mod_power_of_two(f, args.q),
+             lambda: invert_mod_power_of_two(f, args.q)),
+        ]
+        for name, previous, current in cases:
+            previous_ms = median_ms(measure(previous, args.repetitions, warmup=0))
+            current_ms = median_ms(measure(current, args.repetitions))
+            print(f"{N:>5} {name:<12} {previous_ms:>12.2f} {current_ms:>20.2f} {previous_ms / current_ms:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Compares the throughput of ring multiplication: schoolbook convolution, sparse ternary products
+and rotation matrix batches in Z_q[x]/(x^N - 1) against the NTT in Z_q[x]/(x^N + 1) of the NTT
+mode, products cost the same in both rings. Correctness is covered by tests/test_ntt.py.
+
+Run from the repository root:
+    python -m benchmarks.ntt_multiplication --N 256 512 1024 --q 12289
+"""
+import argparse
+
+import numpy as np
+
+from NTRUEncrypt.ntt import ntt, inverse_ntt
+from NTRUEncrypt.ternary_polynomial import TernaryPolynomial, random_ternary_matrix, default_weights
+from NTRUEncrypt.truncated_polynomial import TruncatedPolynomial, cyclic_convolution, rotation_matrix, \
+    batch_cyclic_convolution
+from benchmarks.timing import measure, median_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--N', type=int, nargs='+', default=[256, 512, 1024])
+    parser.add_argument('--q', type=int, default=12289)
+    parser.add_argument('--batch', type=int, default=64)
+    parser.add_argument('--repetitions', type=int, default=20)
+    args = parser.parse_args()
+
+    q = args.q
+    print(f"{'N':>5} {'schoolbook, us':>15} {'sparse, us':>11} {'NTT, us':>8} "
+          f"{'rotations/poly, us':>19} {'NTT batch/poly, us':>19}")
+    for N in args.N:
+        a = np.random.randint(0, q, size=N, dtype=np.int64)
+        dr = default_weights(N)[2]
+        r = TernaryPolynomial.random(N, dr, dr)
+        r_dense = r.to_dense().coefficients
+        h = TruncatedPolynomial(a)
+        rows = random_ternary_matrix(args.batch, N, dr, dr)
+        rotations = rotation_matrix(a)
+        a_ntt = ntt(a, q)
+
+        single_us = [median_ms(measure(variant, args.repetitions)) * 1e3 for variant in (
+            lambda: cyclic_convolution(r_dense, a) % q,
+            lambda: (r * h).mod(q),
+            lambda: inverse_ntt(ntt(r_dense, q) * a_ntt % q, q),
+        )]
+        batch_us = [median_ms(measure(variant, args.repetitions)) * 1e3 / args.batch for variant in (
+            lambda: batch_cyclic_convolution(rows, rotations) % q,
+            lambda: inverse_ntt(ntt(rows, q) * a_ntt % q, q),
+        )]
+        print(f"{N:>5} {single_us[0]:>15.1f} {single_us[1]:>11.1f} {single_us[2]:>8.1f} "
+              f"{batch_us[0]:>19.1f} {batch_us[1]:>19.1f}")
+
+
+if __name__ == '__main__':
+    main()
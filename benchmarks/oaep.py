@@ -0,0 +1,71 @@
+"""
+Microbenchmark of the OAEP codec against the previous per-call implementation,
+which rehashed the label and XORed masks byte by byte. Correctness is covered by tests/test_oaep.py.
+
+Run from the repository root:
+    python -m benchmarks.oaep --k 139 1024
+"""
+import argparse
+import hashlib
+import os
+from math import ceil
+
+from OAEP.oaep import OAEP, oaep_encode, oaep_decode
+from benchmarks.timing import measure, median_ms
+
+
+def legacy_mgf1(Z, l, hash_func=hashlib.sha1):
+    h_len = hash_func().digest_size
+    t = b""
+    for counter in range(ceil(l / h_len)):
+        t += hash_func(Z + counter.to_bytes(4, byteorder='big')).digest()
+    return t[:l]
+
+
+def legacy_oaep_encode(M, L=b'', k=128, hash_func=hashlib.sha1):
+    h_len = hash_func().digest_size
+    db = hash_func(L).digest() + b'\x00' * (k - len(M) - 2 * h_len - 2) + b'\x01' + M
+    seed = os.urandom(h_len)
+    masked_db = bytes(a ^ b for a, b in zip(db, legacy_mgf1(seed, k - h_len - 1, hash_func)))
+    masked_seed = bytes(a ^ b for a, b in zip(seed, legacy_mgf1(masked_db, h_len, hash_func)))
+    return b'\x00' + masked_seed + masked_db
+
+
+def legacy_oaep_decode(EM, L=b'', k=128, hash_func=hashlib.sha1):
+    h_len = hash_func().digest_size
+    l_hash = hash_func(L).digest()
+    masked_seed, masked_db = EM[1:h_len + 1], EM[h_len + 1:]
+    seed = bytes(a ^ b for a, b in zip(masked_seed, legacy_mgf1(masked_db, h_len, hash_func)))
+    db = bytes(a ^ b for a, b in zip(masked_db, legacy_mgf1(seed, k - h_len - 1, hash_func)))
+    index_of_0x01 = db[h_len:].find(b'\x01') + h_len
+    if db[:h_len] != l_hash or any(x != 0x00 for x in db[h_len:index_of_0x01]):
+        raise ValueError("Decryption error")
+    return db[index_of_0x01 + 1:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--k', type=int, nargs='+', default=[139, 256, 1024])
+    parser.add_argument('--batch', type=int, default=1000)
+    parser.add_argument('--repetitions', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'k':>6} {'operation':<8} {'previous, us':>13} {'functions, us':>14} {'batch, us':>10}")
+    for k in args.k:
+        codec = OAEP(b'', k)
+        messages = [os.urandom(codec.max_message_length // 2) for _ in range(args.batch)]
+        encoded = codec.encode_many(messages)
+
+        cases = [
+            ('encode', lambda: [legacy_oaep_encode(M, k=k) for M in messages],
+             lambda: [oaep_encode(M, k=k) for M in messages], lambda: codec.encode_many(messages)),
+            ('decode', lambda: [legacy_oaep_decode(EM, k=k) for EM in encoded],
+             lambda: [oaep_decode(EM, k=k) for EM in encoded], lambda: codec.decode_many(encoded)),
+        ]
+        for name, *variants in cases:
+            per_message_us = [median_ms(measure(variant, args.repetitions)) * 1e3 / args.batch for variant in variants]
+            print(f"{k:>6} {name:<8} {per_message_us[0]:>13.2f} {per_message_us[1]:>14.2f} {per_message_us[2]:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark of fixed-width coefficient packing against the previous implementation,
+which built one big integer per polynomial and shifted it once per coefficient.
+Correctness is covered by tests/test_fixed_block_serialisation.py.
+
+Run from the repository root:
+    python -m benchmarks.polynomial_serialisation --N 509 677 821 --q 2048
+"""
+import argparse
+import math
+
+import numpy as np
+
+from PolynomialsSerialisation.fixed_block_serialisation import compress_polynomial, decompress_polynomial, \
+    compress_polynomials, decompress_polynomials
+from benchmarks.timing import measure, median_ms
+
+
+def legacy_compress_polynomial(coefficients, n):
+    b = math.ceil(math.log2(n))
+    bit_stream = 0
+    for coefficient in coefficients:
+        bit_stream = (bit_stream << b) | coefficient
+    return bit_stream.to_bytes((len(coefficients) * b + 7) // 8, byteorder='big')
+
+
+def legacy_decompress_polynomial(compressed_bytes, n, length):
+    b = math.ceil(math.log2(n))
+    bit_stream = int.from_bytes(compressed_bytes, byteorder='big')
+    mask = (1 << b) - 1
+    return [(bit_stream >> (b * i)) & mask for i in range(length)][::-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--N', type=int, nargs='+', default=[509, 677, 821])
+    parser.add_argument('--q', type=int, default=2048)
+    parser.add_argument('--batch', type=int, default=100)
+    parser.add_argument('--repetitions', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'N':>5} {'operation':<12} {'previous, us':>13} {'vectorised, us':>15} {'batch, us':>10}")
+    for N in args.N:
+        matrix = np.random.randint(0, args.q, size=(args.batch, N), dtype=np.int64)
+        rows = [row.tolist() for row in matrix]
+        serialised = [compress_polynomial(row, args.q) for row in matrix]
+        buffer = compress_polynomials(matrix, args.q)
+
+        cases = [
+            ('compress', lambda: [legacy_compress_polynomial(row, args.q) for row in rows],
+             lambda: [compress_polynomial(row, args.q) for row in matrix],
+             lambda: compress_polynomials(matrix, args.q)),
+            ('decompress', lambda: [legacy_decompress_polynomial(data, args.q, N) for data in serialised],
+             lambda: [decompress_polynomial(data, args.q, N) for data in serialised],
+             lambda: decompress_polynomials(buffer, args.q, N)),
+        ]
+        for name, *variants in cases:
+            per_polynomial_us = [median_ms(measure(variant, args.repetitions)) * 1e3 / args.batch for variant in variants]
+            print(f"{N:>5} {name:<12} " + " ".join(f"{us:>{width}.2f}" for us, width in zip(per_polynomial_us, (13, 15, 10))))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Size and decoding latency of NTRU ciphertexts and ternary polynomials in the binary
+wire format, compared with comma-separated base64 text. Correctness is covered by
+tests/test_polynomial_wire_format.py.
+
+Run from the repository root:
+    python -m benchmarks.polynomial_wire_format --N 509 677 821 --q 2048
+"""
+import argparse
+
+import numpy as np
+from sympy import Poly, symbols
+
+from PolynomialsSerialisation.compressed_string_serialisation import poly_to_base64, base64_to_poly, \
+    polynomial_to_bytes, bytes_to_polynomial
+from benchmarks.timing import measure, median_ms
+
+VARIANTS = [
+    ('packed', 'none'),
+    ('packed', 'zlib'),
+    ('packed', 'lzma'),
+    ('centered', 'none'),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--N', type=int, nargs='+', default=[509, 677, 821])
+    parser.add_argument('--q', type=int, default=2048)
+    parser.add_argument('--repetitions', type=int, default=20)
+    args = parser.parse_args()
+
+    x = symbols('x')
+    print(f"{'N':>5} {'polynomial':<11} {'format':<18} {'bytes':>7} {'decode, us':>11}")
+    for N in args.N:
+        ciphertext = np.random.randint(0, args.q, size=N, dtype=np.int64)
+        ternary = np.random.randint(-1, 2, size=N, dtype=np.int64)
+
+        for name, coefficients, modulus, variants in [
+            ('ciphertext', ciphertext, args.q, VARIANTS),
+            ('ternary', ternary, 3, [('ternary', 'none'), ('ternary', 'zlib')]),
+        ]:
+            text = poly_to_base64(Poly(coefficients[::-1].tolist(), x), apply_compression=True)
+            decode_us = median_ms(measure(lambda: base64_to_poly(text, True), args.repetitions)) * 1e3
+            print(f"{N:>5} {name:<11} {'base64 text, zlib':<18} {len(text):>7} {decode_us:>11.1f}")
+
+            for encoding, compression in variants:
+                data = polynomial_to_bytes(coefficients, modulus, encoding, compression)
+                decode_us = median_ms(measure(lambda: bytes_to_polynomial(data), args.repetitions)) * 1e3
+                print(f"{N:>5} {name:<11} {encoding + ', ' + compression:<18} {len(data):>7} {decode_us:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+Throughput of RSACipher batches over thread pools of growing size. RSA private key
+operations release the GIL inside OpenSSL, so decryption should scale with the cores.
+
+Run from the repository root:
+    python -m benchmarks.rsa_scaling --key-size 3072 --workers 1 2 4 8
+"""
+import argparse
+import os
+
+from RSA.rsa import RSACipher
+from benchmarks.timing import measure, median_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--key-size', type=int, default=2048)
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, 4, os.cpu_count() or 1, 2 * (os.cpu_count() or 1)}))
+    parser.add_argument('--batch', type=int, default=256)
+    parser.add_argument('--repetitions', type=int, default=3)
+    args = parser.parse_args()
+
+    messages = [os.urandom(32) for _ in range(args.batch)]
+    with RSACipher.generate(args.key_size) as keys:
+        ciphertexts = keys.encrypt_many(messages)
+
+    print(f"{os.cpu_count()} CPUs, RSA-{args.key_size}, batches of {args.batch}")
+    print(f"{'workers':>8} {'encrypt, ops/s':>15} {'decrypt, ops/s':>15} {'decrypt speedup':>16}")
+    baseline = None
+    for workers in args.workers:
+        with RSACipher(keys.public_key, keys.private_key, max_workers=workers) as cipher:
+            assert cipher.decrypt_many(ciphertexts) == messages
+
+            encrypt_ops = args.batch / median_ms(measure(lambda: cipher.encrypt_many(messages), args.repetitions)) * 1e3
+            decrypt_ops = args.batch / median_ms(measure(lambda: cipher.decrypt_many(ciphertexts), args.repetitions)) * 1e3
+
+        baseline = baseline or decrypt_ops
+        print(f"{workers:>8} {encrypt_ops:>15.0f} {decrypt_ops:>15.0f} {decrypt_ops / baseline:>16.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Public-key schemes measured by the benchmark suite. Every scheme exposes the same operations,
+so the runner can time them uniformly over the standard parameter sets.
+"""
+import numpy as np
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from HybridEncryption.key_encapsulation import choose_secret_length, OAEP_SHA256_OVERHEAD
+from MatricesSerialisation.binary_matrix_serialisation import matrix_to_byte_array, byte_array_to_matrix
+from McEliece.mceliece import McEliece
+from McEliece.packed_binary_matrix import PackedBinaryMatrix
+from NTRUEncrypt.ntruencrypt import NTRUEncrypt
+from NTRUEncrypt.truncated_polynomial import TruncatedPolynomial
+from PolynomialsSerialisation.fixed_block_serialisation import compress_polynomial, decompress_polynomial
+from RSA.rsa import encrypt_bytes, decrypt_bytes
+
+
+class SchemeBenchmark:
+    """
+    Operations of one scheme with one parameter set. Subclasses list their standard
+    parameter sets in 'PARAMETER_SETS', keyed by the label used on the command line.
+    """
+
+    name = None
+    PARAMETER_SETS = {}
+
+    def __init__(self, label):
+        self.label = label
+        self.parameters = self.PARAMETER_SETS[label]
+
+    def generate_keys(self):
+        raise NotImplementedError
+
+    def message_length(self, keys):
+        """
+        Length of the measured messages, a session key as long as one block allows
+        """
+        raise NotImplementedError
+
+    def encrypt(self, keys, message):
+        raise NotImplementedError
+
+    def decrypt(self, keys, ciphertext):
+        raise NotImplementedError
+
+    def serialise_public_key(self, keys):
+        raise NotImplementedError
+
+    def deserialise_public_key(self, keys, data):
+        raise NotImplementedError
+
+    def serialise_ciphertext(self, keys, ciphertext):
+        raise NotImplementedError
+
+
+class RSABenchmark(SchemeBenchmark):
+    name = 'rsa'
+    PARAMETER_SETS = {'2048': 2048, '3072': 3072, '4096': 4096}
+
+    def generate_keys(self):
+        return rsa.generate_private_key(public_exponent=65537, key_size=self.parameters)
+
+    def message_length(self, keys):
+        return choose_secret_length(keys.key_size // 8 - OAEP_SHA256_OVERHEAD)
+
+    def encrypt(self, keys, message):
+        return encrypt_bytes(keys.public_key(), message)
+
+    def decrypt(self, keys, ciphertext):
+        return decrypt_bytes(keys, ciphertext)
+
+    def serialise_public_key(self, keys):
+        return keys.public_key().public_bytes(serialization.Encoding.DER,
+                                              serialization.PublicFormat.SubjectPublicKeyInfo)
+
+    def deserialise_public_key(self, keys, data):
+        return serialization.load_der_public_key(data)
+
+    def serialise_ciphertext(self, keys, ciphertext):
+        return ciphertext
+
+
+class NTRUBenchmark(SchemeBenchmark):
+    name = 'ntru'
+    # (N, p, q)
+    PARAMETER_SETS = {'509': (509, 3, 2048), '677': (677, 3, 2048), '821': (821, 3, 4096)}
+
+    def generate_keys(self):
+        return NTRUEncrypt(*self.parameters)
+
+    def message_length(self, keys):
+        return choose_secret_length(keys.oaep.max_message_length)
+
+    def encrypt(self, keys, message):
+        return keys.encrypt_bytes(message)
+
+    def decrypt(self, keys, ciphertext):
+        return keys.decrypt_bytes(ciphertext)
+
+    def serialise_public_key(self, keys):
+        return compress_polynomial(keys.h.coefficients, keys.q)
+
+    def deserialise_public_key(self, keys, data):
+        return TruncatedPolynomial(decompress_polynomial(data, keys.q, keys.N))
+
+    def serialise_ciphertext(self, keys, ciphertext):
+        return compress_polynomial(ciphertext.coefficients, keys.q)
+
+
+class McElieceBenchmark(SchemeBenchmark):
+    name = 'mceliece'
+    # (n, t, m)
+    PARAMETER_SETS = {'1024': (1024, 50, 10), '2048': (2048, 70, 11), '3488': (3488, 64, 12)}
+
+    def generate_keys(self):
+        return McEliece(*self.parameters)
+
+    def message_length(self, keys):
+        return choose_secret_length(keys.oaep.max_message_length)
+
+    def encrypt(self, keys, message):
+        return keys.encrypt_bytes(message)
+
+    def decrypt(self, keys, ciphertext):
+        return keys.decrypt_bytes(ciphertext)
+
+    def serialise_public_key(self, keys):
+        return matrix_to_byte_array(keys.G_prime.to_dense())
+
+    def deserialise_public_key(self, keys, data):
+        return PackedBinaryMatrix.from_dense(byte_array_to_matrix(data, (keys.k, keys.n)))
+
+    def serialise_ciphertext(self, keys, ciphertext):
+        return matrix_to_byte_array(np.asarray(ciphertext, dtype=np.uint8))
+
+
+SCHEMES = {scheme.name: scheme for scheme in (RSABenchmark, NTRUBenchmark, McElieceBenchmark)}
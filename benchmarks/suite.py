@@ -0,0 +1,98 @@
+"""
+Runner of the benchmark suite, kept apart from the command line entry point
+so that spawned worker processes can import it.
+"""
+import csv
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.schemes import SCHEMES
+from benchmarks.timing import measure, summarise
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+OPERATIONS = ('keygen', 'encrypt', 'decrypt', 'serialise_public_key', 'deserialise_public_key')
+
+
+def peak_rss_kb():
+    """
+    Peak resident set size of the current process in kilobytes, None where it is not available
+    """
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def run_parameter_set(scheme_name, label, repetitions, warmup, keygen_repetitions):
+    """
+    Measures all operations of one scheme with one parameter set
+    :return: dictionary of the results
+    """
+    scheme = SCHEMES[scheme_name](label)
+
+    keygen_timings = measure(scheme.generate_keys, keygen_repetitions, warmup)
+    keys = scheme.generate_keys()
+
+    message = os.urandom(scheme.message_length(keys))
+    ciphertext = scheme.encrypt(keys, message)
+    if scheme.decrypt(keys, ciphertext) != message:
+        raise ValueError(f"{scheme_name} {label}: decrypted message does not match")
+
+    public_key = scheme.serialise_public_key(keys)
+    timings = {
+        'keygen': keygen_timings,
+        'encrypt': measure(lambda: scheme.encrypt(keys, message), repetitions, warmup),
+        'decrypt': measure(lambda: scheme.decrypt(keys, ciphertext), repetitions, warmup),
+        'serialise_public_key': measure(lambda: scheme.serialise_public_key(keys), repetitions, warmup),
+        'deserialise_public_key': measure(lambda: scheme.deserialise_public_key(keys, public_key), repetitions, warmup),
+    }
+
+    return {
+        'scheme': scheme_name,
+        'parameters': label,
+        'message_bytes': len(message),
+        'public_key_bytes': len(public_key),
+        'ciphertext_bytes': len(scheme.serialise_ciphertext(keys, ciphertext)),
+        'peak_rss_kb': peak_rss_kb(),
+        'operations': {operation: summarise(timings[operation]) for operation in OPERATIONS},
+    }
+
+
+def run_isolated(*args):
+    """
+    Runs 'run_parameter_set' in a fresh spawned process
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return executor.submit(run_parameter_set, *args).result()
+
+
+def write_csv(path, results):
+    """
+    Writes one row per scheme, parameter set and operation
+    """
+    fields = ['scheme', 'parameters', 'operation', 'repetitions', 'ops_per_second', 'p50_ms', 'p99_ms',
+              'message_bytes', 'public_key_bytes', 'ciphertext_bytes', 'peak_rss_kb']
+
+    with open(path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=fields)
+        writer.writeheader()
+        for result in results:
+            for operation, summary in result['operations'].items():
+                row = {field: result[field] for field in fields if field in result}
+                writer.writerow({**row, 'operation': operation, **summary})
+
+
+def print_result(result):
+    print(f"{result['scheme']} {result['parameters']}: public key {result['public_key_bytes']} B, "
+          f"ciphertext {result['ciphertext_bytes']} B, peak RSS {result['peak_rss_kb']} KB")
+    for operation, summary in result['operations'].items():
+        print(f"    {operation:<24} {summary['ops_per_second']:>12.1f} ops/s "
+              f"p50 {summary['p50_ms']:>10.3f} ms  p99 {summary['p99_ms']:>10.3f} ms")
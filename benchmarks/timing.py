@@ -0,0 +1,58 @@
+import statistics
+import time
+
+
+def measure(func, repetitions=5, warmup=1):
+    """
+    Measures the wall time of the given function
+    :param func: function without arguments to measure
+    :param repetitions: number of measured calls
+    :param warmup: number of calls made before measuring
+    :return: list of elapsed times in nanoseconds
+    """
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    for _ in range(repetitions):
+        start_time = time.perf_counter_ns()
+        func()
+        timings.append(time.perf_counter_ns() - start_time)
+
+    return timings
+
+
+def median_ms(timings):
+    """
+    Median of the given timings in milliseconds
+    """
+    return statistics.median(timings) / 1e6
+
+
+def percentile(timings, q):
+    """
+    Percentile of the given timings with linear interpolation
+    :param timings: list of elapsed times in nanoseconds
+    :param q: percentile in [0, 100]
+    :return: percentile in nanoseconds
+    """
+    ordered = sorted(timings)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarise(timings):
+    """
+    Throughput and latency percentiles of the given timings
+    :param timings: list of elapsed times in nanoseconds
+    :return: dictionary with operations per second and p50 / p99 latency in milliseconds
+    """
+    return {
+        'repetitions': len(timings),
+        'ops_per_second': len(timings) * 1e9 / sum(timings),
+        'p50_ms': percentile(timings, 50) / 1e6,
+        'p99_ms': percentile(timings, 99) / 1e6,
+    }
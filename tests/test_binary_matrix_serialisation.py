@@ -0,0 +1,83 @@
+"""
+Binary matrix serialisation checked byte for byte against the previous bit string format,
+together with block streaming.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import io
+
+import numpy as np
+import pytest
+
+from MatricesSerialisation.binary_matrix_serialisation import matrix_to_byte_array, byte_array_to_matrix, \
+    matrix_to_memoryview, pack_matrix, unpack_matrix, write_matrix, read_matrix, iter_matrix_blocks
+
+SHAPES = [(1, 1), (3, 5), (8, 8), (17, 13), (100, 129)]
+
+
+def reference_bytes(matrix):
+    # The previous format: the matrix as one bit string, 8 bits per byte, first bit most significant
+    bits = ''.join(str(bit) for bit in matrix.reshape(-1))
+    bits += '0' * (-len(bits) % 8)
+    return bytes(int(bits[i:i + 8], 2) for i in range(0, len(bits), 8))
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(2024)
+
+
+def test_known_bytes():
+    matrix = np.array([[1, 0, 1], [1, 1, 0]], dtype=np.uint8)
+
+    assert matrix_to_byte_array(matrix) == bytearray(b'\xb8')
+    assert matrix_to_byte_array(matrix, pad_rows=True) == bytearray(b'\xa0\xc0')
+    assert matrix_to_byte_array(matrix, bitorder='little') == bytearray(b'\x1d')
+
+
+@pytest.mark.parametrize('shape', SHAPES)
+def test_matches_previous_format(rng, shape):
+    matrix = rng.integers(0, 2, size=shape, dtype=np.uint8)
+    serialised = reference_bytes(matrix)
+
+    assert bytes(matrix_to_byte_array(matrix)) == serialised
+    assert bytes(matrix_to_memoryview(matrix)) == serialised
+    assert np.array_equal(byte_array_to_matrix(serialised, shape), matrix)
+
+
+@pytest.mark.parametrize('pad_rows', [False, True])
+@pytest.mark.parametrize('bitorder', ['big', 'little'])
+@pytest.mark.parametrize('shape', SHAPES)
+def test_round_trips(rng, shape, bitorder, pad_rows):
+    matrix = rng.integers(0, 2, size=shape, dtype=np.uint8)
+    packed = pack_matrix(matrix, bitorder, pad_rows)
+
+    assert len(packed) == (shape[0] * -(-shape[1] // 8) if pad_rows else -(-shape[0] * shape[1] // 8))
+    assert np.array_equal(unpack_matrix(packed.tobytes(), shape, bitorder, pad_rows), matrix)
+
+
+@pytest.mark.parametrize('rows_per_block', [1, 3, 100, 1024])
+@pytest.mark.parametrize('pad_rows', [False, True])
+@pytest.mark.parametrize('bitorder', ['big', 'little'])
+def test_streaming_matches_whole_matrix(rng, bitorder, pad_rows, rows_per_block):
+    # Rows of 13 bits do not end at a byte boundary
+    matrix = rng.integers(0, 2, size=(99, 13), dtype=np.uint8)
+    stream = io.BytesIO()
+
+    written = write_matrix(stream, matrix, bitorder, pad_rows, rows_per_block)
+
+    assert stream.getvalue() == pack_matrix(matrix, bitorder, pad_rows).tobytes()
+    assert written == len(stream.getvalue())
+    stream.seek(0)
+    assert np.array_equal(read_matrix(stream, matrix.shape, bitorder, pad_rows, rows_per_block), matrix)
+
+
+def test_truncated_stream_is_rejected(rng):
+    matrix = rng.integers(0, 2, size=(40, 13), dtype=np.uint8)
+    data = pack_matrix(matrix).tobytes()
+
+    with pytest.raises(ValueError):
+        read_matrix(io.BytesIO(data[:-1]), matrix.shape, rows_per_block=8)
+    with pytest.raises(ValueError):
+        list(iter_matrix_blocks(io.BytesIO(b''), matrix.shape))
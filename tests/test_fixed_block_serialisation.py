@@ -0,0 +1,72 @@
+"""
+Fixed-width coefficient packing checked byte for byte against the previous big integer format.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import math
+
+import numpy as np
+import pytest
+
+from PolynomialsSerialisation.fixed_block_serialisation import compress_polynomial, decompress_polynomial, \
+    compress_polynomials, decompress_polynomials
+
+MODULI = [2, 3, 5, 2048, 3329, 12289, 2 ** 31, 2 ** 32]
+
+
+def reference_compress(coefficients, n):
+    # The previous format: one big integer of b bits per coefficient, the first coefficient most significant
+    b = math.ceil(math.log2(n))
+    bit_stream = 0
+    for coefficient in coefficients:
+        bit_stream = (bit_stream << b) | coefficient
+    return bit_stream.to_bytes((len(coefficients) * b + 7) // 8, byteorder='big')
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(2024)
+
+
+def test_known_bytes():
+    # 3 bits per coefficient after 3 filling zero bits: 000 001 010 011 100 101 110 111 -> 0x05 0x39 0x77
+    assert compress_polynomial([1, 2, 3, 4, 5, 6, 7], 8) == b'\x05\x39\x77'
+    assert decompress_polynomial(b'\x05\x39\x77', 8, 7) == [1, 2, 3, 4, 5, 6, 7]
+
+
+@pytest.mark.parametrize('length', [1, 11, 509])
+@pytest.mark.parametrize('n', MODULI)
+def test_matches_previous_format(rng, n, length):
+    coefficients = rng.integers(0, n, size=length, dtype=np.int64)
+    serialised = reference_compress(coefficients.tolist(), n)
+
+    assert compress_polynomial(coefficients, n) == serialised
+    assert compress_polynomial(coefficients.tolist(), n) == serialised
+    assert decompress_polynomial(serialised, n, length) == coefficients.tolist()
+
+
+@pytest.mark.parametrize('n', MODULI)
+def test_batch_is_the_concatenation_of_polynomials(rng, n):
+    matrix = rng.integers(0, n, size=(7, 11), dtype=np.int64)
+    buffer = compress_polynomials(matrix, n)
+
+    assert buffer == b''.join(compress_polynomial(row, n) for row in matrix)
+    assert np.array_equal(decompress_polynomials(buffer, n, 11), matrix)
+
+
+def test_short_input_has_leading_zero_coefficients():
+    # Missing leading bytes are zero bits in front of the first coefficients, as for a big integer
+    assert decompress_polynomial(b'\x07', 8, 4) == [0, 0, 0, 7]
+
+
+@pytest.mark.parametrize('buffer', [b'\x00' * 10, b'\x00' * 14])
+def test_batch_rejects_partial_polynomials(buffer):
+    # 11 coefficients of 11 bits take 16 bytes
+    with pytest.raises(ValueError):
+        decompress_polynomials(buffer, 2048, 11)
+
+
+def test_batch_rejects_empty_polynomials():
+    with pytest.raises(ValueError):
+        decompress_polynomials(b'', 2048, 0)
@@ -0,0 +1,176 @@
+"""
+Key and ciphertext containers of NTRUEncrypt and McEliece: round trips through bytes and pickle,
+byte-for-byte compatibility with the polynomial wire format and the McEliece key file, zero-copy
+views and rejection of malformed buffers.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import pickle
+import struct
+
+import numpy as np
+import pytest
+
+from McEliece.key_store import save_public_key
+from McEliece.keys import McEliecePublicKey, McEliecePrivateKey, McElieceCiphertext
+from McEliece.mceliece import McEliece
+from NTRUEncrypt.keys import NTRUPublicKey, NTRUPrivateKey, NTRUCiphertext
+from NTRUEncrypt.ntruencrypt import NTRUEncrypt
+from PolynomialsSerialisation.compressed_string_serialisation import polynomial_to_bytes
+
+MESSAGE = b'container'
+
+
+def through_bytes(container):
+    return type(container).from_buffer(container.to_bytes())
+
+
+def through_pickle(container):
+    return pickle.loads(pickle.dumps(container, protocol=5))
+
+
+@pytest.fixture(scope='module')
+def ntru():
+    return NTRUEncrypt(439, 3, 2048)
+
+
+@pytest.fixture(scope='module')
+def mceliece():
+    return McEliece(1024, 50, 10)
+
+
+@pytest.mark.parametrize('restore', [through_bytes, through_pickle])
+def test_ntru_public_key_round_trips(ntru, restore):
+    public_key = restore(ntru.export_public_key())
+
+    assert (public_key.N, public_key.p, public_key.q) == (439, 3, 2048)
+    assert public_key.h.dtype == np.uint16 and not public_key.h.flags.writeable
+    assert np.array_equal(public_key.h, ntru.h.coefficients % 2048)
+
+
+@pytest.mark.parametrize('restore', [through_bytes, through_pickle])
+def test_ntru_private_key_round_trips(ntru, restore):
+    private_key = restore(ntru.export_private_key())
+    restored = NTRUEncrypt(439, 3, 2048, key_material=private_key)
+
+    assert private_key.nbytes < 3 * ntru.h.coefficients.nbytes
+    assert np.array_equal(private_key.public_key().h, ntru.export_public_key().h)
+    assert restored.decrypt_bytes(ntru.encrypt_bytes(MESSAGE)) == MESSAGE
+    assert ntru.decrypt_bytes(restored.encrypt_bytes(MESSAGE)) == MESSAGE
+
+
+def test_ntru_ciphertext_is_a_wire_format_polynomial(ntru):
+    ciphertext = ntru.encrypt_bytes(MESSAGE)
+    container = NTRUCiphertext.from_polynomial(ciphertext, ntru.q)
+
+    assert container.to_bytes() == polynomial_to_bytes(ciphertext.coefficients, ntru.q)
+    assert ntru.decrypt_bytes(through_bytes(container)) == MESSAGE
+    assert ntru.decrypt_bytes(through_pickle(container)) == MESSAGE
+
+
+def test_ntru_public_key_rejects_wrong_length():
+    with pytest.raises(ValueError):
+        NTRUPublicKey.create(439, 3, 2048, np.zeros(438))
+
+
+def ntru_key(magic, q, sections, version=1):
+    data = struct.pack('>4sBBBxIII', magic, version, 0, 0, 11, 3, q)
+    for section in sections:
+        data += struct.pack('>I', len(section)) + section
+    return data
+
+
+@pytest.mark.parametrize('data', [
+    b'NPUB',
+    ntru_key(b'NSEC', 2048, [polynomial_to_bytes(np.arange(11), 2048)]),
+    ntru_key(b'NPUB', 2048, [polynomial_to_bytes(np.arange(11), 2048)], version=2),
+    ntru_key(b'NPUB', 2048, []),
+    ntru_key(b'NPUB', 2048, [polynomial_to_bytes(np.arange(11), 2048)])[:-1],
+    ntru_key(b'NPUB', 2048, [polynomial_to_bytes(np.arange(12), 2048)]),
+    ntru_key(b'NPUB', 2048, [polynomial_to_bytes(np.arange(11), 1024)]),
+])
+def test_ntru_public_key_rejects_malformed_buffers(data):
+    with pytest.raises(ValueError):
+        NTRUPublicKey.from_buffer(data)
+
+
+def test_ntru_private_key_rejects_public_key(ntru):
+    with pytest.raises(ValueError):
+        NTRUPrivateKey.from_buffer(ntru.export_public_key().to_bytes())
+
+
+@pytest.mark.parametrize('restore', [through_bytes, through_pickle])
+def test_mceliece_public_key_round_trips(mceliece, restore):
+    public_key = restore(mceliece.export_public_key())
+    sender = McEliece.from_public_key(public_key)
+
+    assert (public_key.n, public_key.k, public_key.t, public_key.m) == (1024, 524, 50, 10)
+    assert np.array_equal(public_key.words, mceliece.G_prime.words)
+    assert mceliece.decrypt_bytes(sender.encrypt_bytes(MESSAGE)) == MESSAGE
+
+
+def test_mceliece_public_key_is_a_key_file(mceliece, tmp_path):
+    path = tmp_path / 'public.key'
+    save_public_key(path, mceliece)
+    data = path.read_bytes()
+
+    assert mceliece.export_public_key().to_bytes() == data
+    assert np.shares_memory(McEliecePublicKey.from_buffer(data).words, np.frombuffer(data, dtype=np.uint8))
+    assert np.array_equal(McEliece.from_key_file(path).G_prime.words, mceliece.G_prime.words)
+
+
+@pytest.mark.parametrize('restore', [through_bytes, through_pickle])
+def test_mceliece_private_key_round_trips(mceliece, restore):
+    private_key = restore(mceliece.export_private_key())
+    restored = McEliece(1024, 50, 10, key_material=private_key)
+
+    assert private_key.nbytes == sum(len(array.tobytes()) for array in (
+        private_key.g_poly, private_key.L, private_key.H, private_key.information_set, private_key.P,
+        private_key.S, private_key.S_inv, private_key.G_prime))
+    assert restored.decrypt_bytes(mceliece.encrypt_bytes(MESSAGE)) == MESSAGE
+
+
+def test_mceliece_private_key_views_the_buffer(mceliece):
+    data = mceliece.export_private_key().to_bytes()
+    private_key = McEliecePrivateKey.from_buffer(data)
+
+    assert len(data) % 8 == 0
+    assert all(np.shares_memory(getattr(private_key, name), np.frombuffer(data, dtype=np.uint8))
+               for name in ('g_poly', 'L', 'H', 'information_set', 'P', 'S', 'S_inv', 'G_prime'))
+
+
+@pytest.mark.parametrize('restore', [through_bytes, through_pickle])
+def test_mceliece_ciphertext_round_trips(mceliece, restore):
+    bits = mceliece.encrypt_bytes(MESSAGE)
+    ciphertext = restore(McElieceCiphertext.from_bits(bits))
+
+    assert ciphertext.nbytes == 1024 // 8
+    assert np.array_equal(ciphertext.bits, bits)
+    assert mceliece.decrypt_bytes(ciphertext) == MESSAGE
+
+
+def test_mceliece_buffers_are_validated(mceliece):
+    public_key = mceliece.export_public_key().to_bytes()
+    private_key = mceliece.export_private_key().to_bytes()
+    ciphertext = McElieceCiphertext.from_bits(mceliece.encrypt_bytes(MESSAGE)).to_bytes()
+
+    for parse, data in [
+        (McEliecePublicKey.from_buffer, public_key[:63]),
+        (McEliecePublicKey.from_buffer, public_key[:-1]),
+        (McEliecePublicKey.from_buffer, b'X' + public_key[1:]),
+        (McEliecePrivateKey.from_buffer, public_key),
+        (McEliecePrivateKey.from_buffer, private_key[:63]),
+        (McEliecePrivateKey.from_buffer, private_key[:-8]),
+        (McElieceCiphertext.from_buffer, ciphertext[:-1]),
+        (McElieceCiphertext.from_buffer, private_key),
+    ]:
+        with pytest.raises(ValueError):
+            parse(data)
+
+
+def test_mceliece_field_elements_must_fit_into_16_bits(mceliece):
+    key_material = dict(mceliece.export_key_material(), m=17)
+
+    with pytest.raises(ValueError):
+        McEliecePrivateKey.from_key_material(key_material)
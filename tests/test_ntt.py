@@ -0,0 +1,146 @@
+"""
+Number-theoretic transform and the NTT mode of NTRUEncrypt checked against schoolbook
+multiplication in Z_q[x]/(x^N + 1).
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import numpy as np
+import pytest
+
+from NTRUEncrypt.encryptor import NTRUEncryptor
+from NTRUEncrypt.keys import NTRUPublicKey, NTRUPrivateKey
+from NTRUEncrypt.ntt import check_ntt_parameters, ntt, inverse_ntt, ntt_convolution, pointwise_inverse
+from NTRUEncrypt.ntruencrypt import NTRUEncrypt
+from NTRUEncrypt.ntt_ntruencrypt import NTTNTRUEncrypt
+from NTRUEncrypt.ring_inversion import NotInvertibleError
+from NTRUEncrypt.truncated_polynomial import negacyclic_convolution
+
+# The transform keeps sums unreduced between stages for q below 2^26 and reduces them otherwise
+MODULI = [12289, 2013265921]
+
+
+def schoolbook(a, b, q):
+    # Products of Python integers cannot overflow for any q
+    return (negacyclic_convolution(a.astype(object), b.astype(object)) % q).astype(np.int64)
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(2024)
+
+
+@pytest.mark.parametrize('q', MODULI)
+@pytest.mark.parametrize('N', [2, 256, 512])
+def test_inverse_transform_restores_coefficients(rng, N, q):
+    a = rng.integers(0, q, size=N)
+
+    assert np.array_equal(inverse_ntt(ntt(a, q), q), a)
+
+
+@pytest.mark.parametrize('q', MODULI)
+@pytest.mark.parametrize('N', [256, 512])
+def test_convolution_matches_schoolbook(rng, N, q):
+    a = rng.integers(0, q, size=N)
+    b = rng.integers(0, q, size=N)
+
+    assert np.array_equal(ntt_convolution(a, b, q), schoolbook(a, b, q))
+
+
+@pytest.mark.parametrize('q', MODULI)
+def test_batch_convolution_matches_schoolbook(rng, q):
+    rows = rng.integers(0, q, size=(8, 256))
+    b = rng.integers(0, q, size=256)
+
+    assert np.array_equal(ntt_convolution(rows, b, q), np.array([schoolbook(row, b, q) for row in rows]))
+
+
+@pytest.mark.parametrize('q', MODULI)
+def test_pointwise_inverse_gives_ring_inverse(rng, q):
+    # Nonzero evaluations make an invertible element
+    a = inverse_ntt(rng.integers(1, q, size=256), q)
+    inverse = inverse_ntt(pointwise_inverse(ntt(a, q), q), q)
+
+    assert np.array_equal(schoolbook(a, inverse, q), np.eye(1, 256, dtype=np.int64)[0])
+
+
+def test_pointwise_inverse_rejects_vanishing_polynomial(rng):
+    # A polynomial with a zero evaluation vanishes at a root of x^N + 1
+    values = rng.integers(1, 12289, size=256)
+    values[17] = 0
+
+    with pytest.raises(NotInvertibleError):
+        pointwise_inverse(ntt(inverse_ntt(values, 12289), 12289), 12289)
+
+
+def test_transform_is_negacyclic():
+    # x^(N - 1) * x = x^N = -1
+    x = np.eye(1, 256, 1, dtype=np.int64)[0]
+    top = np.eye(1, 256, 255, dtype=np.int64)[0]
+
+    assert np.array_equal(ntt_convolution(x, top, 12289), np.eye(1, 256, dtype=np.int64)[0] * 12288)
+
+
+# 4096 divides 12289 - 1 = 3 * 2^12, but twice 4096 does not
+@pytest.mark.parametrize('N, q', [(384, 12289), (256, 12288), (256, 65537 * 3), (4096, 12289), (8192, 12289)])
+def test_unsupported_parameters_are_rejected(N, q):
+    with pytest.raises(ValueError):
+        check_ntt_parameters(N, q)
+
+
+@pytest.fixture(scope='module')
+def ntru():
+    return NTTNTRUEncrypt(512, 3, 12289)
+
+
+def test_private_key_is_inverted(ntru):
+    one = np.eye(1, ntru.N, dtype=np.int64)[0]
+
+    assert np.array_equal(schoolbook(ntru.f.to_dense().coefficients, ntru.fq.coefficients, ntru.q), one)
+
+
+def test_public_key_matches_schoolbook(ntru):
+    h = schoolbook(ntru.p * ntru.g.to_dense().coefficients, ntru.fq.coefficients, ntru.q)
+
+    assert np.array_equal(ntru.h.coefficients, h)
+
+
+def test_round_trips(ntru):
+    plaintexts = ['NTT mode', '', 'x' * 50]
+
+    assert [ntru.decrypt(ntru.encrypt(plaintext)) for plaintext in plaintexts] == plaintexts
+    assert ntru.decrypt_batch(ntru.encrypt_batch(plaintexts)) == plaintexts
+
+
+@pytest.mark.parametrize('export', [
+    lambda ntru: ntru.export_key_material(),
+    lambda ntru: NTRUPrivateKey.from_buffer(ntru.export_private_key().to_bytes()),
+])
+def test_restored_keys_decrypt(ntru, export):
+    restored = NTTNTRUEncrypt(512, 3, 12289, key_material=export(ntru))
+    messages = [b'restored', b'\x00\xff']
+
+    assert np.array_equal(restored.h.coefficients, ntru.h.coefficients)
+    assert restored.decrypt_many(ntru.encrypt_many(messages)) == messages
+    assert ntru.decrypt_many(restored.encrypt_many(messages)) == messages
+
+
+def test_keys_carry_the_ring(ntru):
+    public_key = NTRUPublicKey.from_buffer(ntru.export_public_key().to_bytes())
+    private_key = NTRUPrivateKey.from_buffer(ntru.export_private_key().to_bytes())
+
+    assert public_key.negacyclic and private_key.negacyclic and private_key.public_key().negacyclic
+
+
+def test_cyclic_schemes_reject_negacyclic_keys(ntru):
+    with pytest.raises(ValueError):
+        NTRUEncrypt(512, 3, 12289, key_material=ntru.export_private_key())
+    with pytest.raises(ValueError):
+        NTRUEncryptor.from_ntru(ntru)
+    with pytest.raises(ValueError):
+        NTRUEncryptor.from_public_key(ntru.export_public_key())
+
+
+def test_ntt_mode_rejects_cyclic_keys(ntru):
+    with pytest.raises(ValueError):
+        NTTNTRUEncrypt(512, 3, 12289, key_material=dict(ntru.export_key_material(), negacyclic=False))
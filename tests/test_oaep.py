@@ -0,0 +1,119 @@
+"""
+OAEP encoding and decoding checked byte for byte against a straightforward implementation
+of RFC 2437, including malformed encoded messages.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import hashlib
+import os
+from math import ceil
+
+import pytest
+
+from OAEP.oaep import OAEP, mgf1, oaep_encode, oaep_decode
+
+
+def reference_mgf1(Z, l, hash_func):
+    h_len = hash_func().digest_size
+    t = b''
+    for counter in range(ceil(l / h_len)):
+        t += hash_func(Z + counter.to_bytes(4, byteorder='big')).digest()
+    return t[:l]
+
+
+def reference_encode(M, seed, L, k, hash_func):
+    h_len = hash_func().digest_size
+    db = hash_func(L).digest() + b'\x00' * (k - len(M) - 2 * h_len - 2) + b'\x01' + M
+    masked_db = bytes(a ^ b for a, b in zip(db, reference_mgf1(seed, k - h_len - 1, hash_func)))
+    masked_seed = bytes(a ^ b for a, b in zip(seed, reference_mgf1(masked_db, h_len, hash_func)))
+    return b'\x00' + masked_seed + masked_db
+
+
+PARAMETERS = [(b'', 82, hashlib.sha1), (b'label', 128, hashlib.sha1), (b'', 256, hashlib.sha256)]
+
+
+@pytest.fixture
+def oaep():
+    return OAEP(L=b'', k=128, hash_func=hashlib.sha1)
+
+
+@pytest.mark.parametrize('l', [0, 1, 20, 21, 107, 256 * 20, 256 * 20 + 1])
+@pytest.mark.parametrize('hash_func', [hashlib.sha1, hashlib.sha256])
+def test_mgf1_matches_reference(l, hash_func):
+    assert mgf1(b'seed', l, hash_func) == reference_mgf1(b'seed', l, hash_func)
+
+
+def test_mgf1_rejects_long_masks():
+    with pytest.raises(ValueError):
+        mgf1(b'seed', 2 ** 32 * 20 + 1)
+
+
+@pytest.mark.parametrize('L, k, hash_func', PARAMETERS)
+def test_encode_matches_reference(L, k, hash_func):
+    codec = OAEP(L, k, hash_func)
+    seed = os.urandom(codec.h_len)
+
+    for M in (b'', b'message', b'\xff' * codec.max_message_length):
+        assert codec.encode(M, seed) == reference_encode(M, seed, L, k, hash_func)
+
+
+@pytest.mark.parametrize('L, k, hash_func', PARAMETERS)
+def test_round_trips(L, k, hash_func):
+    codec = OAEP(L, k, hash_func)
+    messages = [b'', b'\x00', os.urandom(codec.max_message_length)]
+
+    assert [codec.decode(codec.encode(M)) for M in messages] == messages
+    assert codec.decode_many(codec.encode_many(messages)) == messages
+    assert [oaep_decode(oaep_encode(M, L, k, hash_func), L, k, hash_func) for M in messages] == messages
+
+
+def test_codecs_are_shared():
+    assert OAEP.for_parameters(b'', 128) is OAEP.for_parameters(b'', 128)
+
+
+def test_encode_rejects_long_message(oaep):
+    with pytest.raises(ValueError, match='Encoding error'):
+        oaep.encode(bytes(oaep.max_message_length + 1))
+
+
+def test_decode_rejects_other_label(oaep):
+    EM = OAEP(L=b'other', k=128).encode(b'message')
+
+    with pytest.raises(ValueError, match='Decryption error'):
+        oaep.decode(EM)
+
+
+def test_decode_rejects_missing_separator(oaep):
+    # A data block of the label hash followed by zeros only
+    seed = bytes(oaep.h_len)
+    masked_db = bytes(a ^ b for a, b in zip(oaep.l_hash + bytes(oaep.db_length - oaep.h_len),
+                                           reference_mgf1(seed, oaep.db_length, hashlib.sha1)))
+    masked_seed = bytes(a ^ b for a, b in zip(seed, reference_mgf1(masked_db, oaep.h_len, hashlib.sha1)))
+
+    with pytest.raises(ValueError, match='separator'):
+        oaep.decode(b'\x00' + masked_seed + masked_db)
+
+
+def test_decode_rejects_corrupted_padding(oaep):
+    seed = bytes(oaep.h_len)
+    db = oaep.l_hash + b'\x00\x02' + bytes(oaep.db_length - oaep.h_len - 4) + b'\x01M'
+    masked_db = bytes(a ^ b for a, b in zip(db, reference_mgf1(seed, oaep.db_length, hashlib.sha1)))
+    masked_seed = bytes(a ^ b for a, b in zip(seed, reference_mgf1(masked_db, oaep.h_len, hashlib.sha1)))
+
+    with pytest.raises(ValueError, match='padding'):
+        oaep.decode(b'\x00' + masked_seed + masked_db)
+
+
+@pytest.mark.parametrize('EM', [b'', bytes(123), bytes(129)])
+def test_decode_rejects_wrong_length(oaep, EM):
+    with pytest.raises(ValueError, match='Decryption error'):
+        oaep.decode(EM)
+
+
+def test_decode_rejects_nonzero_first_octet(oaep):
+    EM = bytearray(oaep.encode(b'message'))
+    EM[0] = 1
+
+    with pytest.raises(ValueError, match='Decryption error'):
+        oaep.decode(bytes(EM))
@@ -0,0 +1,74 @@
+"""
+Packed GF(2) matrix operations checked against dense uint8 arithmetic.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import numpy as np
+import pytest
+
+from McEliece.gf2_matrix_utils import unpack_rows, multiply_packed, invert_unit_lower_triangular
+from McEliece.packed_binary_matrix import PackedBinaryMatrix
+from McEliece.utils import generate_s_matrix, random_unit_lower_triangular
+
+# Shapes with columns below, at and across the 64-bit word boundary
+SHAPES = [(1, 1, 1), (5, 13, 70), (64, 64, 64), (100, 129, 200)]
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(2024)
+
+
+@pytest.mark.parametrize('rows, inner, columns', SHAPES)
+def test_product_matches_dense(rng, rows, inner, columns):
+    a = rng.integers(0, 2, size=(rows, inner), dtype=np.uint8)
+    b = rng.integers(0, 2, size=(inner, columns), dtype=np.uint8)
+
+    product = PackedBinaryMatrix.from_dense(a) @ PackedBinaryMatrix.from_dense(b)
+
+    assert product.shape == (rows, columns)
+    assert np.array_equal(product.to_dense(), a.astype(np.int64) @ b % 2)
+
+
+def test_product_rejects_mismatched_shapes():
+    a = PackedBinaryMatrix.from_dense(np.ones((3, 4), dtype=np.uint8))
+
+    with pytest.raises(ValueError):
+        a @ a
+
+
+@pytest.mark.parametrize('rows, _, columns', SHAPES)
+def test_permute_columns_matches_dense(rng, rows, _, columns):
+    matrix = rng.integers(0, 2, size=(rows, columns), dtype=np.uint8)
+    permutation = rng.permutation(columns)
+
+    permuted = PackedBinaryMatrix.from_dense(matrix).permute_columns(permutation)
+
+    assert np.array_equal(permuted.to_dense(), matrix[:, permutation])
+    # Padding bits past the last column stay zero
+    assert np.array_equal(permuted.words, PackedBinaryMatrix.from_dense(matrix[:, permutation]).words)
+
+
+@pytest.mark.parametrize('k', [1, 7, 64, 100, 524])
+def test_unit_lower_triangular_inverse(k):
+    lower = random_unit_lower_triangular(k)
+    dense = unpack_rows(lower, k)
+
+    assert np.array_equal(np.tril(dense), dense) and dense.diagonal().all()
+    assert np.array_equal(unpack_rows(multiply_packed(lower, invert_unit_lower_triangular(lower, k)), k),
+                          np.identity(k, dtype=np.uint8))
+
+
+@pytest.mark.parametrize('method', ['rejection', 'lu'])
+@pytest.mark.parametrize('k', [8, 100, 524])
+def test_s_matrix_inverse(k, method):
+    S, S_inv = generate_s_matrix(k, method)
+
+    assert np.array_equal((S @ S_inv).to_dense(), np.identity(k, dtype=np.uint8))
+    assert np.array_equal((S_inv @ S).to_dense(), np.identity(k, dtype=np.uint8))
+
+
+def test_unknown_s_matrix_method_is_rejected():
+    with pytest.raises(ValueError):
+        generate_s_matrix(8, 'qr')
@@ -0,0 +1,116 @@
+"""
+Binary polynomial wire format: header layout, round trips of every encoding and compressor,
+and rejection of malformed input. The comma-separated base64 text stays readable.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import struct
+
+import numpy as np
+import pytest
+from sympy import Poly, symbols
+
+from PolynomialsSerialisation.compressed_string_serialisation import polynomial_to_bytes, bytes_to_polynomial, \
+    read_polynomial_header, register_compressor, poly_to_base64, base64_to_poly, ENCODING_PACKED, \
+    ENCODING_TERNARY, ENCODING_CENTERED
+from PolynomialsSerialisation.fixed_block_serialisation import compress_polynomial
+
+COMPRESSIONS = ['none', 'zlib', 'lzma']
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(2024)
+
+
+def test_known_bytes():
+    data = polynomial_to_bytes([1, 2, 3, 4, 5, 6, 7], 8)
+
+    assert data == b'NPOL\x01\x00\x00\x00' + struct.pack('>II', 7, 8) + b'\x05\x39\x77'
+    assert polynomial_to_bytes([1, -1, 0, 1, 1, -1], 3, 'ternary')[16:] == bytes([1 + 2 * 3 + 9 * 0 + 27 + 81, 2])
+
+
+@pytest.mark.parametrize('compression', COMPRESSIONS)
+@pytest.mark.parametrize('N', [1, 509, 821])
+def test_packed_round_trips(rng, N, compression):
+    coefficients = rng.integers(0, 2048, size=N)
+    data = polynomial_to_bytes(coefficients, 2048, 'packed', compression)
+
+    assert read_polynomial_header(data)[:3] == (N, 2048, ENCODING_PACKED)
+    assert np.array_equal(bytes_to_polynomial(data), coefficients)
+    assert np.array_equal(bytes_to_polynomial(bytearray(data)), coefficients)
+
+
+def test_packed_payload_is_the_fixed_block_format(rng):
+    coefficients = rng.integers(0, 2048, size=509)
+
+    assert polynomial_to_bytes(coefficients, 2048)[16:] == compress_polynomial(coefficients, 2048)
+
+
+@pytest.mark.parametrize('compression', COMPRESSIONS)
+@pytest.mark.parametrize('N', [1, 5, 6, 509])
+def test_ternary_round_trips(rng, N, compression):
+    coefficients = rng.integers(-1, 2, size=N)
+    data = polynomial_to_bytes(coefficients, 3, 'ternary', compression)
+
+    assert read_polynomial_header(data)[2] == ENCODING_TERNARY
+    assert np.array_equal(bytes_to_polynomial(data), coefficients)
+    if compression == 'none':
+        assert len(data) == 16 + -(-N // 5)
+
+
+def test_centered_round_trips(rng):
+    coefficients = rng.integers(-1023, 1025, size=509)
+    data = polynomial_to_bytes(coefficients, 2048, 'centered')
+
+    assert read_polynomial_header(data)[2] == ENCODING_CENTERED
+    assert np.array_equal(bytes_to_polynomial(data), coefficients)
+
+
+def test_base64_text_round_trips(rng):
+    x = symbols('x')
+    coefficients = rng.integers(1, 2048, size=50).tolist()
+
+    for compression in (False, True):
+        text = poly_to_base64(Poly(coefficients, x), compression)
+        assert base64_to_poly(text, compression).all_coeffs() == coefficients
+
+
+@pytest.mark.parametrize('arguments', [
+    ([1, 2], 2048, 'base64', 'none'),
+    ([1, 2], 1, 'packed', 'none'),
+    ([1, 2], 2 ** 32, 'packed', 'none'),
+    ([1, 2], 2048, 'packed', 'brotli'),
+])
+def test_serialisation_rejects_invalid_arguments(arguments):
+    with pytest.raises(ValueError):
+        polynomial_to_bytes(*arguments)
+
+
+def corrupt(offset, value):
+    data = bytearray(polynomial_to_bytes(np.arange(10), 2048))
+    data[offset] = value
+    return bytes(data)
+
+
+@pytest.mark.parametrize('data', [
+    b'',
+    polynomial_to_bytes(np.arange(10), 2048)[:15],
+    corrupt(0, ord('X')),
+    corrupt(4, 2),
+    corrupt(5, 7),
+    corrupt(6, 99),
+    polynomial_to_bytes(np.arange(10), 2048)[:-1],
+    polynomial_to_bytes(np.arange(10), 2048) + b'\x00' * 14,
+    polynomial_to_bytes([1, 0, -1], 3, 'ternary') + b'\x00',
+])
+def test_deserialisation_rejects_malformed_data(data):
+    with pytest.raises(ValueError):
+        bytes_to_polynomial(data)
+
+
+@pytest.mark.parametrize('identifier', [0, 1, 256])
+def test_compressor_identifiers_are_not_reused(identifier):
+    with pytest.raises(ValueError):
+        register_compressor(identifier, 'other', lambda data, level: data, lambda data: data)
@@ -0,0 +1,96 @@
+"""
+Inversion of NTRUEncrypt private keys checked against ring products and the SymPy inverse
+of the previous key generation path.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import numpy as np
+import pytest
+from sympy import symbols, Poly, invert
+from sympy.polys.domains import ZZ, GF
+
+from NTRUEncrypt.ntruencrypt import NTRUEncrypt
+from NTRUEncrypt.ring_inversion import NotInvertibleError, invert_mod_2, invert_mod_prime, invert_mod_power_of_two
+from NTRUEncrypt.ternary_polynomial import TernaryPolynomial
+from NTRUEncrypt.truncated_polynomial import TruncatedPolynomial, cyclic_convolution
+
+
+def is_inverse(f, inverse, modulus):
+    product = cyclic_convolution(f.coefficients, inverse.coefficients) % modulus
+    return np.array_equal(product, np.eye(1, f.N, dtype=np.int64)[0])
+
+
+def sympy_inverse(f, p):
+    x = symbols('x')
+    inverse = invert(f.to_poly(x), Poly(x ** f.N - 1, x, domain=ZZ), domain=GF(p))
+    return TruncatedPolynomial.from_poly(inverse, f.N, x).mod(p)
+
+
+def random_invertible(N, d):
+    while True:
+        f = TernaryPolynomial.random(N, d + 1, d).to_dense()
+        try:
+            invert_mod_prime(f, 3)
+            invert_mod_2(f)
+            return f
+        except NotInvertibleError:
+            pass
+
+
+@pytest.fixture(autouse=True)
+def seed():
+    np.random.seed(2024)
+
+
+@pytest.mark.parametrize('N', [11, 107, 439])
+def test_inverse_mod_prime(N):
+    f = random_invertible(N, N // 3)
+
+    for p in (2, 3, 5):
+        try:
+            inverse = invert_mod_prime(f, p)
+        except NotInvertibleError:
+            continue
+        assert is_inverse(f, inverse, p)
+
+
+@pytest.mark.parametrize('q', [2, 32, 2048, 4096])
+@pytest.mark.parametrize('N', [11, 107, 439])
+def test_inverse_mod_power_of_two(N, q):
+    f = random_invertible(N, N // 3)
+
+    assert is_inverse(f, invert_mod_power_of_two(f, q), q)
+
+
+@pytest.mark.parametrize('p', [2, 3])
+def test_inverse_matches_sympy(p):
+    f = random_invertible(107, 35)
+
+    assert invert_mod_prime(f, p) == sympy_inverse(f, p)
+
+
+def test_non_invertible_polynomial_is_rejected():
+    # 1 - x vanishes at x = 1, a root of x^N - 1
+    f = TruncatedPolynomial([1, -1], 11)
+
+    with pytest.raises(NotInvertibleError):
+        invert_mod_2(f)
+    with pytest.raises(NotInvertibleError):
+        invert_mod_prime(f, 3)
+    with pytest.raises(NotInvertibleError):
+        invert_mod_power_of_two(f, 2048)
+
+
+def test_modulus_must_be_a_power_of_two():
+    with pytest.raises(ValueError):
+        invert_mod_power_of_two(random_invertible(11, 3), 1000)
+
+
+@pytest.mark.parametrize('product_form', [True, False])
+def test_generated_keys_are_inverted(product_form):
+    ntru = NTRUEncrypt(439, 3, 2048, product_form=product_form)
+    f = ntru.f.to_dense()
+
+    assert is_inverse(f, ntru.fp, ntru.p)
+    assert is_inverse(f, ntru.fq, ntru.q)
@@ -0,0 +1,77 @@
+"""
+Conversion of byte messages to ternary digits, 3 bits to 2 digits, and back.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import numpy as np
+import pytest
+
+from NTRUEncrypt.plaintext_to_ternary_conversion_utils import bytes_to_ternary, ternary_to_bytes, \
+    ternary_capacity_in_bytes, encode_messages, decode_messages
+from OAEP.oaep import OAEP
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(2024)
+
+
+def test_known_digits():
+    # 0xff 0x00 = 111 111 110 000 000 0(00) -> 7 7 6 0 0 0
+    digits = bytes_to_ternary(b'\xff\x00', 16)
+
+    assert digits.tolist() == [2, 1, 2, 1, 2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
+
+
+@pytest.mark.parametrize('N', [2, 107, 439, 821])
+def test_round_trips(rng, N):
+    length = ternary_capacity_in_bytes(N)
+    data = rng.integers(0, 256, size=length, dtype=np.uint8).tobytes()
+
+    digits = bytes_to_ternary(data, N)
+
+    assert digits.shape == (N,) and set(np.unique(digits)) <= {0, 1, 2}
+    assert ternary_to_bytes(digits, length).tobytes() == data
+
+
+def test_every_value_of_three_bits_has_its_own_digits():
+    # 0x05 0x39 0x77 = 000 001 010 011 100 101 110 111
+    digits = bytes_to_ternary(b'\x05\x39\x77', 16)
+
+    assert digits.tolist() == [0, 0, 0, 1, 0, 2, 1, 0, 1, 1, 1, 2, 2, 0, 2, 1]
+    assert ternary_to_bytes(digits, 3).tobytes() == b'\x05\x39\x77'
+
+
+def test_matrix_is_converted_row_by_row(rng):
+    data = rng.integers(0, 256, size=(5, 19), dtype=np.uint8)
+
+    digits = bytes_to_ternary(data, 107)
+
+    assert np.array_equal(digits, np.array([bytes_to_ternary(row.tobytes(), 107) for row in data]))
+    assert np.array_equal(ternary_to_bytes(digits, 19), data)
+
+
+def test_capacity_is_the_largest_length_that_fits():
+    for N in (2, 11, 107, 439, 821):
+        length = ternary_capacity_in_bytes(N)
+        bytes_to_ternary(bytes(length), N)
+
+        with pytest.raises(ValueError):
+            bytes_to_ternary(bytes(length + 1), N)
+
+
+def test_corrupted_digit_pairs_are_reduced():
+    # The pair (2, 2) encodes 8, which no 3 bits produce
+    assert ternary_to_bytes(np.array([2, 2, 0, 0, 0, 0]), 1).tolist() == [0]
+
+
+def test_messages_round_trip_through_oaep():
+    N = 439
+    oaep = OAEP.for_parameters(L=b'', k=ternary_capacity_in_bytes(N))
+    messages = [b'', b'\x00', bytes(range(30)), b'\xff' * oaep.max_message_length]
+
+    coefficients = encode_messages(oaep, messages, N)
+
+    assert coefficients.shape == (len(messages), N)
+    assert decode_messages(oaep, coefficients) == messages
@@ -0,0 +1,61 @@
+"""
+Sparse ternary and product-form polynomials checked against dense convolution.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import numpy as np
+import pytest
+
+from NTRUEncrypt.ntruencrypt import NTRUEncrypt
+from NTRUEncrypt.ternary_polynomial import TernaryPolynomial, ProductFormPolynomial, random_ternary_matrix, \
+    default_weights
+from NTRUEncrypt.truncated_polynomial import TruncatedPolynomial, cyclic_convolution
+
+
+@pytest.fixture
+def rng():
+    np.random.seed(2024)
+    return np.random.default_rng(2024)
+
+
+@pytest.mark.parametrize('N, d', [(11, 3), (439, 22), (821, 29)])
+def test_sparse_product_matches_dense(rng, N, d):
+    a = rng.integers(-2048, 2048, size=N)
+    r = TernaryPolynomial.random(N, d, d)
+
+    assert np.array_equal((r * TruncatedPolynomial(a)).coefficients, cyclic_convolution(r.to_dense().coefficients, a))
+
+
+def test_product_form_matches_dense(rng):
+    N, p = 439, 3
+    a = rng.integers(-2048, 2048, size=N)
+    f = ProductFormPolynomial(TernaryPolynomial.random(N, 22, 22), p)
+
+    assert np.array_equal((f * TruncatedPolynomial(a)).coefficients, cyclic_convolution(f.to_dense().coefficients, a))
+
+
+def test_random_ternary_matrix_has_fixed_weight():
+    rows = random_ternary_matrix(16, 439, 22, 21)
+
+    assert np.array_equal((rows == 1).sum(axis=1), np.full(16, 22))
+    assert np.array_equal((rows == -1).sum(axis=1), np.full(16, 21))
+
+
+@pytest.mark.parametrize('N', [401, 439, 512, 593, 743, 821, 1087])
+def test_default_weights_are_small(N):
+    df, dg, dr = default_weights(N)
+
+    # F and r enter every encryption and decryption, g only the key generation
+    assert df == dr and df * df <= 2 * N
+    assert dg <= N // 3
+
+
+@pytest.mark.parametrize('product_form', [True, False])
+def test_round_trips_with_default_weights(product_form):
+    ntru = NTRUEncrypt(439, 3, 2048, product_form=product_form)
+    messages = [bytes([i]) * 20 for i in range(64)]
+
+    assert (ntru.df, ntru.dg, ntru.dr) == default_weights(439)
+    assert ntru.decrypt_many(ntru.encrypt_many(messages)) == messages
+    assert ntru.decrypt_bytes(ntru.encrypt_bytes(b'default weights')) == b'default weights'